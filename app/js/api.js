@@ -0,0 +1,60 @@
+/**
+ * api.js - Server-side graph queries
+ * In server mode, ego graphs and dependency walks are answered by
+ * /api/ego and /api/deps instead of traversing Cytoscape collections
+ */
+
+const GraphApi = {
+    enabled: false,
+
+    /**
+     * Query an API endpoint; returns null when the API is unavailable
+     */
+    async query(endpoint, params) {
+        if (!this.enabled) return null;
+
+        const bundle = currentBundle();
+        if (bundle) params = Object.assign({ bundle }, params);
+
+        try {
+            const response = await fetch(`../api/${endpoint}?${new URLSearchParams(params)}`);
+            if (!response.ok) {
+                console.warn(`/api/${endpoint} failed (${response.status}), traversing locally`);
+                return null;
+            }
+            return await response.json();
+        } catch (error) {
+            console.warn(`/api/${endpoint} unavailable, traversing locally:`, error);
+            return null;
+        }
+    },
+
+    /**
+     * Undirected neighborhood of a node within radius hops
+     */
+    async ego(nodeId, radius) {
+        return this.toCollections(await this.query('ego', { node: nodeId, radius }));
+    },
+
+    /**
+     * Upstream/downstream/both/paths dependencies of a node within depth hops
+     */
+    async deps(nodeId, direction, depth) {
+        return this.toCollections(await this.query('deps', { node: nodeId, direction, depth }));
+    },
+
+    /**
+     * Map a query result onto the graph's elements as { nodes, edges }
+     */
+    toCollections(result) {
+        if (!result) return null;
+
+        PathView.reveal(result.nodes.map(n => n.id));
+        const cy = GraphManager.cy;
+        const nodes = cy.collection();
+        const edges = cy.collection();
+        result.nodes.forEach(n => nodes.merge(cy.getElementById(n.id)));
+        result.edges.forEach(e => edges.merge(cy.getElementById(`${e.source}-${e.target}`)));
+        return { nodes, edges };
+    }
+};
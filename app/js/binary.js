@@ -0,0 +1,218 @@
+/**
+ * binary.js - Reader for the compact columnar bundle (bundle.bin)
+ * Columns are typed-array views on the fetched ArrayBuffer (no copy);
+ * toBundleData() rebuilds the object shape the rest of the app uses.
+ * The file layout is documented in preprocess/binary_bundle.py.
+ */
+
+const BinaryBundle = {
+    MAGIC: 'CMSB',
+    FORMAT_VERSION: 1,
+    NONE: 0xFFFFFFFF,
+    TARGET_NOT_VALIDATED: -2,
+
+    // Reachability index arrays: [key path, section suffix] (reachability.ARRAYS)
+    REACH_ARRAYS: [
+        [['component'], 'component'],
+        [['memberOffsets'], 'member_offsets'],
+        [['members'], 'members'],
+        [['down', 'post'], 'down.post'],
+        [['down', 'order'], 'down.order'],
+        [['down', 'offsets'], 'down.offsets'],
+        [['down', 'intervals'], 'down.intervals'],
+        [['up', 'post'], 'up.post'],
+        [['up', 'order'], 'up.order'],
+        [['up', 'offsets'], 'up.offsets'],
+        [['up', 'intervals'], 'up.intervals']
+    ],
+
+    ARRAY_TYPES: {
+        u8: Uint8Array,
+        u32: Uint32Array,
+        i32: Int32Array,
+        f32: Float32Array,
+        f64: Float64Array
+    },
+
+    /**
+     * Parse the header and return a reader over the buffer
+     */
+    open(buffer) {
+        const view = new DataView(buffer);
+        const magic = new TextDecoder().decode(new Uint8Array(buffer, 0, 4));
+        if (magic !== this.MAGIC) {
+            throw new Error('Not a binary bundle (bad magic)');
+        }
+        const version = view.getUint32(4, true);
+        if (version !== this.FORMAT_VERSION) {
+            throw new Error(`Unsupported binary bundle version ${version}`);
+        }
+
+        const headerLength = view.getUint32(8, true);
+        const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, 12, headerLength)));
+        const dataStart = Math.ceil((12 + headerLength) / 8) * 8;
+        const arrayTypes = this.ARRAY_TYPES;
+
+        return {
+            header,
+
+            /**
+             * Typed-array view of a section, or null if absent
+             */
+            column(name) {
+                const entry = header.sections[name];
+                if (!entry) return null;
+                const [offset, dtype, length] = entry;
+                return new arrayTypes[dtype](buffer, dataStart + offset, length);
+            },
+
+            /**
+             * Decode the string table into an array of strings
+             */
+            strings() {
+                if (this._strings) return this._strings;
+                const bytes = this.column('strings.bytes');
+                const offsets = this.column('strings.offsets');
+                const count = offsets.length - 1;
+                const strings = new Array(count);
+                const decoder = new TextDecoder();
+
+                if (header.asciiStrings) {
+                    // Byte offsets equal character offsets: decode once and slice
+                    const text = decoder.decode(bytes);
+                    for (let i = 0; i < count; i++) {
+                        strings[i] = text.slice(offsets[i], offsets[i + 1]);
+                    }
+                } else {
+                    for (let i = 0; i < count; i++) {
+                        strings[i] = decoder.decode(bytes.subarray(offsets[i], offsets[i + 1]));
+                    }
+                }
+                this._strings = strings;
+                return strings;
+            }
+        };
+    },
+
+    /**
+     * Rebuild {nodes, edges, modules, labelToId, metadata} from a buffer
+     */
+    toBundleData(buffer) {
+        const reader = this.open(buffer);
+        const header = reader.header;
+        const strings = reader.strings();
+        const NONE = this.NONE;
+        const get = (idx) => (idx === NONE ? null : strings[idx]);
+        const nodeCount = header.counts.nodes;
+
+        // Nodes
+        const ids = new Array(nodeCount);
+        const nodeId = reader.column('node.id');
+        const nodeLabel = reader.column('node.label');
+        const xs = reader.column('node.x');
+        const ys = reader.column('node.y');
+        const nodeAttrs = header.nodeAttributes.map(key => [key, reader.column(`node.attr.${key}`)]);
+        const nodes = new Array(nodeCount);
+
+        for (let i = 0; i < nodeCount; i++) {
+            ids[i] = strings[nodeId[i]];
+            const node = { id: ids[i] };
+            if (nodeLabel[i] !== NONE) node.label = strings[nodeLabel[i]];
+            for (const [key, col] of nodeAttrs) {
+                if (col[i] !== NONE) node[key] = strings[col[i]];
+            }
+            if (xs) {
+                node.x = xs[i];
+                node.y = ys[i];
+            }
+            nodes[i] = node;
+        }
+
+        // Edges, walked in CSR order
+        const outOffsets = reader.column('edge.out_offsets');
+        const outTarget = reader.column('edge.out_target');
+        const edgeAttrs = header.edgeAttributes.map(key => [key, reader.column(`edge.attr.${key}`)]);
+        const edges = new Array(header.counts.edges);
+
+        for (let source = 0; source < nodeCount; source++) {
+            for (let j = outOffsets[source]; j < outOffsets[source + 1]; j++) {
+                const edge = { source: ids[source], target: ids[outTarget[j]] };
+                for (const [key, col] of edgeAttrs) {
+                    if (col[j] !== NONE) edge[key] = strings[col[j]];
+                }
+                edges[j] = edge;
+            }
+        }
+
+        // Label -> node ID
+        const labelToId = {};
+        const labelLabel = reader.column('label.label');
+        const labelNode = reader.column('label.node');
+        for (let i = 0; i < labelLabel.length; i++) {
+            labelToId[strings[labelLabel[i]]] = labelNode[i] === NONE ? null : ids[labelNode[i]];
+        }
+
+        // Modules with their InputTags and parameters
+        const moduleName = reader.column('module.name');
+        const moduleType = reader.column('module.type');
+        const modulePlugin = reader.column('module.plugin');
+        const moduleSnippet = reader.column('module.snippet');
+        const tagOffsets = reader.column('tag.offsets');
+        const tagCols = {};
+        for (const key of ['field', 'type', 'module', 'instance', 'process']) {
+            tagCols[key] = reader.column(`tag.${key}`);
+        }
+        const tagIndex = reader.column('tag.index');
+        const tagTarget = reader.column('tag.target');
+        const paramOffsets = reader.column('param.offsets');
+        const paramName = reader.column('param.name');
+        const paramType = reader.column('param.type');
+        const paramValue = reader.column('param.value');
+
+        const modules = {};
+        for (let m = 0; m < moduleName.length; m++) {
+            const inputTags = [];
+            for (let t = tagOffsets[m]; t < tagOffsets[m + 1]; t++) {
+                const tag = { field: get(tagCols.field[t]), type: get(tagCols.type[t]) };
+                if (tagIndex[t] >= 0) tag.index = tagIndex[t];
+                tag.module = get(tagCols.module[t]);
+                tag.instance = get(tagCols.instance[t]);
+                tag.process = get(tagCols.process[t]);
+                if (tagTarget[t] !== this.TARGET_NOT_VALIDATED) {
+                    tag.found = tagTarget[t] >= 0;
+                    tag.targetId = tag.found ? ids[tagTarget[t]] : null;
+                }
+                inputTags.push(tag);
+            }
+
+            const parameters = {};
+            for (let p = paramOffsets[m]; p < paramOffsets[m + 1]; p++) {
+                parameters[strings[paramName[p]]] = { type: get(paramType[p]), value: get(paramValue[p]) };
+            }
+
+            const name = strings[moduleName[m]];
+            const module = { type: get(moduleType[m]), plugin: get(modulePlugin[m]) };
+            if (header.moduleDetails) {
+                Object.assign(module, { parameters, inputTags, rawSnippet: get(moduleSnippet[m]) });
+            }
+            modules[name] = Object.assign(module, header.moduleExtra[name] || {});
+        }
+
+        const bundle = { nodes, edges, modules, labelToId, metadata: header.metadata };
+
+        // Reachability index, kept as typed-array views
+        if (header.reachability) {
+            const reachability = {};
+            for (const [keys, suffix] of this.REACH_ARRAYS) {
+                let target = reachability;
+                for (const key of keys.slice(0, -1)) {
+                    target = target[key] = target[key] || {};
+                }
+                target[keys[keys.length - 1]] = reader.column(`reach.${suffix}`);
+            }
+            bundle.reachability = reachability;
+        }
+
+        return Object.assign(bundle, header.extra);
+    }
+};
@@ -0,0 +1,141 @@
+/**
+ * delta.js - Delta updates after a rebuild
+ * Brings the loaded bundle up to date with the patch from its build to
+ * the current one (/api/delta, written by preprocess/diff_bundles.py)
+ * instead of reloading the page. The patch replaces changed nodes with
+ * all their outgoing edges and changed module records, and brings every
+ * changed section (reachability index, coarse graph, timing, wasted
+ * work) whole, with the node order those are indexed by when it changed.
+ */
+
+const BundleDelta = {
+    /**
+     * Fetch and apply the patch to the current build of the bundle;
+     * resolves to a summary of the changes, or null when there is no
+     * patch and the bundle has to be reloaded
+     */
+    async update() {
+        const from = window.bundleData?.metadata?.contentHash;
+        if (!from || isStaticMode()) return null;
+
+        const params = { from };
+        const bundle = currentBundle();
+        if (bundle) params.bundle = bundle;
+        const response = await fetch(`../api/delta?${new URLSearchParams(params)}`);
+        if (!response.ok) return null;
+
+        const patch = await response.json();
+        return patch.from === from ? this.apply(patch) : null;
+    },
+
+    /**
+     * Apply a patch to window.bundleData and the graph
+     */
+    apply(patch) {
+        const data = window.bundleData;
+        // Nodes are patched in the module graph, with every Path expanded
+        PathView.expandAll();
+        const upserted = new Map(patch.nodes.upsert.map(record => [record.node.id, record]));
+        const removed = new Set(patch.nodes.remove);
+
+        // Nodes, replaced in place; labels of changed nodes are remapped
+        const nodes = [];
+        const pending = new Map(upserted);
+        for (const node of data.nodes) {
+            const changed = upserted.has(node.id) || removed.has(node.id);
+            if (changed && data.labelToId[node.label] === node.id) {
+                delete data.labelToId[node.label];
+            }
+            if (upserted.has(node.id)) {
+                nodes.push(upserted.get(node.id).node);
+                pending.delete(node.id);
+            } else if (!removed.has(node.id)) {
+                nodes.push(node);
+            }
+        }
+        pending.forEach(record => nodes.push(record.node));
+        upserted.forEach((record, id) => {
+            if (record.node.label) data.labelToId[record.node.label] = id;
+        });
+        if (patch.order) {
+            // The order of the new build, which its sections index into
+            const position = new Map(patch.order.map((id, i) => [id, i]));
+            nodes.sort((a, b) => position.get(a.id) - position.get(b.id));
+        }
+        data.nodes = nodes;
+
+        // Edges: changed nodes bring all their outgoing edges
+        data.edges = data.edges.filter(edge =>
+            !upserted.has(edge.source) && !removed.has(edge.source) && !removed.has(edge.target));
+        upserted.forEach(record => data.edges.push(...record.out));
+
+        // Modules; cached details of changed ones are stale
+        for (const name of patch.modules.remove) {
+            delete data.modules[name];
+            ModuleDetails.cache.delete(name);
+        }
+        for (const [name, module] of Object.entries(patch.modules.upsert)) {
+            data.modules[name] = module;
+            ModuleDetails.cache.delete(name);
+        }
+        data.metadata = patch.metadata;
+
+        this.updateGraph(upserted, removed);
+
+        // Changed sections replace the old ones; the others still hold
+        Object.entries(patch.sections).forEach(([key, value]) => { data[key] = value; });
+        patch.removeSections.forEach(key => { delete data[key]; });
+        Reachability.init(data);
+        // Every Path is expanded (see above)
+        PathView.init(data, true);
+        TimingView.init(data);
+        WastedWork.init(data);
+
+        // The search index describes the old build: searches go to the
+        // server until the next full load
+        SearchIndex.data = null;
+        SearchIndex.lower = {};
+
+        updateStats({
+            nodeCount: data.nodes.length,
+            edgeCount: data.edges.length,
+            moduleCount: Object.keys(data.modules).length
+        });
+
+        return {
+            nodes: upserted.size,
+            removedNodes: removed.size,
+            modules: Object.keys(patch.modules.upsert).length,
+            removedModules: patch.modules.remove.length
+        };
+    },
+
+    /**
+     * Apply node changes to the Cytoscape graph in one batch
+     */
+    updateGraph(upserted, removed) {
+        const cy = GraphManager.cy;
+        cy.batch(() => {
+            removed.forEach(id => cy.getElementById(id).remove());
+
+            upserted.forEach((record, id) => {
+                const node = record.node;
+                const hasPosition = typeof node.x === 'number' && typeof node.y === 'number';
+                const existing = cy.getElementById(id);
+                if (existing.nonempty()) {
+                    existing.outgoers('edge').remove();
+                    existing.removeData();
+                    existing.data(GraphManager.nodeElement(node, false).data);
+                    if (hasPosition) existing.position({ x: node.x, y: node.y });
+                } else {
+                    cy.add(GraphManager.nodeElement(node, hasPosition));
+                }
+            });
+
+            upserted.forEach(record => {
+                cy.add(record.out.map(edge => GraphManager.edgeElement(edge)));
+            });
+        });
+        GraphManager.fullGraph = cy.elements().clone();
+    }
+};
@@ -1,6 +1,7 @@
 /**
  * dependency.js - Dependency explorer
- * Handles showing upstream/downstream dependencies with configurable depth
+ * Handles showing upstream/downstream dependencies with configurable depth,
+ * or over all levels and between two modules with the reachability index
  */
 
 const DependencyExplorer = {
@@ -9,6 +10,9 @@ const DependencyExplorer = {
     pathsBtn: null,
     upstreamBtn: null,
     downstreamBtn: null,
+    allLevelsToggle: null,
+    betweenInput: null,
+    betweenBtn: null,
     selectedModuleName: null,
     autoShowOnClick: true,  // Auto-show dependencies when clicking a node
 
@@ -21,6 +25,9 @@ const DependencyExplorer = {
         this.pathsBtn = document.getElementById('dep-paths-btn');
         this.upstreamBtn = document.getElementById('dep-upstream-btn');
         this.downstreamBtn = document.getElementById('dep-downstream-btn');
+        this.allLevelsToggle = document.getElementById('dep-all-levels');
+        this.betweenInput = document.getElementById('dep-between-input');
+        this.betweenBtn = document.getElementById('dep-between-btn');
         this.selectedModuleName = document.getElementById('selected-module-name');
 
         this.setupEventListeners();
@@ -34,6 +41,10 @@ const DependencyExplorer = {
         this.upstreamBtn.addEventListener('click', () => this.show('upstream'));
         this.downstreamBtn.addEventListener('click', () => this.show('downstream'));
         this.showBtn.addEventListener('click', () => this.show('both'));
+        this.betweenBtn.addEventListener('click', () => this.showBetween());
+        this.betweenInput.addEventListener('keydown', (e) => {
+            if (e.key === 'Enter') this.showBetween();
+        });
 
         // Auto-show toggle
         const autoToggle = document.getElementById('auto-deps-toggle');
@@ -50,11 +61,18 @@ const DependencyExplorer = {
         });
     },
 
+    /**
+     * Selected depth, or Infinity with "All levels" checked
+     */
+    getDepth() {
+        return this.allLevelsToggle.checked ? Infinity : parseInt(this.depthInput.value);
+    },
+
     /**
      * Show dependencies for a specific node (called when clicking)
      */
     showForNode(node) {
-        const depth = parseInt(this.depthInput.value);
+        const depth = this.getDepth();
         const direction = 'paths';  // Show direct paths only (no cross-connections)
 
         console.log(`Auto-showing dependencies for ${node.data('label')} with depth:`, depth);
@@ -66,7 +84,7 @@ const DependencyExplorer = {
      * Show dependencies
      */
     show(direction) {
-        const depth = parseInt(this.depthInput.value);
+        const depth = this.getDepth();
 
         if (!PanelManager.currentModule) {
             alert('Please select a module first');
@@ -90,10 +108,66 @@ const DependencyExplorer = {
     /**
      * Show dependencies for a given node
      */
-    showDependenciesForNode(centerNode, depth, direction) {
-        // Get dependencies
-        const dependencies = this.getDependencies(centerNode, depth, direction);
+    async showDependenciesForNode(centerNode, depth, direction) {
+        // All levels come from the reachability index; otherwise a server
+        // query, or local BFS
+        let dependencies = null;
+        if (depth === Infinity) {
+            dependencies = Reachability.dependencies(centerNode.id(), direction);
+        } else {
+            dependencies = await GraphApi.deps(centerNode.id(), direction, depth);
+        }
+        if (!dependencies) {
+            // The local BFS needs every module in the graph
+            PathView.expandAll();
+            dependencies = this.getDependencies(centerNode, depth, direction);
+        }
+
+        this.display(centerNode, dependencies);
+
+        const levels = depth === Infinity ? 'all levels' : `depth ${depth}`;
+        console.log(`Showing ${dependencies.nodes.length} nodes in ${direction} dependencies (${levels})`);
+    },
+
+    /**
+     * Show the modules on any path between the selected module and the
+     * one named in the "Between" input
+     */
+    showBetween() {
+        if (!PanelManager.currentModule) {
+            alert('Please select a module first');
+            return;
+        }
+
+        const otherName = this.betweenInput.value.trim();
+        const fromNodes = GraphManager.getNodeByLabel(PanelManager.currentModule);
+        const toNodes = GraphManager.getNodeByLabel(otherName);
+        if (fromNodes.length === 0 || toNodes.length === 0) {
+            alert(`Module not found in graph: ${fromNodes.length === 0 ? PanelManager.currentModule : otherName}`);
+            return;
+        }
+
+        const from = fromNodes[0];
+        const to = toNodes[0];
+        let between = Reachability.pathsBetween(from.id(), to.id());
+        if (!between) {
+            PathView.expandAll();
+            between = this.getPathsBetween(from, to);
+        }
+        if (between.nodes.length === 0) {
+            alert(`No path between ${PanelManager.currentModule} and ${otherName}`);
+            return;
+        }
 
+        this.display(from, between);
+        to.addClass('highlighted');
+        console.log(`Showing ${between.nodes.length} nodes between ${PanelManager.currentModule} and ${otherName}`);
+    },
+
+    /**
+     * Show only the given nodes and edges, centered on centerNode
+     */
+    display(centerNode, dependencies) {
         // Hide nodes not in dependencies
         GraphManager.cy.nodes().addClass('hidden');
         dependencies.nodes.removeClass('hidden');
@@ -112,8 +186,22 @@ const DependencyExplorer = {
         }, {
             duration: 500
         });
+    },
 
-        console.log(`Showing ${dependencies.nodes.length} nodes in ${direction} dependencies (depth ${depth})`);
+    /**
+     * Modules on any path between two nodes (in either direction) by
+     * intersecting full downstream and upstream walks
+     */
+    getPathsBetween(a, b) {
+        for (const [from, to] of [[a, b], [b, a]]) {
+            const downstream = this.getDependencies(from, Infinity, 'downstream');
+            if (!downstream.nodes.contains(to)) continue;
+
+            const upstream = this.getDependencies(to, Infinity, 'upstream');
+            const nodes = downstream.nodes.intersection(upstream.nodes);
+            return { nodes, edges: downstream.edges.intersection(upstream.edges) };
+        }
+        return { nodes: GraphManager.cy.collection(), edges: GraphManager.cy.collection() };
     },
 
     /**
@@ -0,0 +1,116 @@
+/**
+ * details.js - On-demand module details
+ * Slim bundles carry only each module's type and plugin; the parameters,
+ * InputTags and config snippet of a module are fetched when it is selected:
+ * from /api/module/<name> in server mode, or from the static shard files
+ * written by preprocess/module_details.py in static mode.
+ * Recently viewed modules are kept in a small LRU cache.
+ */
+
+const ModuleDetails = {
+    capacity: 64,
+    cache: new Map(),
+    pendingShards: {},
+
+    /**
+     * True when the bundle's module details are stored separately
+     */
+    isSplit() {
+        return Boolean(window.bundleData?.metadata?.moduleDetails);
+    },
+
+    /**
+     * Return the full record of a module, or null if it is unknown
+     */
+    async get(name) {
+        const summary = window.bundleData.modules[name];
+        if (!summary) return null;
+        if (!this.isSplit()) return summary;
+
+        if (this.cache.has(name)) {
+            // Move to the most recently used end
+            const record = this.cache.get(name);
+            this.cache.delete(name);
+            this.cache.set(name, record);
+            return record;
+        }
+
+        const record = isStaticMode() ? await this.fromShard(name) : await this.fromServer(name);
+        if (record) {
+            this.cache.set(name, record);
+            while (this.cache.size > this.capacity) {
+                this.cache.delete(this.cache.keys().next().value);
+            }
+        }
+        return record;
+    },
+
+    /**
+     * Fetch a module record from the server
+     */
+    async fromServer(name) {
+        const bundle = currentBundle();
+        const query = bundle ? `?${new URLSearchParams({ bundle })}` : '';
+        const response = await fetch(`../api/module/${encodeURIComponent(name)}${query}`);
+        if (response.status === 404) return null;
+        if (!response.ok) {
+            throw new Error(`Failed to load module details: ${response.statusText}`);
+        }
+        return await response.json();
+    },
+
+    /**
+     * Load the static shard holding a module and return its record
+     */
+    async fromShard(name) {
+        const info = window.bundleData.metadata.moduleDetails;
+        const records = await this.loadShard(this.fnv1a(name) % info.shards);
+        return records[name] || null;
+    },
+
+    /**
+     * Inject the <script> of a shard; it calls registerShard when loaded
+     */
+    loadShard(shard) {
+        if (this.pendingShards[shard]) {
+            return this.pendingShards[shard].promise;
+        }
+
+        const info = window.bundleData.metadata.moduleDetails;
+        const script = document.createElement('script');
+        const pending = {};
+        pending.promise = new Promise((resolve, reject) => {
+            pending.resolve = resolve;
+            script.onerror = () => reject(new Error(`Failed to load module shard ${shard}`));
+        }).finally(() => {
+            delete this.pendingShards[shard];
+            script.remove();
+        });
+        this.pendingShards[shard] = pending;
+
+        script.src = dataUrl(`${info.path}/${String(shard).padStart(3, '0')}.js`);
+        document.head.appendChild(script);
+        return pending.promise;
+    },
+
+    /**
+     * Called by each shard file with its records
+     */
+    registerShard(shard, records) {
+        const pending = this.pendingShards[shard];
+        if (pending) {
+            pending.resolve(records);
+        }
+    },
+
+    /**
+     * 32-bit FNV-1a of the UTF-8 bytes of a string (matches module_details.fnv1a)
+     */
+    fnv1a(text) {
+        let hash = 0x811c9dc5;
+        for (const byte of new TextEncoder().encode(text)) {
+            hash = Math.imul(hash ^ byte, 0x01000193) >>> 0;
+        }
+        return hash;
+    }
+};
@@ -31,7 +31,7 @@ const EgoGraphManager = {
     /**
      * Apply ego graph filter
      */
-    apply() {
+    async apply() {
         const radius = parseInt(this.radiusInput.value);
 
         if (!PanelManager.currentModule) {
@@ -52,8 +52,13 @@ const EgoGraphManager = {
         const centerNode = nodes[0];
         this.currentCenter = centerNode;
 
-        // Find N-hop neighborhood using BFS
-        const neighborhood = this.getNeighborhood(centerNode, radius);
+        // Find N-hop neighborhood (server query, or local BFS)
+        let neighborhood = await GraphApi.ego(centerNode.id(), radius);
+        if (!neighborhood) {
+            // The local BFS needs every module in the graph
+            PathView.expandAll();
+            neighborhood = this.getNeighborhood(centerNode, radius);
+        }
 
         // Hide nodes not in neighborhood
         GraphManager.cy.nodes().addClass('hidden');
@@ -77,6 +77,9 @@ const FilterManager = {
             analyzer: this.filters.analyzer.checked
         };
 
+        // Filters apply to modules, not to collapsed Paths
+        PathView.expandAll();
+
         let visibleCount = 0;
         let hiddenCount = 0;
 
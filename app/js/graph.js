@@ -6,31 +6,25 @@
 const GraphManager = {
     cy: null,
     fullGraph: null,
+    loading: false,
 
     /**
-     * Initialize Cytoscape graph with data
+     * Initialize Cytoscape graph with data; with loading=true the nodes and
+     * edges are still arriving (see addElements and finishLoading)
      */
-    init(data) {
+    init(data, loading = false) {
         console.log('Initializing graph with', data.nodes.length, 'nodes and', data.edges.length, 'edges');
+        this.loading = loading;
 
-        // Convert data to Cytoscape format
-        const elements = {
-            nodes: data.nodes.map(n => ({
-                data: {
-                    id: n.id,
-                    label: n.label || n.id,
-                    ...n
-                }
-            })),
-            edges: data.edges.map(e => ({
-                data: {
-                    id: `${e.source}-${e.target}`,
-                    source: e.source,
-                    target: e.target,
-                    ...e
-                }
-            }))
-        };
+        // Use positions precomputed by build_bundle.py when every node has them
+        // (a bundle is only drawn while loading when it has them)
+        const hasPositions = loading || (data.nodes.length > 0 &&
+            data.nodes.every(n => typeof n.x === 'number' && typeof n.y === 'number'));
+        console.log(`Layout: ${hasPositions ? 'preset (precomputed)' : 'cose'}`);
+
+        // Convert data to Cytoscape format; large graphs start with one node per Path
+        PathView.init(data);
+        const elements = PathView.elements(hasPositions);
 
         // Initialize Cytoscape
         this.cy = cytoscape({
@@ -54,6 +48,8 @@ const GraphManager = {
                         'text-background-padding': 2,
                         'text-background-shape': 'roundrectangle',
                         'background-color': function(ele) {
+                            const timed = TimingView.color(ele.data('time'));
+                            if (timed) return timed;
                             const fillcolor = ele.data('fillcolor');
                             if (fillcolor === 'green') return '#2ecc71';
                             if (fillcolor === 'lightgrey') return '#d3d3d3';
@@ -72,6 +68,23 @@ const GraphManager = {
                         }
                     }
                 },
+                // Collapsed Path, sized by its number of modules
+                {
+                    selector: 'node.group',
+                    style: {
+                        'width': ele => 60 + 10 * Math.sqrt(ele.data('size')),
+                        'height': ele => 35 + 5 * Math.sqrt(ele.data('size')),
+                        'shape': 'round-rectangle',
+                        'background-color': function(ele) {
+                            const timed = TimingView.color(ele.data('time'));
+                            if (timed) return timed;
+                            return ele.data('type') === 'EndPath' ? '#f5cba7' : '#aed6f1';
+                        },
+                        'border-color': '#34495e',
+                        'font-size': 12,
+                        'font-weight': 'bold'
+                    }
+                },
                 // Highlighted node
                 {
                     selector: 'node.highlighted',
@@ -122,6 +135,14 @@ const GraphManager = {
                         'arrow-scale': 1.2
                     }
                 },
+                // Edge standing for the module edges of collapsed Paths
+                {
+                    selector: 'edge.aggregate',
+                    style: {
+                        'width': ele => 1 + Math.log2(ele.data('weight')),
+                        'line-style': 'dashed'
+                    }
+                },
                 // Hidden edge
                 {
                     selector: 'edge.hidden',
@@ -138,29 +159,7 @@ const GraphManager = {
                 }
             ],
 
-            layout: {
-                name: 'cose',
-                animate: false,
-                // Very tight spring-based physics
-                nodeRepulsion: 200000,        // Lower repulsion - nodes can get very close
-                idealEdgeLength: 40,          // Very short edges - tight connections
-                edgeElasticity: 2000,         // Very strong spring pull
-                nestingFactor: 1.2,
-                gravity: 80,                  // Strong gravity - pulls everything together
-                // Iterations for better clustering
-                numIter: 2500,                // More iterations for tight packing
-                initialTemp: 600,             // Higher initial temp for exploration
-                coolingFactor: 0.95,
-                minTemp: 1.0,
-                // Component spacing
-                componentSpacing: 80,         // Components closer together
-                // Better spring physics
-                nodeOverlap: 10,              // Allow tighter packing
-                refresh: 20,
-                fit: true,
-                padding: 30,
-                randomize: false
-            },
+            layout: hasPositions ? this.presetLayout : this.coseLayout,
 
             minZoom: 0.1,
             maxZoom: 3,
@@ -177,13 +176,118 @@ const GraphManager = {
         return this.cy;
     },
 
+    /**
+     * Add a batch of a loading bundle; nodes and edges inside collapsed
+     * Paths only join the graph when their Path is expanded
+     */
+    addElements(nodes, edges) {
+        const first = this.cy.nodes().empty();
+        const elements = [];
+        nodes.forEach(n => {
+            if (PathView.visible(n.id) === n.id) elements.push(this.nodeElement(n, true));
+        });
+        edges.forEach(e => {
+            if (PathView.visible(e.source) === e.source && PathView.visible(e.target) === e.target) {
+                elements.push(this.edgeElement(e));
+            }
+        });
+        this.cy.add(elements);
+        if (first && elements.length > 0) this.cy.fit(undefined, 30);
+    },
+
+    /**
+     * End loading once the whole bundle is in
+     */
+    finishLoading() {
+        // Edges between expanded and collapsed Paths are only known now
+        if (PathView.active && PathView.expanded.size > 0) {
+            this.cy.batch(() => PathView.syncEdges());
+        }
+        this.fullGraph = this.cy.elements().clone();
+        this.loading = false;
+    },
+
+    /**
+     * Cytoscape element for a bundle node
+     */
+    nodeElement(n, withPosition) {
+        const element = {
+            group: 'nodes',
+            data: {
+                id: n.id,
+                label: n.label || n.id,
+                ...n
+            }
+        };
+        if (withPosition) {
+            element.position = { x: n.x, y: n.y };
+        }
+        return element;
+    },
+
+    /**
+     * Cytoscape element for a bundle edge
+     */
+    edgeElement(e) {
+        return {
+            group: 'edges',
+            data: {
+                id: `${e.source}-${e.target}`,
+                source: e.source,
+                target: e.target,
+                ...e
+            }
+        };
+    },
+
+    /**
+     * Layout for bundles with precomputed node positions
+     */
+    presetLayout: {
+        name: 'preset',
+        fit: true,
+        padding: 30
+    },
+
+    /**
+     * Force-directed layout used when the bundle has no positions
+     */
+    coseLayout: {
+        name: 'cose',
+        animate: false,
+        // Very tight spring-based physics
+        nodeRepulsion: 200000,        // Lower repulsion - nodes can get very close
+        idealEdgeLength: 40,          // Very short edges - tight connections
+        edgeElasticity: 2000,         // Very strong spring pull
+        nestingFactor: 1.2,
+        gravity: 80,                  // Strong gravity - pulls everything together
+        // Iterations for better clustering
+        numIter: 2500,                // More iterations for tight packing
+        initialTemp: 600,             // Higher initial temp for exploration
+        coolingFactor: 0.95,
+        minTemp: 1.0,
+        // Component spacing
+        componentSpacing: 80,         // Components closer together
+        // Better spring physics
+        nodeOverlap: 10,              // Allow tighter packing
+        refresh: 20,
+        fit: true,
+        padding: 30,
+        randomize: false
+    },
+
     /**
      * Setup event handlers for graph interactions
      */
     setupEventHandlers() {
         // Node click - open panel and show dependencies
         this.cy.on('tap', 'node', (evt) => {
+            if (this.loading) return;
             const node = evt.target;
+            if (node.hasClass('group')) {
+                PathView.expand([node.id()]);
+                return;
+            }
             const moduleId = node.id();
             const label = node.data('label');
 
@@ -196,6 +300,13 @@ const GraphManager = {
             }
         });
 
+        // Node right-click - collapse its Path
+        this.cy.on('cxttap', 'node', (evt) => {
+            if (this.loading) return;
+            const group = PathView.groupOf.get(evt.target.id());
+            if (group) PathView.collapse([group]);
+        });
+
         // Node hover - show tooltip
         this.cy.on('mouseover', 'node', (evt) => {
             const node = evt.target;
@@ -223,6 +334,7 @@ const GraphManager = {
      */
     highlightNode(nodeId) {
         this.clearHighlight();
+        PathView.reveal([nodeId]);
         const node = this.cy.getElementById(nodeId);
         if (node.length > 0) {
             node.addClass('highlighted');
@@ -266,8 +378,10 @@ const GraphManager = {
      * Get node by label
      */
     getNodeByLabel(label) {
+        const nodeId = window.bundleData?.labelToId?.[label];
+        if (nodeId) PathView.reveal([nodeId]);
         return this.cy.nodes().filter(node => {
-            return node.data('label') === label;
+            return node.data('label') === label && !node.hasClass('group');
         });
     },
 
@@ -0,0 +1,83 @@
+/**
+ * live.js - Live updates from the server
+ * Listens to GET /events (Server-Sent Events) for rebuilds of the bundle
+ * being viewed, started by an upload or by `server.py --watch`, and
+ * brings the app up to date once one finishes: in place from a delta
+ * patch when there is one, otherwise by reloading the page. A rebuild
+ * with other build options (e.g. a bundle.bin or timing report added
+ * or dropped) always reloads, so the app starts from the new outputs.
+ */
+
+const LiveUpdates = {
+    source: null,
+    statusSpan: null,
+    updating: false,
+
+    /**
+     * Connect to the event stream (server mode only)
+     */
+    init() {
+        if (!window.EventSource) return;
+        this.statusSpan = document.getElementById('live-status');
+        this.source = new EventSource('../events');
+        this.source.addEventListener('build', (event) => this.onBuild(JSON.parse(event.data)));
+        this.source.onopen = () => this.setStatus('Live');
+        // EventSource reconnects on its own
+        this.source.onerror = () => this.setStatus('Offline');
+    },
+
+    setStatus(text) {
+        if (this.statusSpan) this.statusSpan.textContent = text;
+    },
+
+    /**
+     * Handle a rebuild starting or finishing
+     */
+    async onBuild(build) {
+        if ((build.bundle || '') !== currentBundle()) return;
+
+        if (build.status === 'running') {
+            this.setStatus('Rebuilding...');
+            return;
+        }
+        if (build.status === 'failed') {
+            this.setStatus('Rebuild failed');
+            console.warn(`Rebuild ${build.job} failed:`, build.error);
+            return;
+        }
+        this.setStatus('Live');
+
+        // Unchanged bundles have no content hash; the upload dialog
+        // updates the app after its own builds
+        const loaded = window.bundleData?.metadata?.contentHash;
+        if (!build.contentHash || build.contentHash === loaded || this.updating || UploadManager.busy) {
+            return;
+        }
+
+        const options = JSON.stringify(window.bundleData?.metadata?.buildOptions ?? null);
+        if (build.buildOptions && JSON.stringify(build.buildOptions) !== options) {
+            console.log(`Rebuild ${build.job} changed the build options, reloading`);
+            window.location.reload();
+            return;
+        }
+
+        this.updating = true;
+        try {
+            const summary = await BundleDelta.update().catch(error => {
+                console.warn('Could not apply the delta update:', error);
+                return null;
+            });
+            if (summary) {
+                const time = new Date().toLocaleTimeString();
+                this.setStatus(`Updated ${time}: ${summary.nodes + summary.removedNodes} nodes, ` +
+                    `${summary.modules + summary.removedModules} modules changed`);
+                console.log(`Rebuild ${build.job} applied in place:`, summary);
+            } else {
+                console.log(`Rebuild ${build.job} finished, reloading`);
+                window.location.reload();
+            }
+        } finally {
+            this.updating = false;
+        }
+    }
+};
@@ -14,6 +14,60 @@ function isStaticMode() {
     return window.location.protocol === 'file:' || window.EMBEDDED_BUNDLE_DATA !== undefined;
 }
 
+/**
+ * Name of the bundle selected with ?bundle=<name>, or '' for the default
+ * bundle. Named bundles live in data/<name>/ (server mode only).
+ */
+function currentBundle() {
+    if (isStaticMode()) return '';
+    const name = new URLSearchParams(window.location.search).get('bundle') || '';
+    return /^[A-Za-z0-9][A-Za-z0-9_.-]*$/.test(name) ? name : '';
+}
+
+/**
+ * URL of a file in the current bundle's data directory
+ */
+function dataUrl(path) {
+    const bundle = currentBundle();
+    return bundle ? `../data/${bundle}/${path}` : `../data/${path}`;
+}
+
+/**
+ * Fill the bundle selector from /api/bundles; choosing a bundle reloads
+ * the app with ?bundle=<name>
+ */
+async function initBundleSelector() {
+    const select = document.getElementById('bundle-select');
+    if (!select) return;
+
+    try {
+        const response = await fetch('../api/bundles');
+        if (!response.ok) return;
+        const { bundles } = await response.json();
+        if (bundles.length < 2) return;
+
+        const current = currentBundle();
+        select.innerHTML = '';
+        bundles.forEach(bundle => {
+            const option = document.createElement('option');
+            option.value = bundle.name || '';
+            option.textContent = bundle.name || 'default';
+            option.selected = option.value === current;
+            select.appendChild(option);
+        });
+        select.addEventListener('change', () => {
+            const params = new URLSearchParams(window.location.search);
+            if (select.value) params.set('bundle', select.value);
+            else params.delete('bundle');
+            const query = params.toString();
+            window.location.search = query ? `?${query}` : '';
+        });
+        select.parentElement.style.display = '';
+    } catch (error) {
+        console.warn('Could not list bundles:', error);
+    }
+}
+
 /**
  * Initialize the application
  */
@@ -40,12 +94,7 @@ async function initApp() {
         } else {
             // Server mode: Fetch from server
             console.log('Fetching bundle data from server...');
-            const response = await fetch('../data/bundle.json');
-            if (!response.ok) {
-                throw new Error(`Failed to load bundle.json: ${response.statusText}`);
-            }
-
-            window.bundleData = await response.json();
+            window.bundleData = await fetchBundle();
             console.log('Bundle data loaded from server:', {
                 nodes: window.bundleData.nodes.length,
                 edges: window.bundleData.edges.length,
@@ -53,8 +102,20 @@ async function initApp() {
             });
         }
 
-        // Initialize graph
-        GraphManager.init(window.bundleData);
+        // Initialize graph (a streamed bundle is drawn while it loads)
+        if (!GraphManager.cy) GraphManager.init(window.bundleData);
+
+        // All-levels dependency queries use the bundle's reachability index
+        Reachability.init(window.bundleData);
+
+        // Module times and the critical path, when built with --timing
+        TimingView.init(window.bundleData);
+
+        // Modules whose products are never used
+        WastedWork.init(window.bundleData);
+
+        // Neighborhood queries go to the server when there is one
+        GraphApi.enabled = !staticMode;
 
         // Initialize UI components
         PanelManager.init();
@@ -64,9 +125,11 @@ async function initApp() {
         KeyboardNav.init();
         FilterManager.init();
 
-        // Initialize upload only in server mode
+        // Initialize upload and the bundle selector only in server mode
         if (!staticMode) {
             UploadManager.init();
+            initBundleSelector();
+            LiveUpdates.init();
         } else {
             // Hide upload button in static mode
             const uploadBtn = document.getElementById('upload-btn');
@@ -97,6 +160,55 @@ async function initApp() {
     }
 }
 
+/**
+ * Fetch the bundle, preferring the compact binary format when it was built,
+ * then the streamed bundle
+ */
+async function fetchBundle() {
+    const binaryResponse = await fetch(dataUrl('bundle.bin'));
+    if (binaryResponse.ok) {
+        const buffer = await binaryResponse.arrayBuffer();
+        console.log(`Using binary bundle (${(buffer.byteLength / 1024 / 1024).toFixed(2)} MB)`);
+        return BinaryBundle.toBundleData(buffer);
+    }
+
+    const streamed = await fetchStreamedBundle();
+    if (streamed) return streamed;
+
+    const response = await fetch(dataUrl('bundle.json'));
+    if (!response.ok) {
+        throw new Error(`Failed to load bundle.json: ${response.statusText}`);
+    }
+    return await response.json();
+}
+
+/**
+ * Load bundle.ndjson, drawing the graph from the header on when its nodes
+ * have precomputed positions; resolves to null without a streamed bundle
+ */
+async function fetchStreamedBundle() {
+    const loading = document.getElementById('loading');
+    const data = await BundleStream.load(dataUrl('bundle.ndjson'), {
+        header: data => {
+            // The in-browser layout needs the whole graph
+            if (!data.metadata.layout) return;
+            console.log('Using streamed bundle, drawing while it loads');
+            GraphManager.init(data, true);
+        },
+        nodes: items => GraphManager.loading && GraphManager.addElements(items, []),
+        edges: items => GraphManager.loading && GraphManager.addElements([], items),
+        progress: data => {
+            const total = data.metadata ? data.metadata.node_count + data.metadata.edge_count : 0;
+            const loaded = data.nodes.length + data.edges.length;
+            loading.textContent = loaded < total
+                ? `Loading graph data... ${Math.floor(100 * loaded / total)}%`
+                : 'Loading module data...';
+        }
+    });
+    if (data && GraphManager.loading) GraphManager.finishLoading();
+    return data;
+}
+
 /**
  * Show/hide loading indicator
  */
@@ -91,7 +91,7 @@ const PanelManager = {
     /**
      * Open panel with module details
      */
-    open(moduleName, nodeId) {
+    async open(moduleName, nodeId) {
         this.currentModule = moduleName;
 
         // Add to history if different from current
@@ -99,8 +99,29 @@ const PanelManager = {
             this.history.push(moduleName);
         }
 
-        // Get module data
-        const moduleData = window.bundleData.modules[moduleName];
+        // Get module data (details may be loaded on demand)
+        const summary = window.bundleData.modules[moduleName];
+
+        if (!summary) {
+            this.displayError(moduleName);
+            return;
+        }
+
+        if (ModuleDetails.isSplit()) {
+            this.displayLoading(moduleName, summary);
+        }
+
+        let moduleData;
+        try {
+            moduleData = await ModuleDetails.get(moduleName);
+        } catch (error) {
+            console.error('Error loading module details:', error);
+        }
+
+        // Another module was selected while the details were loading
+        if (this.currentModule !== moduleName) {
+            return;
+        }
 
         if (!moduleData) {
             this.displayError(moduleName);
@@ -131,6 +152,19 @@ const PanelManager = {
         document.getElementById('module-type').textContent = moduleData.type || 'N/A';
         document.getElementById('module-plugin').textContent = moduleData.plugin || 'N/A';
 
+        // Time per event, for bundles built with a timing report
+        const timing = TimingView.describe(nodeId);
+        document.getElementById('module-timing').textContent = timing || '';
+        document.getElementById('module-timing-section').style.display = timing ? '' : 'none';
+
+        // What dropping the module would free (wasted-work analysis)
+        const usage = WastedWork.describe(nodeId);
+        document.getElementById('module-usage').textContent = usage || '';
+        document.getElementById('module-usage-section').style.display = usage ? '' : 'none';
+        const showRemovable = document.getElementById('show-removable-btn');
+        showRemovable.style.display = usage && !usage.startsWith('Wasted') ? '' : 'none';
+        showRemovable.onclick = () => WastedWork.highlight(WastedWork.removableIds(nodeId));
+
         // Input tags
         this.displayInputTags(moduleData.inputTags || []);
 
@@ -289,6 +323,20 @@ const PanelManager = {
         });
     },
 
+    /**
+     * Show the module summary while its details are being fetched
+     */
+    displayLoading(moduleName, summary) {
+        document.getElementById('module-name').textContent = moduleName;
+        document.getElementById('module-type').textContent = summary.type || 'N/A';
+        document.getElementById('module-plugin').textContent = summary.plugin || 'N/A';
+        document.getElementById('input-tags-list').innerHTML = '<div class="empty-state">Loading...</div>';
+        document.getElementById('parameters-list').innerHTML = '<div class="empty-state">Loading...</div>';
+        document.getElementById('raw-snippet').textContent = 'Loading...';
+
+        this.panel.classList.remove('hidden');
+    },
+
     /**
      * Display error message
      */
@@ -0,0 +1,274 @@
+/**
+ * pathview.js - Path-level view of large graphs
+ * Bundles built with a coarse graph (preprocess/coarsen.py) start with
+ * one supernode per Path when they have more than `threshold` nodes.
+ * Tapping a supernode expands it into its modules, right-clicking a
+ * module collapses its Path again. Edges touching a collapsed Path are
+ * merged into one edge per pair of visible nodes, weighted by the number
+ * of module edges behind it.
+ */
+
+const PathView = {
+    threshold: 2000,
+    data: null,
+    active: false,
+    groups: new Map(),
+    groupOf: new Map(),
+    expanded: new Set(),
+    toggleBtn: null,
+
+    /**
+     * Set up the groups of a bundle; collapsed only above the threshold,
+     * or expanded when the graph already shows every module
+     */
+    init(data, allExpanded = false) {
+        this.data = data;
+        this.groups = new Map();
+        this.groupOf = new Map();
+        this.expanded = new Set();
+        this.active = Boolean(data.coarse);
+
+        if (this.active) {
+            data.coarse.groups.forEach(group => {
+                this.groups.set(group.id, group);
+                group.nodes.forEach(id => this.groupOf.set(id, group.id));
+            });
+            // A streamed bundle has no nodes yet, only their count
+            if (allExpanded || (data.metadata?.node_count ?? data.nodes.length) <= this.threshold) {
+                this.groups.forEach((group, id) => this.expanded.add(id));
+            }
+            console.log(`Path view: ${this.groups.size} Paths, ${this.collapsedCount()} collapsed`);
+        }
+
+        this.nodesById = null;
+        this.setupToggle();
+    },
+
+    /**
+     * Show the toggle button only for bundles with a coarse graph
+     */
+    setupToggle() {
+        if (!this.toggleBtn) {
+            this.toggleBtn = document.getElementById('path-view-btn');
+            if (!this.toggleBtn) return;
+            this.toggleBtn.addEventListener('click', () => this.toggle());
+        }
+        this.toggleBtn.style.display = this.active ? '' : 'none';
+        this.updateToggle();
+    },
+
+    updateToggle() {
+        if (this.toggleBtn) {
+            this.toggleBtn.textContent = this.collapsedCount() > 0 ? 'Show all modules' : 'Group by Path';
+        }
+    },
+
+    collapsedCount() {
+        return this.groups.size - this.expanded.size;
+    },
+
+    /**
+     * ID of the element standing for a node: its Path while collapsed
+     */
+    visible(id) {
+        const group = this.groupOf.get(id);
+        return group && !this.expanded.has(group) ? group : id;
+    },
+
+    /**
+     * Cytoscape elements for the current state, for GraphManager.init
+     */
+    elements(withPosition) {
+        const nodes = [];
+        this.data.nodes.forEach(n => {
+            if (this.visible(n.id) === n.id) nodes.push(GraphManager.nodeElement(n, withPosition));
+        });
+        this.groups.forEach((group, id) => {
+            if (!this.expanded.has(id)) nodes.push(this.groupElement(group));
+        });
+        // With every Path collapsed the edges are those of the coarse graph
+        if (this.active && this.expanded.size === 0) {
+            return { nodes, edges: this.data.coarse.edges.map(e => this.aggregateElement(e.source, e.target, e.weight)) };
+        }
+        return { nodes, edges: Array.from(this.visibleEdges().values()) };
+    },
+
+    /**
+     * Cytoscape element for a collapsed Path
+     */
+    groupElement(group, position) {
+        const element = {
+            group: 'nodes',
+            classes: 'group',
+            data: {
+                id: group.id,
+                label: `${group.name} (${group.nodes.length})`,
+                name: group.name,
+                type: group.type,
+                size: group.nodes.length,
+                time: group.time
+            }
+        };
+        position = position || (typeof group.x === 'number' ? { x: group.x, y: group.y } : null);
+        if (position) element.position = position;
+        return element;
+    },
+
+    /**
+     * Edge elements between the visible nodes, keyed by edge ID
+     */
+    visibleEdges() {
+        const edges = new Map();
+        this.data.edges.forEach(e => {
+            const source = this.visible(e.source);
+            const target = this.visible(e.target);
+            if (source === e.source && target === e.target) {
+                edges.set(`${source}-${target}`, GraphManager.edgeElement(e));
+                return;
+            }
+            // Edges inside a collapsed Path are not drawn
+            if (source === target) return;
+
+            const id = `${source}-${target}`;
+            const existing = edges.get(id);
+            if (existing) {
+                existing.data.weight++;
+            } else {
+                edges.set(id, this.aggregateElement(source, target, 1));
+            }
+        });
+        return edges;
+    },
+
+    /**
+     * Cytoscape element for the edges between two visible nodes, at
+     * least one of them a collapsed Path
+     */
+    aggregateElement(source, target, weight) {
+        return {
+            group: 'edges',
+            classes: 'aggregate',
+            data: { id: `${source}-${target}`, source, target, weight }
+        };
+    },
+
+    /**
+     * Replace the graph's edges with the ones of the current state
+     */
+    syncEdges() {
+        const cy = GraphManager.cy;
+        const wanted = this.visibleEdges();
+        cy.edges().forEach(edge => {
+            const element = wanted.get(edge.id());
+            if (!element) {
+                edge.remove();
+            } else {
+                if (edge.hasClass('aggregate')) edge.data('weight', element.data.weight);
+                wanted.delete(edge.id());
+            }
+        });
+        cy.add(Array.from(wanted.values()));
+    },
+
+    /**
+     * Replace collapsed Paths by their modules
+     */
+    expand(groupIds) {
+        const cy = GraphManager.cy;
+        const collapsed = groupIds.filter(id => this.groups.has(id) && !this.expanded.has(id));
+        if (collapsed.length === 0) return;
+
+        cy.batch(() => {
+            collapsed.forEach(groupId => {
+                const supernode = cy.getElementById(groupId);
+                const center = supernode.nonempty() ? supernode.position() : { x: 0, y: 0 };
+                supernode.remove();
+                this.expanded.add(groupId);
+                cy.add(this.groups.get(groupId).nodes.map((id, i) => this.memberElement(id, i, center)));
+            });
+            this.syncEdges();
+        });
+        this.updateToggle();
+    },
+
+    /**
+     * Cytoscape element for a module of an expanded Path; modules without
+     * a precomputed position are spread around the Path's position
+     */
+    memberElement(id, index, center) {
+        if (!this.nodesById || this.nodesById.size !== this.data.nodes.length) {
+            this.nodesById = new Map(this.data.nodes.map(n => [n.id, n]));
+        }
+        const n = this.nodesById.get(id);
+        const element = GraphManager.nodeElement(n, false);
+        if (typeof n.x === 'number' && typeof n.y === 'number') {
+            element.position = { x: n.x, y: n.y };
+        } else {
+            const angle = index * 2.4;
+            const radius = 40 * Math.sqrt(index);
+            element.position = { x: center.x + radius * Math.cos(angle), y: center.y + radius * Math.sin(angle) };
+        }
+        return element;
+    },
+
+    /**
+     * Replace expanded Paths by their supernodes
+     */
+    collapse(groupIds) {
+        const cy = GraphManager.cy;
+        const expanded = groupIds.filter(id => this.expanded.has(id));
+        if (expanded.length === 0) return;
+
+        cy.batch(() => {
+            expanded.forEach(groupId => {
+                const group = this.groups.get(groupId);
+                const members = cy.collection();
+                group.nodes.forEach(id => members.merge(cy.getElementById(id)));
+                const box = members.boundingBox();
+                const center = members.nonempty() ? { x: (box.x1 + box.x2) / 2, y: (box.y1 + box.y2) / 2 } : null;
+                members.remove();
+                this.expanded.delete(groupId);
+                cy.add(this.groupElement(group, typeof group.x === 'number' ? null : center));
+            });
+            this.syncEdges();
+        });
+        this.updateToggle();
+    },
+
+    /**
+     * Expand the Paths holding the given node IDs
+     */
+    reveal(ids) {
+        if (!this.active) return;
+        const groups = new Set();
+        ids.forEach(id => {
+            const group = this.groupOf.get(id);
+            if (group && !this.expanded.has(group)) groups.add(group);
+        });
+        if (groups.size > 0) {
+            console.log(`Path view: expanding ${groups.size} Paths`);
+            this.expand(Array.from(groups));
+        }
+    },
+
+    /**
+     * Expand every Path, e.g. before a traversal of the local graph
+     */
+    expandAll() {
+        if (this.active) this.expand(Array.from(this.groups.keys()));
+    },
+
+    collapseAll() {
+        if (this.active) this.collapse(Array.from(this.expanded));
+    },
+
+    toggle() {
+        if (GraphManager.loading) return;
+        if (this.collapsedCount() > 0) {
+            this.expandAll();
+        } else {
+            this.collapseAll();
+        }
+        GraphManager.fit();
+    }
+};
@@ -0,0 +1,152 @@
+/**
+ * reach.js - Precomputed reachability index
+ * Answers all-levels upstream/downstream and "between" queries from the
+ * interval labels stored in the bundle instead of walking the graph.
+ * The index layout is documented in preprocess/reachability.py.
+ */
+
+const Reachability = {
+    data: null,
+    ids: null,
+    indexById: null,
+
+    /**
+     * Use the index of a bundle, if it has one
+     */
+    init(bundleData) {
+        this.data = bundleData.reachability || null;
+        this.ids = null;
+        this.indexById = null;
+        if (!this.data) return;
+
+        this.ids = bundleData.nodes.map(n => n.id);
+        this.indexById = new Map();
+        this.ids.forEach((id, i) => {
+            if (!this.indexById.has(id)) this.indexById.set(id, i);
+        });
+    },
+
+    /**
+     * Whether the loaded bundle carries an index
+     */
+    isAvailable() {
+        return this.data !== null;
+    },
+
+    /**
+     * Whether post-order number lies in one of a component's intervals
+     */
+    contains(labels, comp, number) {
+        const flat = labels.intervals;
+        // Binary search over the sorted interval starts (even positions)
+        let lo = labels.offsets[comp] / 2;
+        let hi = labels.offsets[comp + 1] / 2;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (flat[2 * mid] <= number) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo > labels.offsets[comp] / 2 && flat[2 * lo - 1] >= number;
+    },
+
+    /**
+     * Node indices of the components covered by a component's intervals
+     */
+    expand(labels, comp) {
+        const { memberOffsets, members } = this.data;
+        const flat = labels.intervals;
+        const result = [];
+        for (let k = labels.offsets[comp]; k < labels.offsets[comp + 1]; k += 2) {
+            for (let number = flat[k]; number <= flat[k + 1]; number++) {
+                const c = labels.order[number];
+                for (let m = memberOffsets[c]; m < memberOffsets[c + 1]; m++) {
+                    result.push(members[m]);
+                }
+            }
+        }
+        return result;
+    },
+
+    /**
+     * True if there is a path from node index a to node index b (or a === b)
+     */
+    isAncestor(a, b) {
+        const { component, down } = this.data;
+        return this.contains(down, component[a], down.post[component[b]]);
+    },
+
+    /**
+     * Node indices reachable from a node index, including itself
+     */
+    descendants(i) {
+        return this.expand(this.data.down, this.data.component[i]);
+    },
+
+    /**
+     * Node indices that reach a node index, including itself
+     */
+    ancestors(i) {
+        return this.expand(this.data.up, this.data.component[i]);
+    },
+
+    /**
+     * Node indices on some path from a to b (both included), or [] if
+     * b is not reachable from a
+     */
+    between(a, b) {
+        if (!this.isAncestor(a, b)) return [];
+        const { component, up } = this.data;
+        const target = component[b];
+        return this.descendants(a).filter(n => this.contains(up, target, up.post[component[n]]));
+    },
+
+    /**
+     * Dependencies of a node ID over all levels, as { nodes, edges }, or
+     * null without an index. Supports upstream, downstream and paths.
+     */
+    dependencies(nodeId, direction) {
+        if (!this.isAvailable() || !this.indexById.has(nodeId)) return null;
+        const i = this.indexById.get(nodeId);
+
+        if (direction === 'upstream') return this.toCollections(this.ancestors(i));
+        if (direction === 'downstream') return this.toCollections(this.descendants(i));
+        if (direction === 'paths') {
+            const upstream = this.toCollections(this.ancestors(i));
+            const downstream = this.toCollections(this.descendants(i));
+            return {
+                nodes: upstream.nodes.union(downstream.nodes),
+                edges: upstream.edges.union(downstream.edges)
+            };
+        }
+        return null;
+    },
+
+    /**
+     * Modules on some path between two node IDs (in either direction),
+     * as { nodes, edges }, or null without an index
+     */
+    pathsBetween(sourceId, targetId) {
+        if (!this.isAvailable() || !this.indexById.has(sourceId) || !this.indexById.has(targetId)) {
+            return null;
+        }
+        const a = this.indexById.get(sourceId);
+        const b = this.indexById.get(targetId);
+        const found = this.isAncestor(a, b) ? this.between(a, b) : this.between(b, a);
+        return this.toCollections(found);
+    },
+
+    /**
+     * Map node indices onto the graph as { nodes, edges }, with every
+     * edge between two of the nodes
+     */
+    toCollections(indices) {
+        const cy = GraphManager.cy;
+        const ids = new Set(indices.map(i => this.ids[i]));
+        PathView.reveal(ids);
+        const nodes = cy.collection();
+        ids.forEach(id => nodes.merge(cy.getElementById(id)));
+        const edges = nodes.connectedEdges().filter(edge =>
+            ids.has(edge.source().id()) && ids.has(edge.target().id()));
+        return { nodes, edges };
+    }
+};
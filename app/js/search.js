@@ -1,6 +1,7 @@
 /**
  * search.js - Search functionality
- * Handles module search and highlighting
+ * Handles module search and highlighting. Plain text matches node labels;
+ * structured queries (plugin:, consumes:, ptMin>1, ...) use SearchIndex.
  */
 
 const SearchManager = {
@@ -36,7 +37,7 @@ const SearchManager = {
     /**
      * Perform search
      */
-    search() {
+    async search() {
         const query = this.searchInput.value.trim();
 
         if (!query) {
@@ -45,11 +46,22 @@ const SearchManager = {
 
         console.log('Searching for:', query);
 
-        // Find matching nodes (case-insensitive substring match)
-        const matches = GraphManager.cy.nodes().filter(node => {
-            const label = node.data('label') || '';
-            return label.toLowerCase().includes(query.toLowerCase());
-        });
+        let matches;
+        if (SearchIndex.isStructured(query)) {
+            matches = await this.searchIndex(query);
+            if (!matches) return;
+        } else {
+            // Find matching nodes (case-insensitive substring match),
+            // expanding the Paths they are in
+            const needle = query.toLowerCase();
+            PathView.reveal(Object.entries(window.bundleData.labelToId || {})
+                .filter(([label]) => label.toLowerCase().includes(needle))
+                .map(([, id]) => id));
+            matches = GraphManager.cy.nodes().filter(node => {
+                const label = node.data('label') || '';
+                return label.toLowerCase().includes(needle) && !node.hasClass('group');
+            });
+        }
 
         if (matches.length === 0) {
             alert(`No modules found matching "${query}"`);
@@ -99,6 +111,34 @@ const SearchManager = {
         }
     },
 
+    /**
+     * Run a structured query against the search index and return the
+     * nodes of the matching modules, or null after reporting an error
+     */
+    async searchIndex(query) {
+        if (!SearchIndex.isAvailable()) {
+            alert('This bundle has no search index; rebuild it to use plugin:, consumes:, param: and comparisons');
+            return null;
+        }
+
+        let result;
+        try {
+            result = await SearchIndex.search(query);
+        } catch (error) {
+            alert(`Search failed: ${error.message}`);
+            return null;
+        }
+
+        const matches = GraphManager.cy.collection();
+        const labelToId = window.bundleData.labelToId || {};
+        PathView.reveal(result.modules.map(name => labelToId[name]).filter(Boolean));
+        result.modules.forEach(name => {
+            if (labelToId[name]) matches.merge(GraphManager.cy.getElementById(labelToId[name]));
+        });
+        console.log(`Index: ${result.total} modules, ${matches.length} of them in the graph`);
+        return matches;
+    },
+
     /**
      * Clear search
      */
@@ -0,0 +1,236 @@
+/**
+ * searchindex.js - Module search index
+ * Structured queries (plugin:, type:, consumes:, param:, name>value, ...)
+ * over the index written by preprocess/search_index.py, where the query
+ * syntax is documented. Server mode asks /api/search; static mode, or a
+ * server without the endpoint, loads data/bundle_search.js and runs the
+ * query here.
+ */
+
+const SearchIndex = {
+    data: null,
+    pending: null,
+    lower: {},
+
+    PREFIXES: ['plugin', 'type', 'consumes', 'param'],
+    COMPARISON: /^([A-Za-z_][\w.]*)(>=|<=|=|>|<)(.+)$/,
+    NUMBER: /^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$/,
+
+    /**
+     * True when the bundle was built with a search index
+     */
+    isAvailable() {
+        return Boolean(window.bundleData?.metadata?.search);
+    },
+
+    /**
+     * True for queries that need the index rather than a label scan
+     */
+    isStructured(query) {
+        return query.split(/\s+/).some(term =>
+            this.COMPARISON.test(term) || this.PREFIXES.some(p => term.startsWith(`${p}:`)));
+    },
+
+    /**
+     * Run a query; resolves to { modules, total } with module names in
+     * bundle order
+     */
+    async search(query) {
+        if (!isStaticMode()) {
+            const result = await GraphApi.query('search', { q: query });
+            if (result) return { modules: result.modules, total: result.total };
+        }
+        await this.load();
+        return this.run(query);
+    },
+
+    /**
+     * Inject data/bundle_search.js once; it calls register when loaded
+     */
+    load() {
+        if (this.data) return Promise.resolve(this.data);
+        if (this.pending) return this.pending.promise;
+
+        const info = window.bundleData.metadata.search;
+        const script = document.createElement('script');
+        const pending = {};
+        pending.promise = new Promise((resolve, reject) => {
+            pending.resolve = resolve;
+            script.onerror = () => reject(new Error('Failed to load the search index'));
+        }).finally(() => {
+            this.pending = null;
+            script.remove();
+        });
+        this.pending = pending;
+
+        script.src = dataUrl(`${info.path}.js`);
+        document.head.appendChild(script);
+        return pending.promise;
+    },
+
+    /**
+     * Called by data/bundle_search.js with the index
+     */
+    register(data) {
+        this.data = data;
+        this.lower = {};
+        if (this.pending) this.pending.resolve(data);
+    },
+
+    /**
+     * obj[key] if obj has it as its own property, else fallback
+     */
+    own(obj, key, fallback) {
+        return obj && Object.prototype.hasOwnProperty.call(obj, key) ? obj[key] : fallback;
+    },
+
+    ungaps(gaps) {
+        const values = new Array(gaps.length);
+        let total = 0;
+        for (let i = 0; i < gaps.length; i++) {
+            total += gaps[i];
+            values[i] = total;
+        }
+        return values;
+    },
+
+    /**
+     * Intersection of two sorted arrays
+     */
+    intersect(a, b) {
+        const result = [];
+        let i = 0;
+        let j = 0;
+        while (i < a.length && j < b.length) {
+            if (a[i] < b[j]) i++;
+            else if (a[i] > b[j]) j++;
+            else {
+                result.push(a[i]);
+                i++;
+                j++;
+            }
+        }
+        return result;
+    },
+
+    trigrams(text) {
+        const grams = new Set();
+        for (let i = 0; i + 3 <= text.length; i++) grams.add(text.slice(i, i + 3));
+        return grams;
+    },
+
+    lowercase(key) {
+        if (!this.lower[key]) this.lower[key] = this.data[key].map(s => s.toLowerCase());
+        return this.lower[key];
+    },
+
+    /**
+     * Indices of the strings containing text (case-insensitive)
+     */
+    substring(text, stringsKey, gramsKey) {
+        text = text.toLowerCase();
+        const strings = this.lowercase(stringsKey);
+        const grams = [...this.trigrams(text)];
+        if (grams.length === 0) {
+            return strings.flatMap((s, i) => (s.includes(text) ? [i] : []));
+        }
+
+        const postings = this.data[gramsKey];
+        if (grams.some(gram => !this.own(postings, gram))) return [];
+        // Intersect from the shortest posting list, then check the full text
+        const lists = grams.map(gram => postings[gram]).sort((a, b) => a.length - b.length);
+        let candidates = this.ungaps(lists[0]);
+        for (const gaps of lists.slice(1)) {
+            candidates = this.intersect(candidates, this.ungaps(gaps));
+            if (candidates.length === 0) return [];
+        }
+        return candidates.filter(i => strings[i].includes(text));
+    },
+
+    byColumn(column, matches) {
+        const wanted = new Set(matches);
+        return this.data[column].flatMap((value, i) => (wanted.has(value) ? [i] : []));
+    },
+
+    /**
+     * First position in a sorted array whose value is > x (or >= x with left)
+     */
+    bisect(values, x, left) {
+        let lo = 0;
+        let hi = values.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (left ? values[mid] < x : values[mid] <= x) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    },
+
+    compare(name, op, value) {
+        const result = new Set();
+        if (op === '=') {
+            this.ungaps(this.own(this.own(this.data.params, name, {}), value, [])).forEach(i => result.add(i));
+        }
+        if (!this.NUMBER.test(value.trim())) {
+            if (op !== '=') throw new Error(`Expected a number after ${name}${op}`);
+            return [...result];
+        }
+
+        const number = Number(value.trim());
+        const entry = this.own(this.data.numeric, name, null);
+        if (entry) {
+            const values = entry.values;
+            const [start, end] = {
+                '=': [this.bisect(values, number, true), this.bisect(values, number, false)],
+                '>': [this.bisect(values, number, false), values.length],
+                '>=': [this.bisect(values, number, true), values.length],
+                '<': [0, this.bisect(values, number, true)],
+                '<=': [0, this.bisect(values, number, false)]
+            }[op];
+            for (let k = start; k < end; k++) result.add(entry.modules[k]);
+        }
+        return [...result];
+    },
+
+    term(term) {
+        const colon = term.indexOf(':');
+        const prefix = colon >= 0 ? term.slice(0, colon) : null;
+        const rest = term.slice(colon + 1);
+        if (this.PREFIXES.includes(prefix)) {
+            if (prefix === 'plugin') {
+                return this.byColumn('modulePlugin', this.substring(rest, 'plugins', 'pluginTrigrams'));
+            }
+            if (prefix === 'type') {
+                const types = this.lowercase('types');
+                const matches = types.flatMap((t, i) => (t.includes(rest.toLowerCase()) ? [i] : []));
+                return this.byColumn('moduleType', matches);
+            }
+            if (prefix === 'consumes') {
+                return this.ungaps(this.own(this.data.consumers, rest, []));
+            }
+            const params = this.own(this.data.params, rest, {});
+            return [...new Set(Object.values(params).flatMap(gaps => this.ungaps(gaps)))];
+        }
+
+        const comparison = term.match(this.COMPARISON);
+        if (comparison) return this.compare(comparison[1], comparison[2], comparison[3]);
+        return this.substring(term, 'names', 'nameTrigrams');
+    },
+
+    /**
+     * Run a query against the loaded index
+     */
+    run(query) {
+        const terms = query.split(/\s+/).filter(Boolean);
+        if (terms.length === 0) throw new Error('Empty query');
+
+        let result = null;
+        for (const term of terms) {
+            const matches = this.term(term);
+            result = result === null ? new Set(matches) : new Set(matches.filter(i => result.has(i)));
+            if (result.size === 0) return { modules: [], total: 0 };
+        }
+        const ordered = [...result].sort((a, b) => a - b);
+        return { modules: ordered.map(i => this.data.names[i]), total: ordered.length };
+    }
+};
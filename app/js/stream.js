@@ -0,0 +1,86 @@
+/**
+ * stream.js - Progressive loading of bundle.ndjson
+ * The streamed bundle (written by preprocess/stream_bundle.py) is one
+ * JSON record per line: a header with the metadata and coarse graph,
+ * batches of nodes and edges, then labelToId, module records and the
+ * other keys. Records are parsed as they arrive, so the graph can be
+ * drawn batch by batch while the rest downloads.
+ */
+
+const BundleStream = {
+    version: 1,
+
+    /**
+     * Download and assemble a streamed bundle; resolves to the bundle
+     * data, or null when there is no streamed bundle.
+     *
+     * handlers.header(data) is called once the header is in, and
+     * handlers.nodes(items) / handlers.edges(items) / handlers.progress(data)
+     * for every batch after it has been added to data.
+     */
+    async load(url, handlers = {}) {
+        const response = await fetch(url);
+        if (!response.ok) return null;
+
+        const data = { nodes: [], edges: [], modules: {} };
+        let end = null;
+        let batches = 0;
+
+        const apply = (line) => {
+            if (!line) return;
+            const record = JSON.parse(line);
+            const { type } = record;
+            if (type === 'header') {
+                if (record.version !== this.version) {
+                    throw new Error(`Unsupported bundle.ndjson version ${record.version}`);
+                }
+                Object.assign(data, record);
+                delete data.type;
+                delete data.version;
+                if (handlers.header) handlers.header(data);
+            } else if (type === 'nodes' || type === 'edges') {
+                for (const item of record.items) data[type].push(item);
+                batches++;
+                if (handlers[type]) handlers[type](record.items);
+            } else if (type === 'modules') {
+                Object.assign(data.modules, record.items);
+            } else if (type === 'end') {
+                end = record;
+            } else {
+                data[type] = record.value;
+            }
+            if (handlers.progress) handlers.progress(data);
+        };
+
+        if (response.body && response.body.getReader) {
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            // Text after the last newline; long records span many chunks
+            let pending = [];
+            for (;;) {
+                const { done, value } = await reader.read();
+                if (done) break;
+                const text = decoder.decode(value, { stream: true });
+                const last = text.lastIndexOf('\n');
+                if (last < 0) {
+                    pending.push(text);
+                    continue;
+                }
+                const lines = (pending.join('') + text.slice(0, last)).split('\n');
+                pending = [text.slice(last + 1)];
+                const before = batches;
+                lines.forEach(apply);
+                // Let the browser paint the batches added so far
+                if (batches > before) await new Promise(resolve => setTimeout(resolve, 0));
+            }
+            apply(pending.join('') + decoder.decode());
+        } else {
+            (await response.text()).split('\n').forEach(apply);
+        }
+
+        if (!end || end.nodes !== data.nodes.length || end.edges !== data.edges.length) {
+            throw new Error('bundle.ndjson is truncated');
+        }
+        return data;
+    }
+};
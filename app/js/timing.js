@@ -0,0 +1,140 @@
+/**
+ * timing.js - Module timing overlay
+ * Bundles built with --timing (preprocess/timing.py) carry each module's
+ * time per event, its slack and the critical path. Nodes can be colored
+ * by time, from pale yellow (fast) to dark red (slowest) on a log scale,
+ * and the critical path shown on its own; the side panel lists the time
+ * and slack of the selected module.
+ */
+
+const TimingView = {
+    timing: null,
+    coloring: false,
+    maxLog: 0,
+    colorBtn: null,
+    criticalBtn: null,
+
+    /**
+     * Copy the per-node times into the bundle nodes and the graph; hides
+     * the buttons for bundles without timing
+     */
+    init(data) {
+        this.timing = data.timing || null;
+        if (this.coloring) {
+            this.coloring = false;
+            GraphManager.cy.style().update();
+        }
+        this.setupButtons();
+        if (!this.timing) return;
+
+        const { time, slack } = this.timing;
+        const timeById = new Map();
+        const slackById = new Map();
+        data.nodes.forEach((n, i) => {
+            n.time = time[i];
+            n.slack = slack[i];
+            timeById.set(n.id, time[i]);
+            slackById.set(n.id, slack[i]);
+        });
+        PathView.groups.forEach(group => {
+            group.time = group.nodes.reduce((sum, id) => sum + (timeById.get(id) || 0), 0);
+        });
+
+        const cy = GraphManager.cy;
+        cy.batch(() => {
+            cy.nodes().forEach(node => {
+                const group = PathView.groups.get(node.id());
+                if (group) {
+                    node.data('time', group.time);
+                } else if (timeById.has(node.id())) {
+                    node.data({ time: timeById.get(node.id()), slack: slackById.get(node.id()) });
+                }
+            });
+        });
+        // Collapsed Paths are colored on the same scale as modules
+        let max = time.reduce((a, b) => Math.max(a, b), 0);
+        PathView.groups.forEach(group => { max = Math.max(max, group.time); });
+        this.maxLog = Math.log1p(max);
+
+        console.log(`Timing: ${this.timing.matched} modules timed, critical path ` +
+            `${this.format(this.timing.criticalPath.time)} over ${this.timing.criticalPath.nodes.length} modules`);
+    },
+
+    setupButtons() {
+        if (!this.colorBtn) {
+            this.colorBtn = document.getElementById('timing-color-btn');
+            this.criticalBtn = document.getElementById('critical-path-btn');
+            if (!this.colorBtn || !this.criticalBtn) return;
+            this.colorBtn.addEventListener('click', () => this.toggleColoring());
+            this.criticalBtn.addEventListener('click', () => this.showCriticalPath());
+        }
+        const display = this.timing ? '' : 'none';
+        this.colorBtn.style.display = display;
+        this.criticalBtn.style.display = display;
+        this.colorBtn.textContent = 'Color by time';
+    },
+
+    /**
+     * Node color for a time per event, or null without timing coloring
+     */
+    color(time) {
+        if (!this.coloring || typeof time !== 'number') return null;
+        const t = this.maxLog > 0 ? Math.log1p(time) / this.maxLog : 0;
+        // Pale yellow -> orange -> dark red
+        const hue = 55 * (1 - t);
+        const lightness = 88 - 58 * t;
+        return `hsl(${hue.toFixed(0)}, 90%, ${lightness.toFixed(0)}%)`;
+    },
+
+    format(ms) {
+        if (ms >= 1000) return `${(ms / 1000).toFixed(2)} s/event`;
+        return `${ms.toFixed(ms >= 10 ? 1 : 3)} ms/event`;
+    },
+
+    toggleColoring() {
+        if (!this.timing) return;
+        this.coloring = !this.coloring;
+        this.colorBtn.textContent = this.coloring ? 'Default colors' : 'Color by time';
+        GraphManager.cy.style().update();
+    },
+
+    /**
+     * Show only the critical path, dependencies first
+     */
+    showCriticalPath() {
+        if (!this.timing || GraphManager.loading) return;
+        const cy = GraphManager.cy;
+        const ids = this.timing.criticalPath.nodes;
+        PathView.reveal(ids);
+
+        const chain = cy.collection();
+        ids.forEach(id => chain.merge(cy.getElementById(id)));
+        // The chain runs from each module to the one it depends on
+        const edges = cy.collection();
+        for (let i = 1; i < ids.length; i++) {
+            edges.merge(cy.getElementById(`${ids[i]}-${ids[i - 1]}`));
+        }
+
+        cy.batch(() => {
+            cy.elements().removeClass('highlighted').addClass('dimmed');
+            chain.removeClass('dimmed').addClass('highlighted');
+            edges.removeClass('dimmed');
+        });
+        cy.fit(chain, 50);
+        console.log(`Critical path: ${this.format(this.timing.criticalPath.time)}, ${ids.length} modules`);
+    },
+
+    /**
+     * Time, slack and critical-path membership of a module for the side
+     * panel, or null without timing
+     */
+    describe(nodeId) {
+        if (!this.timing || !nodeId) return null;
+        const node = GraphManager.cy.getElementById(nodeId);
+        const time = node.nonempty() ? node.data('time') : undefined;
+        if (typeof time !== 'number') return null;
+        const slack = node.data('slack');
+        const critical = slack === 0 ? ' (critical path)' : `, slack ${this.format(slack)}`;
+        return `${this.format(time)}${critical}`;
+    }
+};
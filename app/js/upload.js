@@ -1,9 +1,24 @@
 /**
  * upload.js - File upload functionality
  * Handles uploading dependency.gv and dumpConfig.py, and regenerating the bundle
+ * The server queues a rebuild job; its progress is polled from /jobs/<id>
  */
 
 const UploadManager = {
+    serverUrl: 'http://localhost:8000',
+    pollInterval: 500,
+    // While true, LiveUpdates leaves the update after the rebuild to this upload
+    busy: false,
+
+    stageLabels: {
+        dot_parse: 'Parsing DOT file',
+        layout: 'Computing layout',
+        reachability: 'Indexing reachability',
+        config_parse: 'Parsing config file',
+        validation: 'Validating InputTags',
+        write: 'Writing bundle'
+    },
+
     modal: null,
     form: null,
     dotFileInput: null,
@@ -128,6 +143,7 @@ const UploadManager = {
         this.uploadProgress.classList.remove('hidden');
         this.uploadStatus.textContent = 'Uploading files...';
         this.submitBtn.disabled = true;
+        this.busy = true;
 
         try {
             // Create form data
@@ -135,31 +151,86 @@ const UploadManager = {
             formData.append('dotFile', dotFile);
             formData.append('configFile', configFile);
 
-            // Upload files
-            const response = await fetch('http://localhost:8000/upload', {
+            // Upload files to rebuild the bundle being viewed
+            const bundle = currentBundle();
+            const query = bundle ? `?${new URLSearchParams({ bundle })}` : '';
+            const response = await fetch(`${this.serverUrl}/upload${query}`, {
                 method: 'POST',
                 body: formData
             });
 
             const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.error || 'Upload failed');
+            }
 
-            if (result.success) {
-                this.uploadStatus.textContent = 'Bundle regenerated successfully! Reloading...';
+            // Follow the rebuild job until it finishes
+            const job = await this.waitForJob(result.jobId);
+            if (job.status !== 'done') {
+                throw new Error(job.error || 'Bundle generation failed');
+            }
 
-                // Wait a bit then reload the page
-                setTimeout(() => {
-                    window.location.reload();
-                }, 1500);
-            } else {
-                throw new Error(result.error || 'Upload failed');
+            // Apply the changes in place when the server has a patch from
+            // the loaded build, otherwise reload the page
+            const summary = await BundleDelta.update().catch(error => {
+                console.warn('Could not apply the delta update:', error);
+                return null;
+            });
+            if (summary) {
+                this.uploadStatus.textContent = `Bundle updated: ${summary.nodes} nodes changed, ` +
+                    `${summary.removedNodes} removed; ${summary.modules} modules changed, ` +
+                    `${summary.removedModules} removed`;
+                setTimeout(() => this.closeModal(), 1500);
+                return;
             }
 
+            this.uploadStatus.textContent = 'Bundle regenerated successfully! Reloading...';
+
+            // Wait a bit then reload the page
+            setTimeout(() => {
+                window.location.reload();
+            }, 1500);
+
         } catch (error) {
             console.error('Upload error:', error);
             this.uploadStatus.textContent = `Error: ${error.message}`;
             this.submitBtn.disabled = false;
 
             alert(`Upload failed: ${error.message}`);
+        } finally {
+            this.busy = false;
+        }
+    },
+
+    /**
+     * Poll a rebuild job until it is done or failed, showing its stage
+     */
+    async waitForJob(jobId) {
+        while (true) {
+            const response = await fetch(`${this.serverUrl}/jobs/${jobId}`);
+            const job = await response.json();
+            if (!response.ok) {
+                throw new Error(job.error || `Job ${jobId} not found`);
+            }
+            if (job.status === 'done' || job.status === 'failed') {
+                return job;
+            }
+            this.uploadStatus.textContent = this.describeJob(job);
+            await new Promise(resolve => setTimeout(resolve, this.pollInterval));
+        }
+    },
+
+    /**
+     * Progress text for a queued or running job
+     */
+    describeJob(job) {
+        if (job.status === 'queued') {
+            const ahead = job.queuePosition || 0;
+            return ahead > 0 ? `Queued behind ${ahead} other build(s)...` : 'Queued...';
         }
+        const names = job.stages.map(stage => stage.name);
+        const step = names.indexOf(job.stage) + 1;
+        const label = this.stageLabels[job.stage] || 'Starting build';
+        return step > 0 ? `${label}... (step ${step} of ${names.length})` : `${label}...`;
     }
 };
@@ -0,0 +1,103 @@
+/**
+ * wasted.js - Wasted-work overlay
+ * Bundles carry the analysis of preprocess/wasted_work.py: which modules
+ * have products that never reach an OutputModule, EDAnalyzer or filter
+ * on a Path, and what dropping each module would make removable (its
+ * subtree in the dominator tree). The toolbar button shows the wasted
+ * modules; the side panel tells what dropping the selected one frees.
+ */
+
+const WastedWork = {
+    analysis: null,
+    indexById: new Map(),
+    children: null,
+    button: null,
+
+    /**
+     * Set up the analysis of a bundle; hides the button without one
+     */
+    init(data) {
+        this.analysis = data.wastedWork || null;
+        this.indexById = new Map();
+        this.children = null;
+        if (this.analysis) {
+            data.nodes.forEach((n, i) => this.indexById.set(n.id, i));
+            console.log(`Wasted work: ${this.analysis.wastedCount} of ${data.nodes.length} modules`);
+        }
+
+        if (!this.button) {
+            this.button = document.getElementById('wasted-work-btn');
+            if (!this.button) return;
+            this.button.addEventListener('click', () => this.showWasted());
+        }
+        this.button.style.display = this.analysis && this.analysis.wastedCount > 0 ? '' : 'none';
+    },
+
+    /**
+     * Highlight a set of node IDs and dim the rest
+     */
+    highlight(ids) {
+        const cy = GraphManager.cy;
+        PathView.reveal(ids);
+        const nodes = cy.collection();
+        ids.forEach(id => nodes.merge(cy.getElementById(id)));
+        cy.batch(() => {
+            cy.elements().removeClass('highlighted').addClass('dimmed');
+            nodes.removeClass('dimmed').addClass('highlighted');
+            nodes.edgesWith(nodes).removeClass('dimmed');
+        });
+        if (nodes.nonempty()) cy.fit(nodes, 50);
+    },
+
+    /**
+     * Show only the modules whose products are never used
+     */
+    showWasted() {
+        if (!this.analysis || GraphManager.loading) return;
+        const nodes = window.bundleData.nodes;
+        const ids = [];
+        this.analysis.wasted.forEach((wasted, i) => {
+            if (wasted) ids.push(nodes[i].id);
+        });
+        this.highlight(ids);
+    },
+
+    /**
+     * IDs of the modules removable once a module is dropped, itself first
+     */
+    removableIds(nodeId) {
+        const index = this.indexById.get(nodeId);
+        if (index === undefined) return [];
+        if (!this.children) {
+            this.children = new Map();
+            this.analysis.dominator.forEach((dominator, i) => {
+                if (dominator < 0) return;
+                if (!this.children.has(dominator)) this.children.set(dominator, []);
+                this.children.get(dominator).push(i);
+            });
+        }
+        const result = [index];
+        for (let k = 0; k < result.length; k++) {
+            (this.children.get(result[k]) || []).forEach(child => result.push(child));
+        }
+        const nodes = window.bundleData.nodes;
+        return result.map(i => nodes[i].id);
+    },
+
+    /**
+     * Text for the side panel, or null without the analysis
+     */
+    describe(nodeId) {
+        const index = this.indexById.get(nodeId);
+        if (!this.analysis || index === undefined) return null;
+        if (this.analysis.wasted[index]) {
+            return 'Wasted: its products reach no output, analyzer or Path filter';
+        }
+        const others = this.analysis.removable[index] - 1;
+        const time = this.analysis.removableTime
+            ? `, saving ${TimingView.format(this.analysis.removableTime[index])}` : '';
+        return others > 0
+            ? `Dropping it makes ${others} more module${others === 1 ? '' : 's'} removable${time}`
+            : `Dropping it frees no other module${time}`;
+    }
+};
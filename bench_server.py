@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent bundle fetches against server.py.
+
+Starts the previous single-threaded handler (TCPServer, files read from
+disk on every request, no validators) and the current threaded handler
+on a copy of a bundle, then runs concurrent clients against each and
+reports throughput and latency percentiles.
+
+Usage:
+    python bench_server.py [--bundle data/bundle.json] [--clients 16] [--requests 20]
+"""
+
+import argparse
+import functools
+import http.client
+import http.server
+import multiprocessing
+import shutil
+import socketserver
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import server
+
+
+class LegacyHandler(http.server.SimpleHTTPRequestHandler):
+    """The handler before the bundle cache: plain files, no-store."""
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        super().end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class QuietHandler(server.CORSRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(kind, directory, port_queue):
+    if kind == "legacy":
+        httpd = socketserver.TCPServer(("localhost", 0), functools.partial(LegacyHandler, directory=directory))
+    else:
+        httpd = server.ThreadingServer(("localhost", 0), functools.partial(QuietHandler, directory=directory))
+    port_queue.put(httpd.server_address[1])
+    httpd.serve_forever()
+
+
+def run_clients(port, url, clients, requests, headers):
+    """Return (total_seconds, latencies, total_bytes)."""
+    latencies = []
+    sizes = []
+    lock = threading.Lock()
+
+    def client():
+        local, local_sizes = [], []
+        for _ in range(requests):
+            start = time.perf_counter()
+            conn = http.client.HTTPConnection("localhost", port, timeout=120)
+            conn.request("GET", url, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            conn.close()
+            local.append(time.perf_counter() - start)
+            local_sizes.append(len(body))
+        with lock:
+            latencies.extend(local)
+            sizes.extend(local_sizes)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, latencies, sum(sizes)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--bundle", type=Path, default=Path(__file__).parent / "data" / "bundle.json")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    args = parser.parse_args()
+
+    if not args.bundle.exists():
+        parser.error(f"bundle not found: {args.bundle} (run preprocess/build_bundle.py first)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp) / "data"
+        data_dir.mkdir()
+        for path in args.bundle.parent.glob(args.bundle.name + "*"):
+            if not path.name.endswith(".tmp"):
+                shutil.copy2(path, data_dir / path.name)
+        url = f"/data/{args.bundle.name}"
+
+        scenarios = [
+            ("legacy", "full fetch", {"Accept-Encoding": "gzip, br"}),
+            ("threaded", "full fetch", {"Accept-Encoding": "identity"}),
+            ("threaded", "compressed", {"Accept-Encoding": "gzip, br"}),
+            ("threaded", "revalidate", None),
+        ]
+
+        print(f"Bundle: {args.bundle} ({args.bundle.stat().st_size / 1024 / 1024:.1f} MB), "
+              f"{args.clients} clients x {args.requests} requests\n")
+        print(f"{'server':<10}{'scenario':<13}{'req/s':>9}{'MB/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+
+        for kind, scenario, headers in scenarios:
+            queue = multiprocessing.Queue()
+            process = multiprocessing.Process(target=_serve, args=(kind, tmp, queue), daemon=True)
+            process.start()
+            port = queue.get(timeout=30)
+
+            if headers is None:
+                # Conditional requests with the ETag of the compressed representation
+                conn = http.client.HTTPConnection("localhost", port)
+                conn.request("GET", url, headers={"Accept-Encoding": "gzip, br"})
+                response = conn.getresponse()
+                response.read()
+                headers = {"Accept-Encoding": "gzip, br", "If-None-Match": response.getheader("ETag")}
+                conn.close()
+
+            run_clients(port, url, 2, 1, headers)  # warm up
+            elapsed, latencies, total_bytes = run_clients(port, url, args.clients, args.requests, headers)
+            process.terminate()
+            process.join()
+
+            print(f"{kind:<10}{scenario:<13}{len(latencies) / elapsed:>9.1f}"
+                  f"{total_bytes / elapsed / 1024 / 1024:>9.1f}"
+                  f"{statistics.median(latencies) * 1000:>9.1f}{percentile(latencies, 0.99) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
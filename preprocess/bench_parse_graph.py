@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark the built-in DOT reader against the pydot fallback.
+Generates a synthetic CMSSW-style DOT file and reports wall time and
+tracemalloc peak memory for parse_dot_file with each backend.
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from parse_graph import parse_dot_file
+
+
+def write_synthetic_dot(path, num_edges, seed=1):
+    """
+    Write a DOT file shaped like the CMSSW dependency dumper output:
+    Path subgraphs holding filter nodes, then top-level producer nodes
+    and a forward-only (acyclic) edge list.
+    """
+    rng = random.Random(seed)
+    num_nodes = max(2, num_edges // 3)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('digraph RECO {\ngraph [\nlabel="process RECO", labelloc=top];\n')
+        for p in range(max(1, num_nodes // 100)):
+            f.write(f'subgraph path{p} {{\ngraph [\nlabel="Path path{p}", labelloc=bottom];\n')
+            f.write(f'{num_nodes + p}[color=black, fillcolor=white, label=pathFilter{p}, '
+                    f'shape=diamond, style=filled, tooltip=HLTBool];\n}}\n')
+        for n in range(num_nodes):
+            f.write(f'{n}[color=black, fillcolor=green, label=module{n}, shape=box, '
+                    f'style=filled, tooltip="Producer<Type{n % 17}>"];\n')
+        for _ in range(num_edges):
+            src = rng.randrange(num_nodes - 1)
+            dst = rng.randrange(src + 1, num_nodes)
+            if rng.random() < 0.1:
+                f.write(f'{src} -> {dst}[style=dashed];\n')
+            else:
+                f.write(f'{src} -> {dst};\n')
+        f.write('}\n')
+
+
+def measure(dot_path, use_pydot):
+    """Return (seconds, peak_bytes, result) for one parse."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = parse_dot_file(dot_path, use_pydot=use_pydot)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--edges", type=int, default=100_000, help="number of edges to generate")
+    parser.add_argument("--dot", type=Path, help="benchmark an existing DOT file instead")
+    parser.add_argument("--no-pydot", action="store_true", help="skip the pydot backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dot_path = args.dot
+        if dot_path is None:
+            dot_path = Path(tmp) / "synthetic.gv"
+            write_synthetic_dot(dot_path, args.edges)
+
+        size_mb = dot_path.stat().st_size / 1024 / 1024
+        results = {"streaming": measure(dot_path, use_pydot=False)}
+        if not args.no_pydot:
+            results["pydot"] = measure(dot_path, use_pydot=True)
+
+    print(f"\nDOT file: {dot_path} ({size_mb:.1f} MB)")
+    print(f"{'backend':<12}{'time (s)':>12}{'peak (MB)':>12}")
+    for name, (elapsed, peak, _) in results.items():
+        print(f"{name:<12}{elapsed:>12.2f}{peak / 1024 / 1024:>12.1f}")
+
+    if "pydot" in results:
+        fast, slow = results["streaming"], results["pydot"]
+        print(f"\nSpeedup: {slow[0] / fast[0]:.1f}x, peak memory: {slow[1] / fast[1]:.1f}x lower")
+        print(f"Identical output: {fast[2].to_dict() == slow[2].to_dict()}")
+
+
+if __name__ == "__main__":
+    main()
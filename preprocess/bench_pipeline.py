@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Benchmark the preprocessing pipeline on synthetic workflows.
+
+For each size, a workflow is generated with synthetic.py and
+build_bundle is run on it as `build_bundle.py --binary --timing` would,
+without the build cache, so every stage (BUILD_STAGES) runs the same
+code as a real build; "write" covers the analyses, the JSON, NDJSON and
+binary bundles, the module details, search index, delta patches and
+precompressed variants. Each run happens in a fresh worker process and
+reports the wall time and peak RSS of every stage, timed through the
+progress callback of build_bundle; the best of --repeat runs is kept. Peak RSS is sampled from
+/proc/self/statm during the stage (elsewhere it is ru_maxrss, the
+process high-water mark).
+
+Results are compared with stored baselines (bench_baselines.json next to
+this file): a stage more than --tolerance slower, or with that much
+more peak RSS, is a regression and fails the run with exit status 1.
+Differences below MIN_SECONDS and MIN_RSS_MB are ignored as noise.
+Baselines depend on the machine; record them with --save-baseline.
+
+Usage:
+    python bench_pipeline.py [--sizes 1000,10000,100000] [--repeat 3]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from build_bundle import BUILD_STAGES
+from synthetic import add_spec_arguments, spec_from_args, write_synthetic_workflow
+
+BASELINES = Path(__file__).with_name("bench_baselines.json")
+
+# Stages in run order
+STAGES = BUILD_STAGES
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+# Regressions smaller than these are noise
+MIN_SECONDS = 0.05
+MIN_RSS_MB = 16
+
+
+def _current_rss():
+    """Resident set size in bytes, or None without /proc."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakRSS:
+    """Context manager sampling the peak RSS of the process while it is active."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _current_rss() or 0)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        if _current_rss() is not None:
+            self.peak = _current_rss()
+            self._thread = threading.Thread(target=self._sample, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.peak = max(self.peak, _current_rss() or 0)
+        else:
+            # ru_maxrss is in KiB on Linux and bytes on macOS
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            self.peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+        return False
+
+
+def run_stages(dot_path, config_path, output_path):
+    """
+    Build the bundle once in this process, timing each stage.
+
+    Returns:
+        {stage: {"seconds", "peak_rss_mb"}}
+    """
+    from build_bundle import build_bundle
+
+    results = {}
+    running = {}
+
+    def finish():
+        if running:
+            seconds = time.perf_counter() - running["start"]
+            running["rss"].__exit__(None, None, None)
+            results[running["stage"]] = {"seconds": round(seconds, 4),
+                                         "peak_rss_mb": round(running["rss"].peak / 1024 / 1024, 1)}
+            running.clear()
+
+    def progress(stage):
+        finish()
+        running.update(stage=stage, rss=PeakRSS().__enter__())
+        running["start"] = time.perf_counter()
+
+    timing_path = dot_path.with_name("timing.json")
+    build_bundle(dot_path, config_path, output_path, binary=True, progress=progress,
+                 timing=timing_path if timing_path.exists() else None)
+    finish()
+    return results
+
+
+def _workflow(work_dir, spec):
+    """Generate the workflow for spec once; reruns reuse the files."""
+    key = hashlib.blake2b(json.dumps(spec, sort_keys=True).encode(), digest_size=8).hexdigest()
+    directory = Path(work_dir) / f"synthetic-{spec['modules']}-{key}"
+    dot_path, config_path = directory / "dependency.gv", directory / "dumpConfig.py"
+    if not (dot_path.exists() and config_path.exists()):
+        print(f"Generating {spec['modules']:,} modules in {directory}...", flush=True)
+        write_synthetic_workflow(directory, **spec)
+    return dot_path, config_path
+
+
+def _run_worker(dot_path, config_path):
+    """Run the stages in a fresh interpreter so runs do not share memory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        command = [sys.executable, __file__, "--worker", str(dot_path), str(config_path),
+                   str(Path(tmp) / "bundle.json")]
+        result = subprocess.run(command, cwd=Path(__file__).parent, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark worker failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def benchmark(sizes, spec, repeat=1, work_dir=None):
+    """
+    Returns:
+        {str(size): {stage: {"seconds", "peak_rss_mb"}}}, the best of
+        repeat runs for each value
+    """
+    work_dir = work_dir or Path(tempfile.gettempdir()) / "cmssw-graph-bench"
+    results = {}
+    for size in sizes:
+        dot_path, config_path = _workflow(work_dir, {**spec, "modules": size})
+        runs = [_run_worker(dot_path, config_path) for _ in range(repeat)]
+        results[str(size)] = {
+            stage: {key: min(run[stage][key] for run in runs) for key in ("seconds", "peak_rss_mb")}
+            for stage in STAGES
+        }
+        total = sum(results[str(size)][stage]["seconds"] for stage in STAGES)
+        print(f"  {size:,} modules: {total:.2f} s", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns:
+        (notes, regressions): {(size, stage): text} describing every change
+        against the baseline, and a list of regression messages
+    """
+    notes = {}
+    regressions = []
+    for size, stages in results.items():
+        for stage, current in stages.items():
+            reference = baseline.get(size, {}).get(stage)
+            if reference is None:
+                continue
+            parts = []
+            for key, unit, floor in (("seconds", "s", MIN_SECONDS), ("peak_rss_mb", "MB", MIN_RSS_MB)):
+                before, after = reference[key], current[key]
+                ratio = after / before if before else 1.0
+                parts.append(f"{(ratio - 1) * 100:+.0f}%")
+                if ratio > 1 + tolerance and after - before > floor:
+                    regressions.append(f"{size} modules, {stage}: {key} {before}{unit} -> {after}{unit} "
+                                       f"({(ratio - 1) * 100:+.0f}%, tolerance {tolerance * 100:.0f}%)")
+            notes[(size, stage)] = " / ".join(parts)
+    return notes, regressions
+
+
+def _print_results(results, notes):
+    print(f"\n{'modules':>9}  {'stage':<14}{'time (s)':>10}{'peak RSS (MB)':>15}  vs baseline (time / RSS)")
+    for size, stages in results.items():
+        for stage, result in stages.items():
+            note = notes.get((size, stage), "-")
+            print(f"{int(size):>9,}  {stage:<14}{result['seconds']:>10.3f}{result['peak_rss_mb']:>15.1f}  {note}")
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        dot_path, config_path, output_path = map(Path, sys.argv[2:])
+        # Stage output goes to stderr; the last stdout line is the result
+        stdout = sys.stdout
+        sys.stdout = sys.stderr
+        results = run_stages(dot_path, config_path, output_path)
+        stdout.write(json.dumps(results) + "\n")
+        return
+
+    parser = argparse.ArgumentParser(description="Benchmark the preprocessing pipeline on synthetic workflows.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated module counts (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per size, best kept (default: 1)")
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="allowed slowdown or RSS growth vs the baseline (default: 0.3 = 30%%)")
+    parser.add_argument("--baseline", type=Path, default=BASELINES,
+                        help="baseline file (default: bench_baselines.json next to this script)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store these results as the baseline instead of comparing")
+    parser.add_argument("--work-dir", type=Path, help="where generated workflows are kept between runs")
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    spec = spec_from_args(args)
+    print(f"Benchmarking {', '.join(f'{s:,}' for s in sizes)} modules "
+          f"(best of {args.repeat}), spec {spec}")
+    results = benchmark(sizes, spec, repeat=max(1, args.repeat), work_dir=args.work_dir)
+
+    stored = {}
+    if args.baseline.exists():
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+
+    if args.save_baseline:
+        if stored.get("spec") != spec:
+            stored = {}
+        stored.update({
+            "spec": spec,
+            "machine": f"{platform.machine()} {platform.processor() or ''} "
+                       f"Python {platform.python_version()}".replace("  ", " "),
+            "results": {**stored.get("results", {}), **results},
+        })
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2)
+            f.write("\n")
+        _print_results(results, {})
+        print(f"\nSaved baseline: {args.baseline}")
+        return
+
+    notes, regressions = {}, []
+    if not stored:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+    elif stored.get("spec") != spec:
+        print(f"\nBaseline spec {stored.get('spec')} differs from this run; not comparing")
+    else:
+        notes, regressions = compare(results, stored["results"], args.tolerance)
+    _print_results(results, notes)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline} ({stored.get('machine')}):")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    if notes:
+        print(f"\nNo regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
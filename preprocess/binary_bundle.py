@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+"""
+Compact columnar/binary bundle format (bundle.bin).
+
+The file holds a small JSON header followed by 8-byte aligned,
+little-endian typed arrays, so the browser can view every column
+directly on the fetched ArrayBuffer and Python can view them on the
+file bytes without copying.
+
+- Every string (IDs, labels, attribute values, tag fields, snippets)
+  is stored once in a string table and referenced by u32 index.
+- Nodes are referred to by integer index (position in "nodes").
+- Edges are stored as CSR adjacency: out_offsets/out_target in source
+  order with per-edge attribute columns, and in_offsets/in_source/in_edge
+  for incoming edges (in_edge points back into the out-edge order).
+- Per-node and per-edge attributes are typed columns.
+- The reachability index, when present, is stored as reach.* columns
+  (see reachability.ARRAYS).
+
+Usage:
+    python binary_bundle.py <bundle.json> [bundle.bin]
+converts a JSON bundle and reports size and load time for both formats.
+"""
+
+import json
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from graph_model import NodeView, EdgeView
+from reachability import ARRAYS as REACH_ARRAYS
+
+MAGIC = b"CMSB"
+FORMAT_VERSION = 1
+
+# Sentinel for a missing string / node reference
+NONE = 0xFFFFFFFF
+
+# Tag target codes (tag.target column)
+TARGET_NOT_FOUND = -1
+TARGET_NOT_VALIDATED = -2
+
+_TYPECODES = {"u8": "B", "u32": "I", "i32": "i", "f32": "f", "f64": "d"}
+
+_NODE_KEYS = ("id", "label", "x", "y")
+_MODULE_KEYS = ("type", "plugin", "parameters", "inputTags", "rawSnippet")
+_BUNDLE_KEYS = ("nodes", "edges", "modules", "labelToId", "metadata", "reachability")
+
+
+def _align(n, alignment=8):
+    return (n + alignment - 1) // alignment * alignment
+
+
+class _StringTable:
+    """Interns strings and assigns them u32 indices."""
+
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, value):
+        if value is None:
+            return NONE
+        idx = self.index.get(value)
+        if idx is None:
+            idx = len(self.strings)
+            self.index[value] = idx
+            self.strings.append(value)
+        return idx
+
+    def encode(self):
+        """Return (utf8_bytes, byte_offsets array, is_ascii)."""
+        encoded = [s.encode("utf-8", "surrogatepass") for s in self.strings]
+        offsets = array("I", [0])
+        total = 0
+        for data in encoded:
+            total += len(data)
+            offsets.append(total)
+        blob = b"".join(encoded)
+        return blob, offsets, blob.isascii()
+
+
+def write_binary_bundle(bundle, output_path):
+    """
+    Write a bundle dict (as produced by build_bundle) in the binary format.
+
+    Returns:
+        Size of the written file in bytes
+    """
+    strings = _StringTable()
+    sections = {}
+
+    def column(name, dtype, values):
+        sections[name] = (dtype, values if isinstance(values, array) else array(_TYPECODES[dtype], values))
+
+    # Nodes, read column by column from a GraphModel
+    nodes = bundle["nodes"]
+    if isinstance(nodes, NodeView):
+        node_attrs = [key for key in nodes.model.node_columns if key not in _NODE_KEYS]
+        node_column = nodes.column
+    else:
+        node_attrs = list(dict.fromkeys(k for n in nodes for k in n if k not in _NODE_KEYS))
+        node_column = lambda key: [n.get(key) for n in nodes]
+    node_index = {}
+    for i, node_id in enumerate(node_column("id")):
+        node_index.setdefault(node_id, i)
+
+    column("node.id", "u32", (strings.add(node_id) for node_id in node_column("id")))
+    column("node.label", "u32", (strings.add(label) for label in node_column("label")))
+    xs, ys = node_column("x"), node_column("y")
+    if nodes and all(x is not None for x in xs) and all(y is not None for y in ys):
+        column("node.x", "f64", xs)
+        column("node.y", "f64", ys)
+
+    for key in node_attrs:
+        column(f"node.attr.{key}", "u32", (strings.add(_as_str(value)) for value in node_column(key)))
+
+    # Edges: CSR by source, stable so each source keeps the original edge order
+    edges = bundle["edges"]
+    num_nodes = len(nodes)
+    if isinstance(edges, EdgeView):
+        sources, targets = edges.model.sources, edges.model.targets
+        edge_attrs = list(edges.model.edge_columns)
+        edge_column = edges.model.edge_columns.__getitem__
+    else:
+        sources = [node_index[e["source"]] for e in edges]
+        targets = [node_index[e["target"]] for e in edges]
+        edge_attrs = list(dict.fromkeys(k for e in edges for k in e if k not in ("source", "target")))
+        edge_column = lambda key: [e.get(key) for e in edges]
+    out_order = sorted(range(len(edges)), key=sources.__getitem__)
+
+    column("edge.out_offsets", "u32", _offsets(sources, num_nodes))
+    column("edge.out_target", "u32", (targets[j] for j in out_order))
+
+    for key in edge_attrs:
+        values = edge_column(key)
+        column(f"edge.attr.{key}", "u32", (strings.add(_as_str(values[j])) for j in out_order))
+
+    in_order = sorted(range(len(edges)), key=lambda k: targets[out_order[k]])
+    column("edge.in_offsets", "u32", _offsets(targets, num_nodes))
+    column("edge.in_source", "u32", (sources[out_order[k]] for k in in_order))
+    column("edge.in_edge", "u32", in_order)
+
+    # Label -> node mapping
+    label_to_id = bundle.get("labelToId", {})
+    column("label.label", "u32", (strings.add(label) for label in label_to_id))
+    column("label.node", "u32", (node_index.get(node_id, NONE) for node_id in label_to_id.values()))
+
+    # Modules, with InputTags and parameters as CSR children
+    modules = bundle.get("modules", {})
+    tag_cols = {k: array("I") for k in ("field", "type", "module", "instance", "process")}
+    tag_index = array("i")
+    tag_target = array("i")
+    param_cols = {k: array("I") for k in ("name", "type", "value")}
+    tag_offsets = array("I", [0])
+    param_offsets = array("I", [0])
+    module_extra = {}
+
+    for name, module in modules.items():
+        for tag in module.get("inputTags", []):
+            for key, col in tag_cols.items():
+                col.append(strings.add(tag.get(key)))
+            tag_index.append(tag.get("index", -1))
+            if "found" not in tag:
+                tag_target.append(TARGET_NOT_VALIDATED)
+            elif tag["found"]:
+                tag_target.append(node_index.get(tag["targetId"], TARGET_NOT_FOUND))
+            else:
+                tag_target.append(TARGET_NOT_FOUND)
+        tag_offsets.append(len(tag_index))
+
+        for param_name, param in module.get("parameters", {}).items():
+            param_cols["name"].append(strings.add(param_name))
+            param_cols["type"].append(strings.add(param.get("type")))
+            param_cols["value"].append(strings.add(param.get("value")))
+        param_offsets.append(len(param_cols["name"]))
+
+        extra = {k: v for k, v in module.items() if k not in _MODULE_KEYS}
+        if extra:
+            module_extra[name] = extra
+
+    column("module.name", "u32", (strings.add(name) for name in modules))
+    column("module.type", "u32", (strings.add(m.get("type")) for m in modules.values()))
+    column("module.plugin", "u32", (strings.add(m.get("plugin")) for m in modules.values()))
+    column("module.snippet", "u32", (strings.add(m.get("rawSnippet")) for m in modules.values()))
+    column("tag.offsets", "u32", tag_offsets)
+    for key, col in tag_cols.items():
+        column(f"tag.{key}", "u32", col)
+    column("tag.index", "i32", tag_index)
+    column("tag.target", "i32", tag_target)
+    column("param.offsets", "u32", param_offsets)
+    for key, col in param_cols.items():
+        column(f"param.{key}", "u32", col)
+
+    # Reachability index
+    reachability = bundle.get("reachability")
+    if reachability:
+        for keys, suffix in REACH_ARRAYS:
+            values = reachability
+            for key in keys:
+                values = values[key]
+            column(f"reach.{suffix}", "u32", values)
+
+    # String table last, once every string has been interned
+    blob, string_offsets, ascii_only = strings.encode()
+    column("strings.offsets", "u32", string_offsets)
+    sections["strings.bytes"] = ("u8", blob)
+
+    # Lay out sections after the header
+    header = {
+        "formatVersion": FORMAT_VERSION,
+        "metadata": bundle.get("metadata", {}),
+        "counts": {"nodes": num_nodes, "edges": len(edges), "modules": len(modules),
+                   "strings": len(strings.strings)},
+        "asciiStrings": ascii_only,
+        "nodeAttributes": node_attrs,
+        "edgeAttributes": edge_attrs,
+        "moduleExtra": module_extra,
+        # False for slim bundles whose module details are stored separately
+        "moduleDetails": any(key in m for m in modules.values()
+                             for key in ("parameters", "inputTags", "rawSnippet")),
+        "reachability": bool(reachability),
+        "extra": {k: v for k, v in bundle.items() if k not in _BUNDLE_KEYS},
+        "sections": {},
+    }
+
+    payloads = []
+    offset = 0
+    for name, (dtype, values) in sections.items():
+        data = values if isinstance(values, bytes) else _little_endian(values).tobytes()
+        header["sections"][name] = [offset, dtype, len(values)]
+        payloads.append((offset, data))
+        offset = _align(offset + len(data))
+
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    data_start = _align(12 + len(header_bytes))
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(FORMAT_VERSION.to_bytes(4, "little"))
+        f.write(len(header_bytes).to_bytes(4, "little"))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - 12 - len(header_bytes)))
+        position = 0
+        for section_offset, data in payloads:
+            f.write(b"\0" * (section_offset - position))
+            f.write(data)
+            position = section_offset + len(data)
+    tmp_path.replace(output_path)
+
+    return output_path.stat().st_size
+
+
+def _as_str(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value)
+
+
+def _offsets(keys, count):
+    """CSR offsets (count + 1 entries) for items grouped by key."""
+    counts = array("I", bytes(4 * (count + 1)))
+    for key in keys:
+        counts[key + 1] += 1
+    for i in range(count):
+        counts[i + 1] += counts[i]
+    return counts
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+class BinaryBundle:
+    """
+    Read-only view of a bundle.bin file.
+
+    Columns are exposed as memoryviews over the file bytes (no copy);
+    to_dict() rebuilds the JSON-shaped bundle.
+    """
+
+    def __init__(self, path_or_bytes):
+        if isinstance(path_or_bytes, (bytes, bytearray, memoryview)):
+            self.buffer = memoryview(path_or_bytes)
+        else:
+            with open(path_or_bytes, "rb") as f:
+                self.buffer = memoryview(f.read())
+
+        if bytes(self.buffer[:4]) != MAGIC:
+            raise ValueError("Not a binary bundle (bad magic)")
+        header_len = int.from_bytes(self.buffer[8:12], "little")
+        self.header = json.loads(bytes(self.buffer[12:12 + header_len]))
+        if self.header["formatVersion"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary bundle version {self.header['formatVersion']}")
+        self._data_start = _align(12 + header_len)
+        self._strings = None
+
+    def column(self, name):
+        """Return a section as a typed memoryview (or None if absent)."""
+        entry = self.header["sections"].get(name)
+        if entry is None:
+            return None
+        offset, dtype, length = entry
+        start = self._data_start + offset
+        typecode = _TYPECODES[dtype]
+        size = array(typecode).itemsize
+        view = self.buffer[start:start + length * size]
+        if sys.byteorder == "big" and size > 1:
+            swapped = array(typecode, view.tobytes())
+            swapped.byteswap()
+            return memoryview(swapped)
+        return view.cast(typecode)
+
+    def strings(self):
+        """Decode the string table once and return it as a list."""
+        if self._strings is None:
+            blob = self.column("strings.bytes")
+            offsets = self.column("strings.offsets")
+            if self.header["asciiStrings"]:
+                text = bytes(blob).decode("ascii")
+                self._strings = [text[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            else:
+                raw = bytes(blob)
+                self._strings = [raw[offsets[i]:offsets[i + 1]].decode("utf-8", "surrogatepass")
+                                 for i in range(len(offsets) - 1)]
+        return self._strings
+
+    def out_neighbors(self, node):
+        """Target node indices of the out-edges of a node index."""
+        offsets = self.column("edge.out_offsets")
+        return self.column("edge.out_target")[offsets[node]:offsets[node + 1]]
+
+    def in_neighbors(self, node):
+        """Source node indices of the in-edges of a node index."""
+        offsets = self.column("edge.in_offsets")
+        return self.column("edge.in_source")[offsets[node]:offsets[node + 1]]
+
+    def to_dict(self):
+        """
+        Rebuild the JSON-shaped bundle. Edges come back grouped by source
+        node (CSR order); everything else matches the original bundle.
+        """
+        strings = self.strings()
+        get = lambda idx: None if idx == NONE else strings[idx]
+        counts = self.header["counts"]
+
+        ids = [strings[i] for i in self.column("node.id")]
+        labels = self.column("node.label")
+        xs, ys = self.column("node.x"), self.column("node.y")
+        node_attr_cols = [(key, self.column(f"node.attr.{key}")) for key in self.header["nodeAttributes"]]
+        nodes = []
+        for i in range(counts["nodes"]):
+            node = {"id": ids[i]}
+            if labels[i] != NONE:
+                node["label"] = strings[labels[i]]
+            for key, col in node_attr_cols:
+                if col[i] != NONE:
+                    node[key] = strings[col[i]]
+            if xs is not None:
+                node["x"] = xs[i]
+                node["y"] = ys[i]
+            nodes.append(node)
+
+        out_offsets = self.column("edge.out_offsets")
+        out_target = self.column("edge.out_target")
+        edge_attr_cols = [(key, self.column(f"edge.attr.{key}")) for key in self.header["edgeAttributes"]]
+        edges = []
+        for source in range(counts["nodes"]):
+            for j in range(out_offsets[source], out_offsets[source + 1]):
+                edge = {"source": ids[source], "target": ids[out_target[j]]}
+                for key, col in edge_attr_cols:
+                    if col[j] != NONE:
+                        edge[key] = strings[col[j]]
+                edges.append(edge)
+
+        label_to_id = {strings[label]: None if node == NONE else ids[node]
+                       for label, node in zip(self.column("label.label"), self.column("label.node"))}
+
+        tag_offsets = self.column("tag.offsets")
+        tag_cols = {k: self.column(f"tag.{k}") for k in ("field", "type", "module", "instance", "process")}
+        tag_index = self.column("tag.index")
+        tag_target = self.column("tag.target")
+        param_offsets = self.column("param.offsets")
+        param_name = self.column("param.name")
+        param_type = self.column("param.type")
+        param_value = self.column("param.value")
+        module_extra = self.header["moduleExtra"]
+
+        modules = {}
+        columns = zip(self.column("module.name"), self.column("module.type"),
+                      self.column("module.plugin"), self.column("module.snippet"))
+        for m, (name_idx, type_idx, plugin_idx, snippet_idx) in enumerate(columns):
+            tags = []
+            for t in range(tag_offsets[m], tag_offsets[m + 1]):
+                tag = {"field": get(tag_cols["field"][t]), "type": get(tag_cols["type"][t])}
+                if tag_index[t] >= 0:
+                    tag["index"] = tag_index[t]
+                for key in ("module", "instance", "process"):
+                    tag[key] = get(tag_cols[key][t])
+                target = tag_target[t]
+                if target != TARGET_NOT_VALIDATED:
+                    tag["found"] = target >= 0
+                    tag["targetId"] = ids[target] if target >= 0 else None
+                tags.append(tag)
+
+            params = {strings[param_name[p]]: {"type": get(param_type[p]), "value": get(param_value[p])}
+                      for p in range(param_offsets[m], param_offsets[m + 1])}
+
+            name = strings[name_idx]
+            modules[name] = {"type": get(type_idx), "plugin": get(plugin_idx)}
+            if self.header["moduleDetails"]:
+                modules[name].update(parameters=params, inputTags=tags, rawSnippet=get(snippet_idx))
+            modules[name].update(module_extra.get(name, {}))
+
+        bundle = {
+            "nodes": nodes,
+            "edges": edges,
+            "modules": modules,
+            "labelToId": label_to_id,
+            "metadata": self.header["metadata"],
+        }
+        if self.header.get("reachability"):
+            bundle["reachability"] = self.reachability()
+        bundle.update(self.header["extra"])
+        return bundle
+
+    def reachability(self):
+        """The reachability index as nested lists, or None if absent."""
+        if not self.header.get("reachability"):
+            return None
+        data = {}
+        for keys, suffix in REACH_ARRAYS:
+            target = data
+            for key in keys[:-1]:
+                target = target.setdefault(key, {})
+            target[keys[-1]] = self.column(f"reach.{suffix}").tolist()
+        return data
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python binary_bundle.py <bundle.json> [bundle.bin]")
+        sys.exit(1)
+
+    json_path = Path(sys.argv[1])
+    bin_path = Path(sys.argv[2]) if len(sys.argv) >= 3 else json_path.with_suffix(".bin")
+
+    start = time.perf_counter()
+    with open(json_path, "r", encoding="utf-8") as f:
+        bundle = json.load(f)
+    json_seconds = time.perf_counter() - start
+
+    bin_size = write_binary_bundle(bundle, bin_path)
+
+    start = time.perf_counter()
+    binary = BinaryBundle(bin_path)
+    binary.strings()
+    view_seconds = time.perf_counter() - start
+    binary.to_dict()
+    dict_seconds = time.perf_counter() - start
+
+    json_size = json_path.stat().st_size
+    print(f"JSON:   {json_size / 1024 / 1024:8.2f} MB, json.load {json_seconds:.3f} s")
+    print(f"Binary: {bin_size / 1024 / 1024:8.2f} MB, open + strings {view_seconds:.3f} s, "
+          f"to_dict {dict_seconds:.3f} s")
+    print(f"Size reduction: {json_size / bin_size:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
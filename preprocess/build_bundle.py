@@ -4,18 +4,49 @@ Orchestrate parsing and build final JSON bundle.
 Merges graph data with module config data and validates InputTag references.
 """
 
+import argparse
 import json
+import re
 import sys
 from pathlib import Path
 from parse_graph import parse_dot_file
 from parse_config import parse_config_file
+from build_cache import BuildCache, DEFAULT_MAX_BYTES, hash_file, hash_values
+from layout import compute_layout, topology_hash
+from binary_bundle import write_binary_bundle
+from precompress import write_variants, remove_variants
+from module_details import details_paths, split_module_details, write_module_details, remove_module_details
+from reachability import build_reachability
+from search_index import search_paths, write_search_index, remove_search_index
+from diff_bundles import bundle_sections, content_hashes, versions_dir, write_versions, remove_patches
+from build_profile import BuildProfiler, print_report
+from coarsen import coarsen, path_membership
+from timing import parse_timing_report, analyze_timing
+from wasted_work import analyze_wasted_work
+from stream_bundle import stream_path, write_stream_bundle, remove_stream_bundle, write_json_bundle
+from config_graph import graph_from_config, compare_graphs, print_comparison
 
+# Bump when the bundle layout changes so cached builds are not reused
+BUNDLE_VERSION = 11
 
-def validate_and_enrich_input_tags(modules, label_to_id):
+# Stages reported to the progress callback of build_bundle, in order
+BUILD_STAGES = ("dot_parse", "layout", "reachability", "config_parse", "validation", "write")
+
+# build_bundle arguments that decide which outputs a bundle has, recorded
+# in its metadata as "buildOptions" so that rebuilds keep them
+OUTPUT_OPTIONS = ("layout", "binary", "compress", "split_modules", "reachability", "search",
+                  "coarse", "stream", "timing", "wasted")
+
+
+def validate_and_enrich_input_tags(modules, label_to_id, only=None):
     """
     Validate InputTag references against graph nodes.
     Add 'found' and 'targetId' fields to each InputTag.
 
+    Args:
+        only: Optional set of module names to validate; the tags of other
+            modules are assumed to be validated already and are only counted
+
     Returns:
         Updated modules dict
     """
@@ -25,6 +56,12 @@ def validate_and_enrich_input_tags(modules, label_to_id):
     found_tags = 0
 
     for module_name, module_data in modules.items():
+        if only is not None and module_name not in only:
+            for tag in module_data.get("inputTags", []):
+                total_tags += 1
+                found_tags += bool(tag.get("found"))
+            continue
+
         for tag in module_data.get("inputTags", []):
             total_tags += 1
 
@@ -39,6 +76,8 @@ def validate_and_enrich_input_tags(modules, label_to_id):
                 tag["found"] = False
                 tag["targetId"] = None
 
+    if only is not None:
+        print(f"  Validated {len(only)} new or changed modules")
     if total_tags > 0:
         print(f"  Found {found_tags}/{total_tags} InputTag references ({100*found_tags/total_tags:.1f}%)")
     else:
@@ -47,47 +86,295 @@ def validate_and_enrich_input_tags(modules, label_to_id):
     return modules
 
 
-def build_bundle(dot_path, config_path, output_path):
+def add_layout(graph, cache=None):
+    """
+    Store precomputed x/y positions on the graph nodes.
+    Layouts are cached by graph topology, so attribute-only changes reuse them.
+
+    Returns:
+        True if positions were added
+    """
+    print("\nComputing layout...")
+    nodes, edges = graph.nodes, graph.edges
+
+    topology = topology_hash(nodes, edges)
+    positions = cache.get_layout(topology) if cache is not None else None
+
+    if positions is not None:
+        print("  Reusing cached layout")
+    else:
+        positions = compute_layout(nodes, edges)
+        if positions is None:
+            print("  NumPy not installed; the browser will lay out the graph instead")
+            return False
+        if cache is not None:
+            cache.put_layout(topology, positions)
+
+    graph.set_positions(positions)
+    print(f"  Positioned {len(positions)} nodes")
+    return True
+
+
+def add_reachability(graph):
+    """
+    Build the reachability index over the graph nodes (by index).
+
+    Returns:
+        The index, or None if the graph needs too many intervals
+    """
+    print("\nBuilding reachability index...")
+    reachability = build_reachability(graph.nodes, graph.edges)
+    if reachability is None:
+        print("  Graph too large for the index; the browser will traverse it instead")
+        return None
+    num_intervals = (len(reachability["down"]["intervals"]) + len(reachability["up"]["intervals"])) // 2
+    print(f"  {num_intervals:,} intervals ({num_intervals / max(1, len(graph.nodes)):.1f} per node)")
+    return reachability
+
+
+def build_bundle(dot_path, config_path, output_path, use_pydot=False, jobs=1, cache=None,
+                 layout=True, binary=False, compress=True, split_modules=True, reachability=True,
+                 search=True, progress=None, mmap_config=None, coarse=True, stream=True,
+                 timing=None, wasted=True, compare_dot=None):
     """
     Build complete JSON bundle from DOT file and config file.
+    With binary=True the columnar bundle.bin is written next to it, and
+    with compress=True both get precompressed .gz/.br variants.
+    With split_modules=True the bundle only keeps each module's type and
+    plugin; the full records are written separately (see module_details).
+    With reachability=True the bundle carries a reachability index for
+    instant upstream/downstream/path queries (see reachability).
+    With search=True a search index over module names, plugins,
+    parameters and InputTags is written next to it (see search_index).
+    With coarse=True the bundle carries a graph of one supernode per
+    Path, which the app shows first for large graphs (see coarsen).
+    With stream=True the bundle is also written as bundle.ndjson, which
+    the app draws batch by batch while it downloads (see stream_bundle).
+    With a timing report (timing=path) the bundle carries each module's
+    time per event and slack, the critical path and per-Path times (see
+    timing).
+    With wasted=True the bundle flags the modules whose products reach no
+    OutputModule, EDAnalyzer or filter on a Path, and records what dropping
+    each module would make removable (see wasted_work).
+    The bundle records a content hash, and patches to it from the last few
+    builds are written next to it for open apps (see diff_bundles). Its
+    metadata records the OUTPUT_OPTIONS it was built with (see
+    rebuild_options).
+
+    With dot_path=None the graph is derived from the config alone: its
+    modules are the nodes and their InputTags the edges (see
+    config_graph). The config is then parsed in the dot_parse stage. With
+    a DOT file to compare with (compare_dot=path) the derived graph is
+    checked against the one of that file, and the result recorded in the
+    metadata as "graphComparison".
+
+    mmap_config=True parses the config from a memory map (see
+    parse_config); None does so for files above MMAP_THRESHOLD.
+
+    With a BuildCache, unchanged inputs are a no-op and only modules whose
+    config text changed are re-parsed and re-validated.
+
+    Args:
+        progress: Optional callable, called with each name in BUILD_STAGES
+            as that stage starts
+
+    Returns:
+        The metadata of the new bundle, or None if it was up to date
     """
+    report = progress or (lambda stage: None)
+
     print("=" * 60)
     print("Building CMSSW Module Dependency Graph Bundle")
     print("=" * 60)
 
-    # Parse DOT file
-    graph_data = parse_dot_file(dot_path)
+    graph = None
+    modules = None
+    if cache is not None:
+        config_hash = hash_file(config_path)
+        # A config-only graph changes with the config
+        dot_hash = hash_file(dot_path) if dot_path else hash_values("config-graph", config_hash)
+        build_key = hash_values(BUNDLE_VERSION, dot_hash, config_hash, layout, binary,
+                                compress, split_modules, reachability, search, coarse, stream,
+                                hash_file(timing) if timing else None, wasted,
+                                hash_file(compare_dot) if compare_dot and not dot_path else None)
+        if cache.is_up_to_date(build_key, output_path):
+            print(f"\nInputs unchanged, bundle is up to date: {output_path}")
+            return
+
+    # Parse DOT file (or reuse the cached graph)
+    report("dot_parse")
+    config_stats = {}
+    sequences = {}
+    if cache is not None:
+        cache.set_graph_hash(dot_hash)
+        graph = cache.get_graph(dot_hash) if dot_path else None
+        if graph is not None:
+            print(f"Reusing cached graph for: {dot_path}")
+
+    if dot_path is None:
+        modules = parse_config_file(config_path, jobs=jobs, stats=config_stats, cache=cache,
+                                    mapped=mmap_config, sequences=sequences)
+        graph = graph_from_config(modules, sequences)
+        if compare_dot:
+            comparison = compare_graphs(parse_dot_file(compare_dot, use_pydot=use_pydot), graph)
+            print(f"\nConfig-only graph against {compare_dot}:")
+            print_comparison(comparison)
+    elif graph is None:
+        graph = parse_dot_file(dot_path, use_pydot=use_pydot)
+        if cache is not None:
+            cache.put_graph(dot_hash, graph)
+
+    # Precompute node positions
+    report("layout")
+    has_layout = add_layout(graph, cache) if layout else False
+
+    # Precompute the reachability index
+    report("reachability")
+    reach_index = add_reachability(graph) if reachability else None
 
     # Parse config file
-    modules = parse_config_file(config_path)
+    report("config_parse")
+    if modules is None:
+        modules = parse_config_file(config_path, jobs=jobs, stats=config_stats, cache=cache,
+                                    mapped=mmap_config, sequences=sequences)
 
     # Validate and enrich InputTags
-    modules = validate_and_enrich_input_tags(modules, graph_data["labelToId"])
+    report("validation")
+    only = cache.pending_validation() if cache is not None else None
+    modules = validate_and_enrich_input_tags(modules, graph.label_to_id, only=only)
+    if cache is not None:
+        cache.commit(modules)
+
+    # Write module details separately, loaded on demand by the app
+    report("write")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Every file written, all required for a later build to be skipped
+    outputs = []
+    module_details = None
+    if split_modules:
+        module_details = write_module_details(modules, output_path)
+        details_path, shard_dir = details_paths(output_path)
+        outputs += [details_path] + [shard_dir / f"{shard:03d}.js" for shard in range(module_details["shards"])]
+        print(f"\nWrote module details: {module_details['bytes']:,} bytes, "
+              f"{module_details['shards']} static shards")
+    else:
+        remove_module_details(output_path)
+
+    # Search index, queried through /api/search or loaded by the app in static mode
+    search_info = None
+    if search:
+        search_info = write_search_index(modules, output_path)
+        outputs += search_paths(output_path)
+        print(f"Wrote search index: {search_info['bytes']:,} bytes")
+    else:
+        remove_search_index(output_path)
+
+    # Patches to the previous build go stale once it is replaced
+    remove_patches(output_path)
 
     # Build final bundle
     bundle = {
-        "nodes": graph_data["nodes"],
-        "edges": graph_data["edges"],
-        "modules": modules,
-        "labelToId": graph_data["labelToId"],
+        "nodes": graph.nodes,
+        "edges": graph.edges,
+        "modules": split_module_details(modules) if split_modules else modules,
+        "labelToId": graph.label_to_id,
         "metadata": {
-            "is_directed": graph_data["is_directed"],
-            "node_count": len(graph_data["nodes"]),
-            "edge_count": len(graph_data["edges"]),
-            "module_count": len(modules)
+            "is_directed": graph.is_directed,
+            "node_count": len(graph.nodes),
+            "edge_count": len(graph.edges),
+            "module_count": len(modules),
+            "layout": "layered" if has_layout else None,
+            "moduleDetails": module_details,
+            "search": search_info,
+            "contentHash": None,
+            "graphSource": "dot" if dot_path else "config",
+            "buildOptions": {
+                "layout": layout,
+                "binary": binary,
+                "compress": compress,
+                "split_modules": split_modules,
+                "reachability": reachability,
+                "search": search,
+                "coarse": coarse,
+                "stream": stream,
+                "timing": str(Path(timing).resolve()) if timing else None,
+                "wasted": wasted
+            }
         }
     }
+    if dot_path is None and compare_dot:
+        bundle["metadata"]["graphComparison"] = comparison
+    if reach_index is not None:
+        bundle["reachability"] = reach_index
+    paths = path_membership(sequences, graph.paths) if coarse or timing or wasted else []
+    if coarse:
+        bundle["coarse"] = coarsen(graph, paths)
+        print(f"\nCoarse graph: {len(bundle['coarse']['groups']):,} Path groups, "
+              f"{len(bundle['coarse']['edges']):,} edges")
+    if timing:
+        bundle["timing"] = analyze_timing(graph, parse_timing_report(timing), paths,
+                                          source=Path(timing).name)
+        print(f"\nTiming: {bundle['timing']['matched']:,} modules timed, "
+              f"{bundle['timing']['total']:.2f} ms/event, critical path "
+              f"{bundle['timing']['criticalPath']['time']:.2f} ms/event")
+    if wasted:
+        times = bundle["timing"]["time"] if timing else None
+        bundle["wastedWork"] = analyze_wasted_work(graph, modules, paths, times)
+        print(f"\nWasted work: {bundle['wastedWork']['wastedCount']:,} modules reach no output, "
+              f"analyzer or Path filter ({bundle['wastedWork']['sinks']:,} sinks)", end="")
+        print(f", {bundle['wastedWork']['wastedTime']:.2f} ms/event" if timing else "")
+
+    # Content hashes, over every part of the bundle
+    records = graph.records()
+    sections = bundle_sections(bundle)
+    hashes = content_hashes(records, modules, sections)
+    bundle["metadata"]["contentHash"] = hashes["contentHash"]
 
     # Write bundle to file
     print(f"\nWriting bundle to: {output_path}")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(bundle, f, indent=2)
+    # Written next to the target and renamed, so the server never reads a partial bundle
+    write_json_bundle(bundle, output_path)
 
     file_size = output_path.stat().st_size
     print(f"  Bundle size: {file_size:,} bytes ({file_size/1024/1024:.2f} MB)")
 
+    ndjson_path = stream_path(output_path)
+    if stream:
+        stream_records = write_stream_bundle(bundle, ndjson_path)
+        print(f"  Streamed bundle: {ndjson_path.name} ({stream_records} records, "
+              f"{ndjson_path.stat().st_size:,} bytes)")
+    elif ndjson_path.exists():
+        remove_stream_bundle(ndjson_path)
+        remove_variants(ndjson_path)
+        print(f"  Removed stale streamed bundle: {ndjson_path}")
+
+    num_patches = write_versions(hashes, records, bundle["modules"], bundle["metadata"], sections, output_path)
+    print(f"  Content hash: {hashes['contentHash']} ({num_patches} delta patches)")
+    # The hashes of this build and its (empty) patch from itself
+    outputs += [versions_dir(output_path) / f"{hashes['contentHash']}{suffix}" for suffix in (".json", ".patch.json")]
+
+    binary_path = output_path.with_suffix(".bin")
+    if binary:
+        binary_size = write_binary_bundle(bundle, binary_path)
+        print(f"  Binary bundle: {binary_path} ({binary_size:,} bytes, "
+              f"{file_size / binary_size:.1f}x smaller)")
+    elif binary_path.exists():
+        # The app prefers bundle.bin, so never leave one from an older build
+        binary_path.unlink()
+        remove_variants(binary_path)
+        print(f"  Removed stale binary bundle: {binary_path}")
+
+    written = [output_path] + ([ndjson_path] if stream else []) + ([binary_path] if binary else [])
+    outputs += written
+    for path in written:
+        if compress:
+            for variant, size in write_variants(path).items():
+                outputs.append(variant)
+                print(f"  Precompressed: {variant.name} ({size:,} bytes)")
+        else:
+            remove_variants(path)
+
     print("\n" + "=" * 60)
     print("Bundle generation complete!")
     print("=" * 60)
@@ -95,36 +382,135 @@ def build_bundle(dot_path, config_path, output_path):
     print(f"  Nodes: {bundle['metadata']['node_count']:,}")
     print(f"  Edges: {bundle['metadata']['edge_count']:,}")
     print(f"  Modules: {bundle['metadata']['module_count']:,}")
+    print(f"  Config parse: {config_stats['seconds']:.2f} s (--jobs {config_stats['jobs']}", end="")
+    if config_stats["jobs"] > 1:
+        speedup = config_stats["serial_seconds"] / config_stats["seconds"]
+        print(f", estimated {speedup:.1f}x vs --jobs 1)")
+    else:
+        print(")")
     print(f"  Output: {output_path}")
 
-    # Also generate bundle.js for static mode
+    if cache is not None:
+        cache.record_build(build_key, output_path, outputs)
+
+    # Also generate bundle.js for static mode, which shows the default
+    # bundle only (named bundles in data/<name>/ are served by server.py)
+    js_output = output_path.parent.parent / "app" / "js" / "bundle.js"
+    if not js_output.parent.is_dir():
+        return bundle["metadata"]
     try:
         from generate_bundle_js import generate_bundle_js
-        js_output = output_path.parent.parent / "app" / "js" / "bundle.js"
         print(f"\nGenerating bundle.js for static mode...")
         generate_bundle_js(output_path, js_output)
     except Exception as e:
         print(f"\nWarning: Could not generate bundle.js: {e}")
         print("Run 'python preprocess/generate_bundle_js.py' manually if needed.")
+    return bundle["metadata"]
+
+
+def rebuild_options(output_path):
+    """
+    Options to rebuild the bundle at output_path as it was built: its
+    recorded OUTPUT_OPTIONS, and whether its graph came from the config
+    alone. A timing report that no longer exists is dropped with a
+    warning. Bundles without recorded options get the defaults.
+
+    Returns:
+        (build_bundle keyword arguments, config_only)
+    """
+    try:
+        # The header of the streamed bundle holds the metadata, without
+        # reading the whole bundle
+        with open(stream_path(output_path), "r", encoding="utf-8") as f:
+            metadata = json.loads(f.readline())["metadata"]
+    except (OSError, ValueError, KeyError):
+        try:
+            with open(output_path, "r", encoding="utf-8") as f:
+                metadata = json.load(f).get("metadata") or {}
+        except (OSError, ValueError):
+            return {}, False
+    options = {name: value for name, value in (metadata.get("buildOptions") or {}).items()
+               if name in OUTPUT_OPTIONS}
+    timing = options.get("timing")
+    if timing and not Path(timing).is_file():
+        print(f"Warning: timing report {timing} not found; rebuilding without timing")
+        options["timing"] = None
+    return options, metadata.get("graphSource") == "config"
 
 
 def main():
     # Default paths relative to project root
     project_root = Path(__file__).parent.parent
-    dot_path = project_root / "dependency.gv"
-    config_path = project_root / "dumpConfig.py"
-    output_path = project_root / "data" / "bundle.json"
-
-    # Allow command-line overrides
-    if len(sys.argv) >= 2:
-        dot_path = Path(sys.argv[1])
-    if len(sys.argv) >= 3:
-        config_path = Path(sys.argv[2])
-    if len(sys.argv) >= 4:
-        output_path = Path(sys.argv[3])
+
+    parser = argparse.ArgumentParser(description="Build the CMSSW graph visualization bundle.")
+    parser.add_argument("dot_file", nargs="?", type=Path, default=project_root / "dependency.gv",
+                        help="'-' to derive the graph from the config alone")
+    parser.add_argument("config_file", nargs="?", type=Path, default=project_root / "dumpConfig.py")
+    parser.add_argument("output_file", nargs="?", type=Path, default=project_root / "data" / "bundle.json")
+    parser.add_argument("--name",
+                        help="build the named bundle data/<name>/bundle.json, served by server.py "
+                             "next to the default one (instead of output_file)")
+    parser.add_argument("--pydot", action="store_true",
+                        help="parse the DOT file with pydot instead of the built-in reader")
+    parser.add_argument("--jobs", "-j", type=int, default=1,
+                        help="worker processes for parsing the config file (default: 1)")
+    parser.add_argument("--no-layout", action="store_true",
+                        help="do not precompute node positions (the browser runs its own layout)")
+    parser.add_argument("--binary", action="store_true",
+                        help="also write the compact columnar bundle (.bin next to the JSON output)")
+    parser.add_argument("--embed-modules", action="store_true",
+                        help="keep parameters, InputTags and snippets of every module in the bundle "
+                             "instead of writing them to separate files loaded on demand")
+    parser.add_argument("--no-reachability", action="store_true",
+                        help="do not precompute the reachability index (the browser traverses the graph)")
+    parser.add_argument("--no-search-index", action="store_true",
+                        help="do not write the module search index (bundle_search.json/.js)")
+    parser.add_argument("--no-coarse", action="store_true",
+                        help="skip the Path-level coarse graph shown first by the app for large graphs")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="skip bundle.ndjson, which the app draws while it downloads")
+    parser.add_argument("--timing", type=Path,
+                        help="FastTimerService JSON or TimeReport log to overlay module times "
+                             "and the critical path (see timing.py)")
+    parser.add_argument("--config-only", action="store_true",
+                        help="derive the graph from the config alone and compare it with the DOT file, "
+                             "if there is one")
+    parser.add_argument("--no-wasted-work", action="store_true",
+                        help="skip the analysis of modules whose products are never used (see wasted_work.py)")
+    parser.add_argument("--no-compress", action="store_true",
+                        help="do not write precompressed .gz/.br variants for the server")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="parse everything from scratch and do not update the build cache")
+    parser.add_argument("--cache-dir", type=Path,
+                        help="build cache directory (default: .build_cache next to the output)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="build cache size cap in MB (default: %(default)s)")
+    parser.add_argument("--mmap-config", action="store_true",
+                        help="parse the config from a memory map, decoding only module blocks "
+                             "(automatic above 256 MB)")
+    parser.add_argument("--report", type=Path,
+                        help="write per-stage wall/CPU time, tracemalloc peak and top allocation "
+                             "sites as JSON to this file")
+    parser.add_argument("--no-trace-memory", action="store_true",
+                        help="leave tracemalloc off in the --report (it slows the build down)")
+    parser.add_argument("--profile", type=Path,
+                        help="run the build under cProfile and dump the stats to this file")
+    args = parser.parse_args()
+
+    dot_path = args.dot_file
+    config_path = args.config_file
+    output_path = args.output_file
+    if args.name:
+        if not re.match(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$", args.name):
+            parser.error(f"invalid bundle name: {args.name}")
+        output_path = project_root / "data" / args.name / "bundle.json"
 
     # Validate input files
-    if not dot_path.exists():
+    compare_dot = None
+    if args.config_only or str(dot_path) == "-":
+        compare_dot = dot_path if str(dot_path) != "-" and dot_path.exists() else None
+        dot_path = None
+    elif not dot_path.exists():
         print(f"Error: DOT file not found: {dot_path}")
         print("\nUsage: python build_bundle.py [dot_file] [config_file] [output_file]")
         sys.exit(1)
@@ -134,7 +520,40 @@ def main():
         print("\nUsage: python build_bundle.py [dot_file] [config_file] [output_file]")
         sys.exit(1)
 
-    build_bundle(dot_path, config_path, output_path)
+    if args.timing and not args.timing.exists():
+        print(f"Error: Timing report not found: {args.timing}")
+        sys.exit(1)
+
+    cache = None
+    if not args.no_cache:
+        cache_dir = args.cache_dir or output_path.parent / ".build_cache"
+        cache = BuildCache(cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+
+    profiler = None
+    if args.report or args.profile:
+        profiler = BuildProfiler(trace_memory=not args.no_trace_memory, profile=bool(args.profile))
+
+    build_bundle(dot_path, config_path, output_path, use_pydot=args.pydot,
+                 jobs=max(1, args.jobs), cache=cache, layout=not args.no_layout,
+                 binary=args.binary, compress=not args.no_compress,
+                 split_modules=not args.embed_modules, reachability=not args.no_reachability,
+                 search=not args.no_search_index, progress=profiler.stage if profiler else None,
+                 mmap_config=True if args.mmap_config else None, coarse=not args.no_coarse,
+                 stream=not args.no_stream, timing=args.timing, wasted=not args.no_wasted_work,
+                 compare_dot=compare_dot)
+
+    if profiler is not None:
+        report = profiler.finish(args.profile)
+        report["inputs"] = {"dot_file": str(dot_path) if dot_path else None, "config_file": str(config_path),
+                            "output_file": str(output_path), "jobs": max(1, args.jobs)}
+        print_report(report)
+        if args.report:
+            args.report.parent.mkdir(parents=True, exist_ok=True)
+            with open(args.report, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nBuild report: {args.report}")
+        if args.profile:
+            print(f"cProfile stats: {args.profile}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+On-disk cache for incremental bundle rebuilds.
+
+Entries are keyed by content hashes:
+- parsed graphs (GraphModel columns), by the hash of the DOT file
+- computed layouts, by the hash of the graph topology
+- parsed module records, by the hash of each module's config text,
+  together with the DOT hash they were last validated against
+- finished builds, by the hash of both inputs and the build options,
+  with every file the build wrote
+
+Entries are evicted least-recently-used first once the cache grows past
+its size cap.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from graph_model import GraphModel
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+CACHE_VERSION = 5
+
+# Entry kinds stored as one JSON file each
+BLOB_KINDS = ("graphs", "layouts")
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Return the hex content hash of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_values(*values):
+    """Return a hex hash of a sequence of JSON-serializable values."""
+    return hashlib.blake2b(json.dumps(values, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def _write_json_atomic(path, data):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+class BuildCache:
+    """
+    Content-hash cache shared by successive build_bundle runs.
+
+    Usage within one build:
+        cache.set_graph_hash(dot_hash)
+        parse_config_file(..., cache=cache)    # lookup_module/store_module
+        validate_and_enrich_input_tags(modules, label_to_id, only=cache.pending_validation())
+        cache.commit(modules)                  # before the records are modified further
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.index_path = self.cache_dir / "index.json"
+        self.modules_path = self.cache_dir / "modules.json"
+
+        self.graph_hash = None
+        self._pending = {}
+        self._dirty = False
+
+        self.index = self._load(self.index_path)
+        if self.index.get("version") != CACHE_VERSION:
+            self.index = {"version": CACHE_VERSION, "clock": 0, "builds": {}}
+            self.index.update({kind: {} for kind in BLOB_KINDS})
+            self.modules = {}
+        else:
+            self.modules = self._load(self.modules_path)
+
+        # Every build advances the clock; entries remember when they were last used
+        self.index["clock"] += 1
+        self.clock = self.index["clock"]
+
+    @staticmethod
+    def _load(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    # Finished builds
+
+    def is_up_to_date(self, build_key, output_path):
+        """
+        True if output_path was last written by a build with this key and
+        every file that build wrote is still there.
+        """
+        entry = self.index["builds"].get(str(output_path))
+        if entry is None or entry["key"] != build_key:
+            return False
+        directory = Path(output_path).parent
+        return all((directory / name).exists() for name in entry["outputs"])
+
+    def record_build(self, build_key, output_path, outputs):
+        """
+        Remember the key of the build that just wrote output_path.
+
+        Args:
+            outputs: Paths of every file the build wrote, output_path
+                included (bundle variants, module details, search index,
+                delta patches...)
+        """
+        directory = Path(output_path).parent
+        self.index["builds"][str(output_path)] = {
+            "key": build_key,
+            "outputs": sorted(os.path.relpath(path, directory) for path in outputs),
+        }
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.index_path, self.index)
+
+    # Parsed graphs
+
+    def set_graph_hash(self, graph_hash):
+        """Set the DOT hash the modules of this build are validated against."""
+        self.graph_hash = graph_hash
+
+    def _get_blob(self, kind, key):
+        entry = self.index[kind].get(key)
+        if entry is None:
+            return None
+        data = self._load(self.cache_dir / kind / f"{key}.json")
+        if not data:
+            del self.index[kind][key]
+            return None
+        entry["used"] = self.clock
+        self._dirty = True
+        return data
+
+    def _put_blob(self, kind, key, data):
+        blob_dir = self.cache_dir / kind
+        blob_dir.mkdir(parents=True, exist_ok=True)
+        path = blob_dir / f"{key}.json"
+        _write_json_atomic(path, data)
+        self.index[kind][key] = {"size": path.stat().st_size, "used": self.clock}
+        self._dirty = True
+
+    def get_graph(self, graph_hash):
+        """Return the cached parse_dot_file GraphModel for a DOT hash, or None."""
+        data = self._get_blob("graphs", graph_hash)
+        return GraphModel.from_columns(data) if data else None
+
+    def put_graph(self, graph_hash, graph):
+        self._put_blob("graphs", graph_hash, graph.to_columns())
+
+    # Layouts
+
+    def get_layout(self, topology_hash):
+        """Return cached node positions {id: [x, y]} for a topology hash, or None."""
+        return self._get_blob("layouts", topology_hash)
+
+    def put_layout(self, topology_hash, positions):
+        self._put_blob("layouts", topology_hash, positions)
+
+    # Parsed modules
+
+    def lookup_module(self, key, module_name):
+        """
+        Return (hit, record) for a module text hash. Records that were
+        validated against a different graph are returned as hits but
+        queued for re-validation.
+        """
+        entry = self.modules.get(key)
+        if entry is None:
+            return False, None
+        entry["used"] = self.clock
+        self._dirty = True
+        if entry["record"] is not None and entry["graph"] != self.graph_hash:
+            self._pending[key] = (module_name, entry["record"])
+        return True, entry["record"]
+
+    def store_module(self, key, module_name, record):
+        """Cache a freshly parsed record; it is saved after validation."""
+        if record is None:
+            self.modules[key] = {"record": None, "graph": None, "size": 0, "used": self.clock}
+            self._dirty = True
+        else:
+            self._pending[key] = (module_name, record)
+
+    def pending_validation(self):
+        """Names of modules that were parsed or need re-validation in this build."""
+        return {module_name for module_name, _ in self._pending.values()}
+
+    def commit(self, modules):
+        """
+        Store pending records, marking those present in the validated
+        modules dict as validated against the current graph (a definition
+        overridden by a later one with the same name was not validated),
+        then evict entries over the size cap and write the cache to disk.
+        """
+        for key, (module_name, record) in self._pending.items():
+            validated = modules.get(module_name) is record
+            size = len(json.dumps(record, separators=(',', ':')))
+            self.modules[key] = {"record": record, "graph": self.graph_hash if validated else None,
+                                 "size": size, "used": self.clock}
+            self._dirty = True
+        self._pending = {}
+
+        if not self._dirty:
+            return
+        self._evict()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        _write_json_atomic(self.modules_path, self.modules)
+        _write_json_atomic(self.index_path, self.index)
+        self._dirty = False
+
+    def total_bytes(self):
+        return (sum(e["size"] for kind in BLOB_KINDS for e in self.index[kind].values())
+                + sum(e["size"] for e in self.modules.values()))
+
+    def _evict(self):
+        """Drop least-recently-used entries until under max_bytes."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+
+        entries = [(e["used"], kind, k, e["size"])
+                   for kind in BLOB_KINDS for k, e in self.index[kind].items()]
+        entries += [(e["used"], "module", k, e["size"]) for k, e in self.modules.items()]
+        entries.sort(key=lambda item: item[0])
+
+        evicted = 0
+        for used, kind, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            if kind == "module":
+                del self.modules[key]
+            else:
+                del self.index[kind][key]
+                (self.cache_dir / kind / f"{key}.json").unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+
+        print(f"  Cache: evicted {evicted} entries ({total / 1024 / 1024:.1f} MB kept)")
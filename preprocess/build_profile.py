@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Per-stage instrumentation of a bundle build.
+
+BuildProfiler is passed as the progress callback of build_bundle and
+records, for every stage in BUILD_STAGES:
+- wall time and CPU time (user + system, including worker processes)
+- with trace_memory: the tracemalloc peak and the source lines that
+  allocated the most memory during the stage (tracemalloc only sees this
+  process, not --jobs workers, and slows the build down). A snapshot is
+  taken between stages and they are compared once the build is over,
+  when tracing no longer slows the comparison down.
+and with profile=True the whole build runs under cProfile.
+
+build_bundle.py --report writes the report as JSON and --profile the
+cProfile stats (readable with pstats or snakeviz).
+"""
+
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+
+REPORT_VERSION = 1
+
+# Allocation sites and functions listed per stage / in the profile
+TOP_ALLOCATIONS = 10
+TOP_FUNCTIONS = 25
+
+
+def _cpu_seconds():
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class BuildProfiler:
+    """
+    Usage:
+        profiler = BuildProfiler(trace_memory=True)
+        build_bundle(..., progress=profiler.stage)
+        report = profiler.finish()
+    """
+
+    def __init__(self, trace_memory=True, profile=False):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.profile = cProfile.Profile() if profile else None
+        self._current = None
+        self._snapshots = []
+        self._started_tracing = False
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._start_wall = time.perf_counter()
+        self._start_cpu = _cpu_seconds()
+        if self.profile is not None:
+            self.profile.enable()
+
+    def stage(self, name):
+        """Start a stage, ending the current one."""
+        self._end_stage()
+        if self.trace_memory:
+            if not self._snapshots:
+                self._snapshots.append(tracemalloc.take_snapshot())
+            tracemalloc.reset_peak()
+        self._current = {
+            "name": name,
+            "wall": time.perf_counter(),
+            "cpu": _cpu_seconds(),
+        }
+
+    def _end_stage(self):
+        if self._current is None:
+            return
+        current, self._current = self._current, None
+        entry = {
+            "name": current["name"],
+            "wall_seconds": round(time.perf_counter() - current["wall"], 4),
+            "cpu_seconds": round(_cpu_seconds() - current["cpu"], 4),
+        }
+
+        if self.trace_memory:
+            size, peak = tracemalloc.get_traced_memory()
+            entry["traced_bytes"] = size
+            entry["peak_bytes"] = peak
+            # Ends this stage and starts the next one
+            self._snapshots.append(tracemalloc.take_snapshot())
+        self.stages.append(entry)
+
+    @staticmethod
+    def _top_allocations(before, after):
+        """Source lines with the largest net allocations between two snapshots."""
+        # Skip the snapshots themselves (filter_traces is much slower)
+        ignore = (tracemalloc.__file__, "<frozen importlib._bootstrap>")
+        diff = [stat for stat in after.compare_to(before, "lineno")
+                if stat.size_diff > 0 and stat.traceback[0].filename not in ignore]
+        return [
+            {
+                "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                "bytes": stat.size_diff,
+                "count": stat.count_diff,
+            }
+            for stat in sorted(diff, key=lambda stat: stat.size_diff, reverse=True)[:TOP_ALLOCATIONS]
+        ]
+
+    def _top_functions(self):
+        stats = pstats.Stats(self.profile)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{filename}:{lineno}({name})",
+                "calls": calls,
+                "own_seconds": round(own, 4),
+                "cumulative_seconds": round(cumulative, 4),
+            }
+            for (filename, lineno, name), (_, calls, own, cumulative, _) in rows[:TOP_FUNCTIONS]
+        ]
+
+    def finish(self, profile_path=None):
+        """
+        End the last stage and stop tracing.
+
+        Args:
+            profile_path: Where to dump the cProfile stats, if profiling
+
+        Returns:
+            JSON-serializable report: {"version", "wall_seconds",
+            "cpu_seconds", "peak_bytes", "stages", "profile"}
+        """
+        self._end_stage()
+        if self.profile is not None:
+            self.profile.disable()
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        for stage, before, after in zip(self.stages, self._snapshots, self._snapshots[1:]):
+            stage["top_allocations"] = self._top_allocations(before, after)
+        self._snapshots = []
+
+        report = {
+            "version": REPORT_VERSION,
+            "wall_seconds": round(time.perf_counter() - self._start_wall, 4),
+            "cpu_seconds": round(_cpu_seconds() - self._start_cpu, 4),
+            "peak_bytes": max((stage.get("peak_bytes", 0) for stage in self.stages), default=0),
+            "stages": self.stages,
+            "profile": None,
+        }
+        if self.profile is not None:
+            if profile_path is not None:
+                self.profile.dump_stats(profile_path)
+            report["profile"] = {
+                "path": str(profile_path) if profile_path is not None else None,
+                "top_functions": self._top_functions(),
+            }
+        return report
+
+
+def print_report(report):
+    """Print the per-stage table of a report."""
+    memory = any("peak_bytes" in stage for stage in report["stages"])
+    print(f"\n{'stage':<14}{'wall (s)':>10}{'cpu (s)':>10}" + (f"{'peak (MB)':>12}" if memory else ""))
+    for stage in report["stages"]:
+        line = f"{stage['name']:<14}{stage['wall_seconds']:>10.2f}{stage['cpu_seconds']:>10.2f}"
+        if memory:
+            line += f"{stage['peak_bytes'] / 1024 / 1024:>12.1f}"
+        print(line)
+    print(f"{'total':<14}{report['wall_seconds']:>10.2f}{report['cpu_seconds']:>10.2f}" +
+          (f"{report['peak_bytes'] / 1024 / 1024:>12.1f}" if memory else ""))
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Path-level coarsening of the module graph.
+
+Path membership comes from the config (Paths, EndPaths and FinalPaths,
+with their Sequences and Tasks flattened) and from the subgraphs of the
+DOT file, each with the status inserter module that the dumper names
+after the Path. Every node is assigned to one group: the first Path listing
+it, in config order and then DOT order. A node in no Path joins the
+group of a module that consumes it, since an unscheduled producer runs
+for the Path that needs it; whatever is left forms OTHER_GROUP.
+
+The coarse graph stored in the bundle has one supernode per group and
+one edge per ordered pair of groups, weighted by the number of module
+edges between them. The app renders it first for large graphs and
+expands a supernode into its modules on demand.
+"""
+
+import sys
+import json
+from collections import deque
+from pathlib import Path
+
+from parse_graph import PATH_TYPES
+
+# Group of the nodes reached from no Path
+OTHER_GROUP = "(not in a Path)"
+
+# Supernode IDs are the group name behind this prefix, apart from node IDs
+GROUP_PREFIX = "path:"
+
+
+def expand_sequences(sequences):
+    """
+    Flatten nested Sequences and Tasks.
+
+    Args:
+        sequences: find_sequences output, name -> {"type", "items"}
+
+    Returns:
+        dict mapping each name to the module labels it runs, in order and
+        without repeats
+    """
+    expanded = {}
+
+    def expand(name, active):
+        if name in expanded:
+            return expanded[name]
+        labels = []
+        seen = set()
+        active.add(name)
+        for item in sequences[name]["items"]:
+            if item in sequences:
+                # A sequence that includes itself contributes nothing more
+                items = [] if item in active else expand(item, active)
+            else:
+                items = [item]
+            for label in items:
+                if label not in seen:
+                    seen.add(label)
+                    labels.append(label)
+        active.discard(name)
+        expanded[name] = labels
+        return labels
+
+    for name in sequences:
+        expand(name, set())
+    return expanded
+
+
+def path_membership(sequences, dot_paths):
+    """
+    Merge the Paths of the config with the Path subgraphs of the DOT file.
+
+    Args:
+        sequences: find_sequences output (may be empty)
+        dot_paths: parse_dot_file()["paths"]
+
+    Returns:
+        list of {"name", "type", "members"} (members being module labels),
+        config Paths first in definition order, then DOT-only ones
+    """
+    expanded = expand_sequences(sequences)
+    paths = {}
+    for name, sequence in sequences.items():
+        if sequence["type"] in PATH_TYPES:
+            paths[name] = {"name": name, "type": sequence["type"], "members": list(expanded[name])}
+
+    for dot_path in dot_paths:
+        if dot_path["type"] not in PATH_TYPES:
+            continue
+        path = paths.setdefault(dot_path["name"],
+                                {"name": dot_path["name"], "type": dot_path["type"], "members": []})
+        known = set(path["members"])
+        path["members"].extend(label for label in dot_path["members"] if label not in known)
+
+    # The dumper shows each Path's (End)PathStatusInserter as a module named after it
+    for path in paths.values():
+        if path["name"] not in path["members"]:
+            path["members"].append(path["name"])
+    return list(paths.values())
+
+
+def coarsen(graph, paths):
+    """
+    Build the coarse graph of parse_dot_file output.
+
+    Args:
+        graph: parse_dot_file GraphModel (nodes may carry x/y positions)
+        paths: path_membership output
+
+    Returns:
+        {"groups": [{"id", "name", "type", "nodes", "modules",
+        "internalEdges"[, "x", "y"]}], "edges": [{"source", "target",
+        "weight"}]}; nodes are the node IDs assigned to the group,
+        modules the number of graph nodes its Path lists (some of them
+        assigned to earlier Paths), and x/y the centroid of its nodes
+    """
+    label_to_id = graph.label_to_id
+    node_ids = graph.ids
+    edges = [(node_ids[source], node_ids[target]) for source, target in zip(graph.sources, graph.targets)]
+
+    group_of = {}
+    listed = {}
+    for path in paths:
+        ids = {label_to_id[label] for label in path["members"] if label in label_to_id}
+        listed[path["name"]] = len(ids)
+        for node_id in ids:
+            group_of.setdefault(node_id, path["name"])
+
+    # Unscheduled modules join a consumer's group (edges run consumer -> dependency)
+    dependencies = {}
+    for source, target in edges:
+        dependencies.setdefault(source, []).append(target)
+    queue = deque(node_id for node_id in node_ids if node_id in group_of)
+    while queue:
+        node_id = queue.popleft()
+        for target in dependencies.get(node_id, ()):
+            if target not in group_of:
+                group_of[target] = group_of[node_id]
+                queue.append(target)
+
+    types = {path["name"]: path["type"] for path in paths}
+    order = [path["name"] for path in paths] + [OTHER_GROUP]
+    members = {name: [] for name in order}
+    for node_id in node_ids:
+        members[group_of.setdefault(node_id, OTHER_GROUP)].append(node_id)
+
+    internal = {}
+    weights = {}
+    for source, target in edges:
+        source, target = group_of.get(source), group_of.get(target)
+        if source is None or target is None:
+            continue
+        if source == target:
+            internal[source] = internal.get(source, 0) + 1
+        else:
+            weights[(source, target)] = weights.get((source, target), 0) + 1
+
+    positions = {node_id: (x, y) for node_id, x, y in zip(node_ids, graph.nodes.column("x"), graph.nodes.column("y"))
+                 if isinstance(x, (int, float)) and isinstance(y, (int, float))}
+
+    groups = []
+    for name in order:
+        ids = members[name]
+        if not ids:
+            continue
+        group = {
+            "id": GROUP_PREFIX + name,
+            "name": name,
+            "type": types.get(name, "Other"),
+            "nodes": ids,
+            "modules": listed.get(name, len(ids)),
+            "internalEdges": internal.get(name, 0),
+        }
+        if all(node_id in positions for node_id in ids):
+            group["x"] = round(sum(positions[node_id][0] for node_id in ids) / len(ids), 1)
+            group["y"] = round(sum(positions[node_id][1] for node_id in ids) / len(ids), 1)
+        groups.append(group)
+
+    edges = [{"source": GROUP_PREFIX + source, "target": GROUP_PREFIX + target, "weight": weight}
+             for (source, target), weight in weights.items()]
+    return {"groups": groups, "edges": edges}
+
+
+def main():
+    from parse_graph import parse_dot_file
+    from parse_config import parse_config_file
+
+    if len(sys.argv) < 3:
+        print("Usage: python coarsen.py <dependency.gv> <dumpConfig.py>")
+        sys.exit(1)
+
+    graph = parse_dot_file(Path(sys.argv[1]))
+    sequences = {}
+    parse_config_file(Path(sys.argv[2]), sequences=sequences)
+    coarse = coarsen(graph, path_membership(sequences, graph.paths))
+
+    print(f"\n{len(coarse['groups'])} groups, {len(coarse['edges'])} edges "
+          f"(from {len(graph.nodes)} nodes, {len(graph.edges)} edges)")
+    for group in sorted(coarse["groups"], key=lambda group: len(group["nodes"]), reverse=True)[:20]:
+        print(f"  {len(group['nodes']):>6} nodes  {group['type']:<8} {group['name']}")
+    if "--json" in sys.argv:
+        print(json.dumps(coarse, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Build the module graph from dumpConfig.py alone, without a DOT file.
+
+graph_from_config turns parse_config_file output into the same GraphModel
+as parse_dot_file:
+- one node per EDProducer, EDFilter, EDAnalyzer and OutputModule, in
+  definition order, styled as the dependency dumper does: filters are
+  diamonds and OutputModules notes; modules run from a Path or EndPath
+  (scheduled) are green and the others (run on demand) lightgrey
+- one edge per module and InputTag naming another module of the graph,
+  consumer -> dependency
+- the framework modules the dumper adds: one (End)PathStatusInserter
+  named after each Path and EndPath, and TriggerResults, which consumes
+  the status of every Path
+- the Paths, EndPaths and FinalPaths with their Sequences and Tasks
+  flattened
+
+Paths are flattened once per Sequence (coarsen.expand_sequences) and
+InputTags are resolved by label lookup, so the cost is linear in the
+number of modules, tags and sequence items.
+
+The config does not know everything the dumper sees: products consumed
+without an InputTag parameter (e.g. consumes<T>(tag) built in C++) give
+no edge, and the source is not a node. compare_graphs reports how close a config-only graph comes to
+the one in a DOT file.
+
+Usage:
+    python config_graph.py <dumpConfig.py> [dependency.gv]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from coarsen import expand_sequences
+from graph_model import GraphModel
+from parse_graph import PATH_TYPES
+
+# Module types that are nodes of the graph (ES modules are not)
+GRAPH_TYPES = ("EDProducer", "EDFilter", "EDAnalyzer", "OutputModule")
+
+# Node shapes by module type, as written by the dumper
+SHAPES = {"EDFilter": "diamond", "OutputModule": "note"}
+
+# Plugins of the framework modules added for the Paths
+STATUS_INSERTERS = {"Path": "PathStatusInserter", "EndPath": "EndPathStatusInserter"}
+TRIGGER_RESULTS = "TriggerResults"
+
+# Differences listed per kind in the comparison report
+SAMPLE_SIZE = 10
+
+
+def _node_attrs(module_type, plugin, scheduled):
+    return [
+        ("color", "black"),
+        ("fillcolor", "green" if scheduled else "lightgrey"),
+        ("shape", SHAPES.get(module_type, "box")),
+        ("style", "filled"),
+        ("tooltip", plugin),
+    ]
+
+
+def graph_from_config(modules, sequences):
+    """
+    Derive the module graph from the parsed config.
+
+    Args:
+        modules: parse_config_file output
+        sequences: Paths, Sequences and Tasks (see parse_config.find_sequences)
+
+    Returns:
+        GraphModel, as from parse_dot_file
+    """
+    expanded = expand_sequences(sequences)
+    paths = [{"name": name, "type": sequence["type"], "members": list(expanded[name])}
+             for name, sequence in sequences.items() if sequence["type"] in PATH_TYPES]
+    scheduled = {label for path in paths for label in path["members"]}
+
+    graph = GraphModel()
+    rows = {}
+
+    def add_node(label, module_type, plugin, scheduled=False):
+        rows[label] = graph.add_node(str(len(graph.ids)), label, _node_attrs(module_type, plugin, scheduled))
+        return rows[label]
+
+    for name, module in modules.items():
+        if module.get("type") in GRAPH_TYPES:
+            add_node(name, module["type"], module.get("plugin", ""), name in scheduled)
+
+    for path in paths:
+        if path["type"] in STATUS_INSERTERS and path["name"] not in rows:
+            add_node(path["name"], "EDProducer", STATUS_INSERTERS[path["type"]])
+    if any(path["type"] == "Path" for path in paths) and TRIGGER_RESULTS not in rows:
+        trigger_results = add_node(TRIGGER_RESULTS, "OutputModule", "TriggerResultInserter")
+        for path in paths:
+            if path["type"] == "Path":
+                graph.add_edge(trigger_results, rows[path["name"]], [("style", "dashed")])
+
+    seen = set()
+    for name, source in rows.items():
+        if name not in modules:
+            continue
+        for tag in modules[name].get("inputTags", []):
+            target = rows.get(tag["module"])
+            if target is None or target == source or (source, target) in seen:
+                continue
+            seen.add((source, target))
+            graph.add_edge(source, target)
+
+    graph.paths = paths
+    print(f"Derived graph from the config: {len(graph.nodes)} nodes, {len(graph.edges)} edges, {len(paths)} Paths")
+    return graph
+
+
+def _labelled_edges(graph):
+    labels = graph.labels
+    return {(labels[source], labels[target]) for source, target in zip(graph.sources, graph.targets)}
+
+
+def _memberships(graph, names):
+    """(Path, module) pairs of the named Paths."""
+    return {(path["name"], label) for path in graph.paths if path["name"] in names
+            for label in path["members"] if label != path["name"]}
+
+
+def _ratio(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+# Kinds of items compared, in report order
+COMPARED = ("nodes", "edges", "memberships")
+
+
+def compare_graphs(dot_graph, config_graph):
+    """
+    Compare a config-derived graph with the DOT one, by module label.
+
+    Path memberships are compared over the Paths both graphs know.
+
+    Returns:
+        JSON-serializable dict: for each kind in COMPARED the counts
+        "dot", "config", "common", "onlyDot" and "onlyConfig", "recall"
+        (share of the DOT items found from the config), "precision"
+        (share of the config items that are in the DOT file) and samples
+        of the differences (edges and memberships as label pairs); plus
+        "paths" with the Paths of each and of both
+    """
+    dot_paths = {path["name"] for path in dot_graph.paths}
+    config_paths = {path["name"] for path in config_graph.paths}
+    common_paths = dot_paths & config_paths
+
+    items = {
+        "nodes": (set(dot_graph.label_to_id), set(config_graph.label_to_id)),
+        "edges": (_labelled_edges(dot_graph), _labelled_edges(config_graph)),
+        "memberships": (_memberships(dot_graph, common_paths), _memberships(config_graph, common_paths)),
+    }
+    report = {}
+    for kind in COMPARED:
+        dot_items, config_items = items[kind]
+        common = dot_items & config_items
+        only_dot = sorted(dot_items - config_items)
+        only_config = sorted(config_items - dot_items)
+        report[kind] = {
+            "dot": len(dot_items),
+            "config": len(config_items),
+            "common": len(common),
+            "onlyDot": len(only_dot),
+            "onlyConfig": len(only_config),
+            "recall": _ratio(len(common), len(dot_items)),
+            "precision": _ratio(len(common), len(config_items)),
+            "sampleOnlyDot": [item if kind == "nodes" else list(item) for item in only_dot[:SAMPLE_SIZE]],
+            "sampleOnlyConfig": [item if kind == "nodes" else list(item) for item in only_config[:SAMPLE_SIZE]],
+        }
+    report["paths"] = {"dot": len(dot_paths), "config": len(config_paths), "common": len(common_paths)}
+    return report
+
+
+def print_comparison(report):
+    """Print compare_graphs output as a table."""
+    print(f"\n{'':<12}{'DOT':>9}{'config':>9}{'common':>9}{'only DOT':>10}{'only cfg':>10}"
+          f"{'recall':>8}{'precision':>11}")
+    for kind in COMPARED:
+        row = report[kind]
+        recall = f"{100 * row['recall']:.1f}%" if row["recall"] is not None else "-"
+        precision = f"{100 * row['precision']:.1f}%" if row["precision"] is not None else "-"
+        print(f"{kind:<12}{row['dot']:>9,}{row['config']:>9,}{row['common']:>9,}{row['onlyDot']:>10,}"
+              f"{row['onlyConfig']:>10,}{recall:>8}{precision:>11}")
+    paths = report["paths"]
+    print(f"{'paths':<12}{paths['dot']:>9,}{paths['config']:>9,}{paths['common']:>9,}")
+
+    separators = {"edges": " -> ", "memberships": ": "}
+    for kind in COMPARED:
+        for key, title in (("sampleOnlyDot", "only in the DOT file"), ("sampleOnlyConfig", "only in the config")):
+            if report[kind][key]:
+                print(f"\nSome {kind} {title}:")
+                for item in report[kind][key]:
+                    print(f"  {separators[kind].join(item) if kind in separators else item}")
+
+
+def main():
+    from parse_config import parse_config_file
+    from parse_graph import parse_dot_file
+
+    parser = argparse.ArgumentParser(description="Derive the module graph from the config alone.")
+    parser.add_argument("config_file", type=Path)
+    parser.add_argument("dot_file", nargs="?", type=Path, help="DOT file to compare with")
+    parser.add_argument("--json", type=Path, help="write the comparison to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sequences = {}
+    modules = parse_config_file(args.config_file, sequences=sequences)
+    parsed = time.perf_counter()
+    config_graph = graph_from_config(modules, sequences)
+    print(f"Config parse {parsed - start:.2f} s, graph {time.perf_counter() - parsed:.2f} s")
+    if not args.dot_file:
+        return
+
+    start = time.perf_counter()
+    dot_graph = parse_dot_file(args.dot_file)
+    print(f"DOT parse {time.perf_counter() - start:.2f} s")
+
+    report = compare_graphs(dot_graph, config_graph)
+    print_comparison(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nComparison: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+Content hashes of a bundle, diffs between two bundles and the delta
+patches that bring an open app up to date after a rebuild.
+
+Every module record (with its parameters, InputTags and snippet) and
+every graph node (with its attributes and outgoing edges) has a content
+hash. The hashes are grouped in BUCKETS buckets by crc32(key), each with
+a hash over its entries. The rest of the bundle (bundle_sections: the
+metadata, reachability index, coarse graph and analyses) is hashed one
+section at a time. The hash over all buckets and sections is the
+bundle's contentHash (in its metadata), so it changes whenever any part
+of the bundle does, e.g. with a new timing report. Two bundles are compared bucket by bucket
+and only the entries of differing buckets are looked at, so a diff costs
+time proportional to the change rather than to the graph.
+
+For data/bundle.json, build_bundle.py keeps in data/bundle_versions/:
+- <contentHash>.json: the hashes of each of the last HISTORY builds
+- <contentHash>.patch.json: the patch from that build to the current
+  one, served by server.py as /api/delta?from=<contentHash> and applied
+  by app/js/delta.js. It carries the changed nodes and modules, every
+  changed section whole, and the node order when it changed, since the
+  reachability index and the analyses are indexed by node position.
+
+Usage:
+    python diff_bundles.py <old bundle> <new bundle> [--json]
+reports the added, removed and modified modules (with their parameters
+and InputTags), nodes and edges. Bundles are .json or .bin files.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from pathlib import Path
+
+HASHES_VERSION = 2
+
+# Buckets of keys with one hash each; the unit of comparison
+BUCKETS = 256
+
+# Builds whose hashes are kept, counting the current one
+HISTORY = 8
+
+# Past this fraction of changed entries no patch is written and the app
+# reloads the whole bundle instead
+MAX_PATCH_FRACTION = 0.5
+
+# Node attributes that only place the node in the layout
+POSITION_KEYS = ("x", "y")
+
+# Bundle keys hashed per entry (labelToId is made from the nodes); the
+# other keys are hashed whole, as sections
+ENTRY_KEYS = ("nodes", "edges", "modules", "labelToId")
+
+
+def _digest(record):
+    text = json.dumps(record, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).hexdigest()
+
+
+def _bucket(key):
+    return zlib.crc32(key.encode("utf-8", "surrogatepass")) % BUCKETS
+
+
+def _bucketed(records):
+    """Hash a dict of records into {"buckets": [hash], "entries": [{key: hash}]}."""
+    entries = [{} for _ in range(BUCKETS)]
+    for key, record in records.items():
+        entries[_bucket(key)][key] = _digest(record)
+
+    buckets = []
+    for bucket in entries:
+        digest = hashlib.blake2b(digest_size=8)
+        for key in sorted(bucket):
+            digest.update(f"{key}\0{bucket[key]}\n".encode("utf-8", "surrogatepass"))
+        buckets.append(digest.hexdigest())
+    return {"buckets": buckets, "entries": entries}
+
+
+def node_records(nodes, edges):
+    """
+    Returns:
+        {node ID: {"node": attributes, "out": outgoing edges in bundle order}}
+    """
+    records = {node["id"]: {"node": node, "out": []} for node in nodes}
+    for edge in edges:
+        record = records.get(edge["source"])
+        if record is not None:
+            record["out"].append(edge)
+    return records
+
+
+def bundle_sections(bundle):
+    """
+    The parts of a bundle hashed whole: every key but ENTRY_KEYS, with
+    the metadata less its contentHash.
+    """
+    sections = {key: value for key, value in bundle.items() if key not in ENTRY_KEYS}
+    sections["metadata"] = {key: value for key, value in bundle.get("metadata", {}).items()
+                            if key != "contentHash"}
+    return sections
+
+
+def content_hashes(records, modules, sections):
+    """
+    Hash the node records, full module records and sections of a bundle.
+
+    Args:
+        sections: bundle_sections() of the bundle
+
+    Returns:
+        JSON-serializable dict: {"version", "buckets", "contentHash",
+        "nodes", "modules", "sections", "order"}, sections being
+        {key: hash} and order the hash of the node IDs in bundle order
+    """
+    hashes = {
+        "version": HASHES_VERSION,
+        "buckets": BUCKETS,
+        "nodes": _bucketed(records),
+        "modules": _bucketed(modules),
+        "sections": {key: _digest(sections[key]) for key in sorted(sections)},
+        "order": _digest(list(records)),
+    }
+    root = "".join(hashes["nodes"]["buckets"] + hashes["modules"]["buckets"]
+                   + [f"{key}\0{digest}\n" for key, digest in hashes["sections"].items()]
+                   + [hashes["order"]])
+    hashes["contentHash"] = hashlib.blake2b(root.encode(), digest_size=16).hexdigest()
+    return hashes
+
+
+def changed_sections(old, new):
+    """Sorted keys of the sections that differ between two content_hashes() results."""
+    before, after = old["sections"], new["sections"]
+    return sorted(key for key in set(before) | set(after) if before.get(key) != after.get(key))
+
+
+def changed_keys(old, new, kind):
+    """
+    Compare the "nodes" or "modules" of two content_hashes() results.
+
+    Returns:
+        (added, removed, modified) sorted key lists
+    """
+    if old.get("version") != new.get("version") or old.get("buckets") != new.get("buckets"):
+        raise ValueError("Content hashes of different versions cannot be compared")
+
+    added, removed, modified = [], [], []
+    before_kind, after_kind = old[kind], new[kind]
+    for b, (before_hash, after_hash) in enumerate(zip(before_kind["buckets"], after_kind["buckets"])):
+        if before_hash == after_hash:
+            continue
+        before, after = before_kind["entries"][b], after_kind["entries"][b]
+        for key, digest in after.items():
+            if key not in before:
+                added.append(key)
+            elif before[key] != digest:
+                modified.append(key)
+        removed.extend(key for key in before if key not in after)
+    return sorted(added), sorted(removed), sorted(modified)
+
+
+def _diff_dicts(before, after):
+    """Returns {"added": {k: v}, "removed": {k: v}, "changed": {k: [old, new]}}, empty parts dropped."""
+    diff = {
+        "added": {k: v for k, v in after.items() if k not in before},
+        "removed": {k: v for k, v in before.items() if k not in after},
+        "changed": {k: [before[k], v] for k, v in after.items() if k in before and before[k] != v},
+    }
+    return {part: values for part, values in diff.items() if values}
+
+
+def _tag_key(tag):
+    index = tag.get("index")
+    return tag.get("field") if index is None else f"{tag.get('field')}[{index}]"
+
+
+def _module_changes(before, after):
+    """What changed in one module: fields, parameters and InputTags (by field)."""
+    changes = {}
+    fields = {key: [before.get(key), after.get(key)]
+              for key in sorted(set(before) | set(after))
+              if key not in ("parameters", "inputTags", "rawSnippet") and before.get(key) != after.get(key)}
+    if fields:
+        changes["fields"] = fields
+    parameters = _diff_dicts(before.get("parameters", {}), after.get("parameters", {}))
+    if parameters:
+        changes["parameters"] = parameters
+    tags = _diff_dicts({_tag_key(t): t for t in before.get("inputTags", [])},
+                       {_tag_key(t): t for t in after.get("inputTags", [])})
+    if tags:
+        changes["inputTags"] = tags
+    if not changes and before.get("rawSnippet") != after.get("rawSnippet"):
+        changes["snippetOnly"] = True
+    return changes
+
+
+def _edge_changes(before, after, report):
+    """Add the differences between two out-edge lists of a node to report["edges"]."""
+    before = {edge["target"]: edge for edge in (before or {}).get("out", [])}
+    after = {edge["target"]: edge for edge in (after or {}).get("out", [])}
+    diff = _diff_dicts(before, after)
+    report["added"].extend(diff.get("added", {}).values())
+    report["removed"].extend(diff.get("removed", {}).values())
+    report["modified"].extend({"before": old, "after": new} for old, new in diff.get("changed", {}).values())
+
+
+def diff_bundles(old, new):
+    """
+    Diff two bundles loaded with load_bundle().
+
+    Returns:
+        JSON-serializable report: {"from", "to", "modules": {"added",
+        "removed", "modified"}, "nodes": {"added", "removed", "modified",
+        "moved"}, "edges": {"added", "removed", "modified"}, "sections":
+        changed section keys}
+    """
+    old_hashes, new_hashes = old["hashes"], new["hashes"]
+    report = {
+        "from": old_hashes["contentHash"],
+        "to": new_hashes["contentHash"],
+        "modules": {"added": [], "removed": [], "modified": {}},
+        "nodes": {"added": [], "removed": [], "modified": {}, "moved": []},
+        "edges": {"added": [], "removed": [], "modified": []},
+        "sections": changed_sections(old_hashes, new_hashes),
+    }
+
+    added, removed, modified = changed_keys(old_hashes, new_hashes, "modules")
+    report["modules"]["added"] = added
+    report["modules"]["removed"] = removed
+    for name in modified:
+        report["modules"]["modified"][name] = _module_changes(old["modules"][name], new["modules"][name])
+
+    added, removed, modified = changed_keys(old_hashes, new_hashes, "nodes")
+    report["nodes"]["added"] = added
+    report["nodes"]["removed"] = removed
+    for node_id in added + removed + modified:
+        before, after = old["records"].get(node_id), new["records"].get(node_id)
+        _edge_changes(before, after, report["edges"])
+        if before is None or after is None:
+            continue
+        attributes = _diff_dicts(before["node"], after["node"])
+        if not attributes:
+            continue
+        if set().union(*attributes.values()) <= set(POSITION_KEYS):
+            report["nodes"]["moved"].append(node_id)
+        else:
+            report["nodes"]["modified"][node_id] = attributes
+    return report
+
+
+def make_patch(old_hashes, new_hashes, records, modules, metadata, sections):
+    """
+    Patch from the build with old_hashes to the one with new_hashes.
+
+    Args:
+        records: node_records() of the new bundle
+        modules: Module records as stored in the new bundle
+        metadata: Metadata of the new bundle
+        sections: bundle_sections() of the new bundle
+
+    Returns:
+        JSON-serializable patch, or None when more than
+        MAX_PATCH_FRACTION of the entries changed
+    """
+    node_added, node_removed, node_modified = changed_keys(old_hashes, new_hashes, "nodes")
+    module_added, module_removed, module_modified = changed_keys(old_hashes, new_hashes, "modules")
+    changed = sum(map(len, (node_added, node_removed, node_modified,
+                            module_added, module_removed, module_modified)))
+    if changed > MAX_PATCH_FRACTION * max(1, len(records) + len(modules)):
+        return None
+
+    changed = [key for key in changed_sections(old_hashes, new_hashes) if key != "metadata"]
+    patch = {
+        "version": HASHES_VERSION,
+        "from": old_hashes["contentHash"],
+        "to": new_hashes["contentHash"],
+        "metadata": metadata,
+        "sections": {key: sections[key] for key in changed if key in sections},
+        "removeSections": [key for key in changed if key not in sections],
+        "nodes": {
+            "upsert": [records[node_id] for node_id in node_added + node_modified],
+            "remove": node_removed,
+        },
+        "modules": {
+            "upsert": {name: modules[name] for name in module_added + module_modified},
+            "remove": module_removed,
+        },
+    }
+    if node_added or node_removed or old_hashes.get("order") != new_hashes["order"]:
+        patch["order"] = list(records)
+    return patch
+
+
+def _write_text_atomic(path, text):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def versions_dir(bundle_path):
+    """Directory of the kept hashes and patches of a bundle path."""
+    bundle_path = Path(bundle_path)
+    return bundle_path.with_name(bundle_path.stem + "_versions")
+
+
+def remove_patches(bundle_path):
+    """Delete the patches to the current build, before it is replaced."""
+    directory = versions_dir(bundle_path)
+    if directory.is_dir():
+        for path in directory.glob("*.patch.json"):
+            path.unlink()
+
+
+def write_versions(hashes, records, modules, metadata, sections, bundle_path):
+    """
+    Keep the hashes of this build, drop those older than HISTORY builds
+    and write a patch to this build from each kept one (an empty patch
+    from itself).
+
+    Args:
+        records, modules, metadata, sections: As for make_patch()
+
+    Returns:
+        Number of patches written
+    """
+    directory = versions_dir(bundle_path)
+    directory.mkdir(parents=True, exist_ok=True)
+    remove_patches(bundle_path)
+    current = directory / f"{hashes['contentHash']}.json"
+    _write_text_atomic(current, json.dumps(hashes, separators=(",", ":")))
+
+    kept = sorted((path for path in directory.glob("*.json")
+                   if not path.name.endswith(".patch.json") and path != current),
+                  key=lambda path: path.stat().st_mtime_ns, reverse=True)
+    for stale in kept[HISTORY - 1:]:
+        stale.unlink()
+
+    written = 0
+    for path in [current] + kept[:HISTORY - 1]:
+        try:
+            old_hashes = hashes if path == current else json.loads(path.read_text(encoding="utf-8"))
+            patch = make_patch(old_hashes, hashes, records, modules, metadata, sections)
+        except (OSError, ValueError, KeyError):
+            continue
+        if patch is not None:
+            _write_text_atomic(directory / f"{old_hashes['contentHash']}.patch.json",
+                               json.dumps(patch, separators=(",", ":")))
+            written += 1
+    return written
+
+
+def load_bundle(path):
+    """
+    Load a bundle (.json or .bin) with its full module records.
+
+    Returns:
+        {"nodes", "edges", "modules", "metadata", "records", "hashes"},
+        with the hashes kept by the build when they are available
+    """
+    from binary_bundle import BinaryBundle
+    from module_details import details_paths
+
+    path = Path(path)
+    if path.suffix == ".bin":
+        bundle = BinaryBundle(path).to_dict()
+    else:
+        with open(path, encoding="utf-8") as f:
+            bundle = json.load(f)
+
+    metadata = bundle.get("metadata", {})
+    modules = bundle["modules"]
+    if metadata.get("moduleDetails"):
+        with open(details_paths(path)[0], encoding="utf-8") as f:
+            modules = json.load(f)
+    records = node_records(bundle["nodes"], bundle["edges"])
+
+    hashes = None
+    content_hash = metadata.get("contentHash")
+    if content_hash:
+        try:
+            with open(versions_dir(path) / f"{content_hash}.json", encoding="utf-8") as f:
+                hashes = json.load(f)
+        except (OSError, ValueError):
+            hashes = None
+    if hashes is None or hashes.get("version") != HASHES_VERSION or hashes.get("buckets") != BUCKETS:
+        hashes = content_hashes(records, modules, bundle_sections(bundle))
+
+    return {
+        "nodes": bundle["nodes"],
+        "edges": bundle["edges"],
+        "modules": modules,
+        "metadata": metadata,
+        "records": records,
+        "hashes": hashes,
+    }
+
+
+def _print_report(report):
+    modules, nodes, edges = report["modules"], report["nodes"], report["edges"]
+    print(f"\nModules: +{len(modules['added'])} -{len(modules['removed'])} ~{len(modules['modified'])}")
+    for name in modules["added"]:
+        print(f"  + {name}")
+    for name in modules["removed"]:
+        print(f"  - {name}")
+    for name, changes in modules["modified"].items():
+        print(f"  ~ {name}")
+        for key, (before, after) in changes.get("fields", {}).items():
+            print(f"      {key}: {before} -> {after}")
+        parameters = changes.get("parameters", {})
+        for param, value in parameters.get("added", {}).items():
+            print(f"      + {param} = {value.get('value')}")
+        for param in parameters.get("removed", {}):
+            print(f"      - {param}")
+        for param, (before, after) in parameters.get("changed", {}).items():
+            print(f"      ~ {param}: {before.get('value')} -> {after.get('value')}")
+        tags = changes.get("inputTags", {})
+        for key, tag in tags.get("added", {}).items():
+            print(f"      + InputTag {key} -> {tag.get('module')}")
+        for key, tag in tags.get("removed", {}).items():
+            print(f"      - InputTag {key} -> {tag.get('module')}")
+        for key, (before, after) in tags.get("changed", {}).items():
+            print(f"      ~ InputTag {key}: {before.get('module')} -> {after.get('module')}")
+        if changes.get("snippetOnly"):
+            print("      (config snippet only)")
+
+    print(f"\nNodes: +{len(nodes['added'])} -{len(nodes['removed'])} ~{len(nodes['modified'])} "
+          f"(moved: {len(nodes['moved'])})")
+    for node_id in nodes["added"]:
+        print(f"  + {node_id}")
+    for node_id in nodes["removed"]:
+        print(f"  - {node_id}")
+    for node_id, attributes in nodes["modified"].items():
+        changed = sorted(set().union(*attributes.values()) - set(POSITION_KEYS))
+        print(f"  ~ {node_id}: {', '.join(changed)}")
+
+    print(f"\nEdges: +{len(edges['added'])} -{len(edges['removed'])} ~{len(edges['modified'])}")
+    for edge in edges["added"]:
+        print(f"  + {edge['source']} -> {edge['target']}")
+    for edge in edges["removed"]:
+        print(f"  - {edge['source']} -> {edge['target']}")
+    for change in edges["modified"]:
+        print(f"  ~ {change['after']['source']} -> {change['after']['target']}")
+
+    if report["sections"]:
+        print(f"\nSections: {', '.join(report['sections'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report what changed between two bundles.")
+    parser.add_argument("old_bundle", type=Path)
+    parser.add_argument("new_bundle", type=Path)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    for path in (args.old_bundle, args.new_bundle):
+        if not path.exists():
+            print(f"Error: bundle not found: {path}")
+            sys.exit(1)
+
+    start = time.perf_counter()
+    old, new = load_bundle(args.old_bundle), load_bundle(args.new_bundle)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    report = diff_bundles(old, new)
+    diff_seconds = time.perf_counter() - start
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+        return
+    print(f"{args.old_bundle} ({report['from']})\n  -> {args.new_bundle} ({report['to']})")
+    if report["from"] == report["to"]:
+        print("\nNo changes")
+    else:
+        _print_report(report)
+    print(f"\nLoaded in {load_seconds:.2f} s, diffed in {diff_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
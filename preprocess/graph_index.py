@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Adjacency index over a bundle's graph for neighborhood queries.
+
+Backs the /api/ego and /api/deps endpoints of server.py. Traversals
+match EgoGraphManager.getNeighborhood and DependencyExplorer.getDependencies
+in the app, but run over integer adjacency lists instead of Cytoscape
+collections and return only the subgraph that was reached.
+
+Usage:
+    python graph_index.py [bundle.json|bundle.bin] [--queries N]
+benchmarks query latency (on a synthetic 10k-node graph by default).
+"""
+
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from binary_bundle import BinaryBundle, MAGIC
+
+# Traversal directions accepted by deps()
+DIRECTIONS = ("upstream", "downstream", "both", "paths")
+
+
+class GraphIndex:
+    """Integer adjacency lists for the nodes and edges of a bundle."""
+
+    def __init__(self, nodes, edges, label_to_id=None):
+        self.nodes = nodes
+        self.edges = edges
+
+        self.index = {}
+        for i, node in enumerate(nodes):
+            self.index.setdefault(node["id"], i)
+        self.label_to_id = label_to_id or {}
+
+        self.out_edges = [[] for _ in nodes]
+        self.in_edges = [[] for _ in nodes]
+        self.edge_source = []
+        self.edge_target = []
+        for e, edge in enumerate(edges):
+            source = self.index[edge["source"]]
+            target = self.index[edge["target"]]
+            self.edge_source.append(source)
+            self.edge_target.append(target)
+            self.out_edges[source].append(e)
+            self.in_edges[target].append(e)
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        return cls(bundle["nodes"], bundle["edges"], bundle.get("labelToId"))
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Build the index from the contents of a bundle.json or bundle.bin file."""
+        if data[:len(MAGIC)] == MAGIC:
+            bundle = BinaryBundle(data).to_dict()
+        else:
+            bundle = json.loads(data)
+        return cls.from_bundle(bundle)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def resolve(self, node):
+        """Return the index of a node given its ID or module label, or None."""
+        if node in self.index:
+            return self.index[node]
+        node_id = self.label_to_id.get(node)
+        return self.index.get(node_id) if node_id is not None else None
+
+    def _bfs(self, center, depth, outgoing, incoming):
+        """
+        Breadth-first walk from center. Every edge followed from a node
+        within depth - 1 hops is part of the result, as in the app.
+
+        Returns:
+            (dict node index -> distance, set of edge indices)
+        """
+        distance = {center: 0}
+        edges = set()
+        frontier = [center]
+        for level in range(1, depth + 1):
+            next_frontier = []
+            for node in frontier:
+                if outgoing:
+                    for e in self.out_edges[node]:
+                        edges.add(e)
+                        target = self.edge_target[e]
+                        if target not in distance:
+                            distance[target] = level
+                            next_frontier.append(target)
+                if incoming:
+                    for e in self.in_edges[node]:
+                        edges.add(e)
+                        source = self.edge_source[e]
+                        if source not in distance:
+                            distance[source] = level
+                            next_frontier.append(source)
+            frontier = next_frontier
+            if not frontier:
+                break
+        return distance, edges
+
+    def ego(self, center, radius):
+        """
+        Undirected neighborhood of a node index within radius hops.
+
+        Returns:
+            (dict node index -> distance, set of edge indices)
+        """
+        return self._bfs(center, radius, outgoing=True, incoming=True)
+
+    def deps(self, center, direction, depth):
+        """
+        Upstream (predecessors), downstream (successors), both (undirected)
+        or paths (upstream and downstream combined) within depth hops.
+
+        Returns:
+            (dict node index -> distance, set of edge indices)
+        """
+        if direction == "paths":
+            up_nodes, up_edges = self._bfs(center, depth, outgoing=False, incoming=True)
+            down_nodes, down_edges = self._bfs(center, depth, outgoing=True, incoming=False)
+            for node, dist in down_nodes.items():
+                up_nodes.setdefault(node, dist)
+            return up_nodes, up_edges | down_edges
+        if direction == "upstream":
+            return self._bfs(center, depth, outgoing=False, incoming=True)
+        if direction == "downstream":
+            return self._bfs(center, depth, outgoing=True, incoming=False)
+        if direction == "both":
+            return self._bfs(center, depth, outgoing=True, incoming=True)
+        raise ValueError(f"Unknown direction: {direction}")
+
+    def subgraph(self, center, distance, edges):
+        """JSON-ready subgraph with the bundle's node and edge objects."""
+        return {
+            "center": self.nodes[center]["id"],
+            "nodes": [self.nodes[i] for i in distance],
+            "edges": [self.edges[e] for e in sorted(edges)],
+            "distance": {self.nodes[i]["id"]: d for i, d in distance.items()},
+        }
+
+
+def _synthetic_bundle(num_nodes):
+    from bench_parse_graph import write_synthetic_dot
+    from parse_graph import parse_dot_file
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dot_path = Path(tmp) / "synthetic.gv"
+        write_synthetic_dot(dot_path, num_nodes * 3)
+        return parse_dot_file(dot_path).to_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ego/deps query latency.")
+    parser.add_argument("bundle", nargs="?", type=Path, help="bundle.json or bundle.bin (default: synthetic)")
+    parser.add_argument("--nodes", type=int, default=10_000, help="synthetic graph size")
+    parser.add_argument("--queries", type=int, default=2000, help="queries per kind")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.bundle:
+        index = GraphIndex.load(args.bundle)
+    else:
+        index = GraphIndex.from_bundle(_synthetic_bundle(args.nodes))
+    print(f"Index: {len(index.nodes):,} nodes, {len(index.edges):,} edges, "
+          f"built in {time.perf_counter() - start:.2f} s\n")
+
+    rng = random.Random(1)
+    queries = [("ego r=1", lambda c: index.ego(c, 1)),
+               ("ego r=2", lambda c: index.ego(c, 2)),
+               ("upstream d=3", lambda c: index.deps(c, "upstream", 3)),
+               ("downstream d=3", lambda c: index.deps(c, "downstream", 3)),
+               ("paths d=3", lambda c: index.deps(c, "paths", 3))]
+
+    print(f"{'query':<16}{'p50 ms':>9}{'p99 ms':>9}{'nodes':>9}")
+    for name, query in queries:
+        latencies, sizes = [], []
+        for _ in range(args.queries):
+            center = rng.randrange(len(index.nodes))
+            t = time.perf_counter()
+            distance, edges = query(center)
+            index.subgraph(center, distance, edges)
+            latencies.append(time.perf_counter() - t)
+            sizes.append(len(distance))
+        latencies.sort()
+        print(f"{name:<16}{statistics.median(latencies) * 1000:>9.3f}"
+              f"{latencies[int(0.99 * len(latencies))] * 1000:>9.3f}{statistics.median(sizes):>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
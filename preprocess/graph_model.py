@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory model of the module graph, shared by the build stages.
+
+parse_dot_file and config_graph.graph_from_config fill a GraphModel
+directly instead of building a dict per node and per edge:
+- nodes are rows: their IDs and labels are lists of interned strings,
+  other attributes are columns (one list per attribute name, None where
+  a node lacks it), with values interned too, so the colors, shapes and
+  plugin names shared by thousands of nodes are stored once
+- edges are two arrays of node row indices plus attribute columns
+- the out-edges of each node are an index (CSR) built on first use
+
+model.nodes and model.edges are sequences of the same dicts as the old
+parse_dot_file output, built when an item is read, so the stages and
+writers that iterate them keep working; the JSON, NDJSON and binary
+writers read them a batch or a column at a time (see stream_bundle and
+binary_bundle). Stages that only need the structure use edge_index_pairs
+and never build an edge dict. NetworkX is imported only by to_networkx.
+
+Module records stay plain dicts (they are the JSON of the bundle, the
+module details and the build cache); compact_modules interns their
+repeated strings and shares equal parameter entries between them.
+"""
+
+import sys
+from abc import abstractmethod
+from array import array
+from collections.abc import Mapping, Sequence
+
+
+# String fields of an InputTag record
+TAG_STRINGS = ("field", "type", "module", "instance", "process")
+
+
+def intern_value(value):
+    """Interned copy of a string; other values unchanged."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def compact_modules(modules):
+    """
+    Intern the module names, types, plugins, parameter names and InputTag
+    fields of parse_config_file records, and make records share equal
+    {"type", "value"} parameter entries (nothing modifies them once
+    parsed). Records are changed in place, so they stay the objects the
+    build cache holds.
+
+    Returns:
+        The modules dict, with interned keys
+    """
+    entries = {}
+    for record in modules.values():
+        for key in ("type", "plugin"):
+            if key in record:
+                record[key] = intern_value(record[key])
+        parameters = record.get("parameters")
+        if parameters:
+            record["parameters"] = {
+                sys.intern(name): entries.setdefault((param.get("type"), param.get("value")), param)
+                if isinstance(param, dict) and len(param) == 2 else param
+                for name, param in parameters.items()
+            }
+        for tag in record.get("inputTags", ()):
+            for key in TAG_STRINGS:
+                if key in tag:
+                    tag[key] = intern_value(tag[key])
+    return {sys.intern(name): record for name, record in modules.items()}
+
+
+class RowView(Sequence):
+    """
+    Read-only sequence of row dicts, each built when it is read.
+    Subclasses give __len__ and _row.
+    """
+
+    __slots__ = ("model",)
+
+    def __init__(self, model):
+        self.model = model
+
+    @abstractmethod
+    def _row(self, i):
+        """Dict of row i, 0 <= i < len(self)."""
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._row(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._row(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+
+class NodeView(RowView):
+    """model.nodes: {"id", "label", attribute...} per node row."""
+
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.model.ids)
+
+    def _row(self, i):
+        return self.model.node(i)
+
+    def column(self, key):
+        """Value of one attribute for every node, None where absent."""
+        model = self.model
+        if key == "id":
+            return model.ids
+        if key == "label":
+            return model.labels
+        return model.node_columns.get(key) or [None] * len(model.ids)
+
+
+class EdgeView(RowView):
+    """model.edges: {"source", "target", attribute...} per edge."""
+
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.model.sources)
+
+    def _row(self, i):
+        return self.model.edge(i)
+
+
+class NodeRecords(Mapping):
+    """
+    diff_bundles.node_records of a model: {node ID: {"node", "out"}},
+    each record built when it is read.
+    """
+
+    __slots__ = ("model", "_rows")
+
+    def __init__(self, model):
+        self.model = model
+        self._rows = None
+
+    def _row_of(self, node_id):
+        # Duplicate node IDs: the last row is the node, as in node_records
+        if self._rows is None:
+            model = self.model
+            self._rows = model.index if len(model.index) == len(model.ids) else \
+                {node_id: row for row, node_id in enumerate(model.ids)}
+        return self._rows[node_id]
+
+    def __getitem__(self, node_id):
+        model = self.model
+        node = model.node(self._row_of(node_id))
+        return {"node": node, "out": [model.edge(k) for k in model.out_edges(model.index[node_id])]}
+
+    def __iter__(self):
+        return iter(self.model.index)
+
+    def __len__(self):
+        return len(self.model.index)
+
+
+class GraphModel:
+    """
+    Nodes, edges, label -> ID mapping and Paths of a module graph.
+
+    Attributes:
+        ids, labels: Node ID and label per row (a DOT file may list a
+            node twice; index maps each ID to its first row)
+        node_columns: {attribute: value per row}
+        sources, targets: Node rows of each edge's endpoints
+        edge_columns: {attribute: value per edge}
+        label_to_id: {label: node ID}
+        paths: [{name, type, members}], members being node labels
+        is_directed: Whether the graph is a digraph
+    """
+
+    __slots__ = ("ids", "labels", "node_columns", "index", "sources", "targets", "edge_columns",
+                 "label_to_id", "paths", "is_directed", "nodes", "edges", "_out")
+
+    def __init__(self, is_directed=True):
+        self.ids = []
+        self.labels = []
+        self.node_columns = {}
+        self.index = {}
+        self.sources = array("i")
+        self.targets = array("i")
+        self.edge_columns = {}
+        self.label_to_id = {}
+        self.paths = []
+        self.is_directed = is_directed
+        self.nodes = NodeView(self)
+        self.edges = EdgeView(self)
+        self._out = None
+
+    # Building
+
+    @staticmethod
+    def _append(columns, count, attrs):
+        """Append a row of attributes to columns holding count rows."""
+        for key, value in attrs:
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = [None] * count
+            column.append(intern_value(value))
+        for column in columns.values():
+            if len(column) == count:
+                column.append(None)
+
+    def add_node(self, node_id, label, attrs=()):
+        """
+        Append a node row.
+
+        Args:
+            attrs: (name, value) pairs other than the ID and label
+
+        Returns:
+            The row index
+        """
+        row = len(self.ids)
+        node_id = sys.intern(node_id)
+        label = sys.intern(label)
+        self.ids.append(node_id)
+        self.labels.append(label)
+        self.index.setdefault(node_id, row)
+        self._append(self.node_columns, row, attrs)
+        if label:
+            self.label_to_id[label] = node_id
+        return row
+
+    def add_edge(self, source, target, attrs=()):
+        """Append an edge between two node rows."""
+        self._append(self.edge_columns, len(self.sources), attrs)
+        self.sources.append(source)
+        self.targets.append(target)
+        self._out = None
+
+    def set_positions(self, positions):
+        """Store layout.compute_layout positions as the x/y columns."""
+        xs = self.node_columns.setdefault("x", [None] * len(self.ids))
+        ys = self.node_columns.setdefault("y", [None] * len(self.ids))
+        for row, node_id in enumerate(self.ids):
+            position = positions.get(node_id)
+            if position is not None:
+                xs[row], ys[row] = position
+
+    # Reading
+
+    def node(self, row):
+        node = {"id": self.ids[row], "label": self.labels[row]}
+        for key, column in self.node_columns.items():
+            value = column[row]
+            if value is not None:
+                node[key] = value
+        return node
+
+    def edge(self, k):
+        edge = {"source": self.ids[self.sources[k]], "target": self.ids[self.targets[k]]}
+        for key, column in self.edge_columns.items():
+            value = column[k]
+            if value is not None:
+                edge[key] = value
+        return edge
+
+    def out_edges(self, row):
+        """Indices of the edges from a node row, in edge order."""
+        if self._out is None:
+            num_nodes = len(self.ids)
+            offsets = array("i", [0]) * (num_nodes + 1)
+            for source in self.sources:
+                offsets[source + 1] += 1
+            for i in range(num_nodes):
+                offsets[i + 1] += offsets[i]
+            order = array("i", [0]) * len(self.sources)
+            fill = offsets[:-1]
+            for k, source in enumerate(self.sources):
+                order[fill[source]] = k
+                fill[source] += 1
+            self._out = (offsets, order)
+        offsets, order = self._out
+        return order[offsets[row]:offsets[row + 1]]
+
+    def records(self):
+        """diff_bundles.node_records of the graph, built lazily."""
+        return NodeRecords(self)
+
+    # Conversions
+
+    def to_dict(self):
+        """The graph as plain dicts, as parse_dot_file used to return it."""
+        return {
+            "nodes": list(self.nodes),
+            "edges": list(self.edges),
+            "labelToId": dict(self.label_to_id),
+            "is_directed": self.is_directed,
+            "paths": self.paths,
+        }
+
+    @classmethod
+    def from_dict(cls, graph_data):
+        """Model of a to_dict() dict or a bundle's nodes, edges and labelToId."""
+        model = cls(graph_data.get("is_directed", True))
+        for node in graph_data["nodes"]:
+            model.add_node(node["id"], node.get("label", node["id"]),
+                           [(k, v) for k, v in node.items() if k not in ("id", "label")])
+        label_to_id = graph_data.get("labelToId")
+        if label_to_id is not None:
+            model.label_to_id = {sys.intern(label): sys.intern(node_id) for label, node_id in label_to_id.items()}
+        for edge in graph_data["edges"]:
+            source, target = model.index.get(edge["source"]), model.index.get(edge["target"])
+            if source is not None and target is not None:
+                model.add_edge(source, target, [(k, v) for k, v in edge.items() if k not in ("source", "target")])
+        model.paths = graph_data.get("paths", [])
+        return model
+
+    def to_columns(self):
+        """JSON-serializable columnar form, for the build cache."""
+        return {
+            "ids": self.ids,
+            "labels": self.labels,
+            "nodeColumns": self.node_columns,
+            "sources": self.sources.tolist(),
+            "targets": self.targets.tolist(),
+            "edgeColumns": self.edge_columns,
+            "labelToId": self.label_to_id,
+            "paths": self.paths,
+            "isDirected": self.is_directed,
+        }
+
+    @classmethod
+    def from_columns(cls, data):
+        """Model of a to_columns() dict."""
+        model = cls(data["isDirected"])
+        model.ids = [sys.intern(node_id) for node_id in data["ids"]]
+        model.labels = [sys.intern(label) for label in data["labels"]]
+        for row, node_id in enumerate(model.ids):
+            model.index.setdefault(node_id, row)
+        model.node_columns = {key: [intern_value(v) for v in column] for key, column in data["nodeColumns"].items()}
+        model.sources = array("i", data["sources"])
+        model.targets = array("i", data["targets"])
+        model.edge_columns = {key: [intern_value(v) for v in column] for key, column in data["edgeColumns"].items()}
+        model.label_to_id = {sys.intern(label): sys.intern(node_id) for label, node_id in data["labelToId"].items()}
+        model.paths = data["paths"]
+        return model
+
+    def to_networkx(self):
+        """NetworkX graph of the model; networkx is imported only here."""
+        import networkx as nx
+
+        G = nx.DiGraph() if self.is_directed else nx.Graph()
+        for node in self.nodes:
+            G.add_node(node["id"], **node)
+        for edge in self.edges:
+            attrs = {k: v for k, v in edge.items() if k not in ("source", "target")}
+            G.add_edge(edge["source"], edge["target"], **attrs)
+        return G
+
+
+def edge_index_pairs(nodes, edges):
+    """
+    (source, target) node indices of the edges, an index being the first
+    node with that ID; edges to unknown nodes are left out. Read from the
+    arrays of a GraphModel without building edge dicts.
+    """
+    if isinstance(edges, EdgeView):
+        return list(zip(edges.model.sources, edges.model.targets))
+    index = {}
+    for i, node in enumerate(nodes):
+        index.setdefault(node["id"], i)
+    pairs = []
+    for edge in edges:
+        source, target = index.get(edge["source"]), index.get(edge["target"])
+        if source is not None and target is not None:
+            pairs.append((source, target))
+    return pairs
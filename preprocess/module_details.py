@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Split per-module details out of the bundle.
+
+The bundle keeps only each module's type and plugin (enough for the
+graph and its filters). The full records, with parameters, InputTags
+and rawSnippet, are written next to it and fetched when a module is
+selected. For data/bundle.json:
+- data/bundle_modules.json: every record, served by server.py as
+  /api/module/<name>
+- data/bundle_modules/NNN.js: the same records in shards, loaded with
+  <script> tags in static (file://) mode. A module's shard is
+  fnv1a(name) % shards, as in app/js/details.js.
+"""
+
+import json
+import math
+import os
+from collections.abc import Mapping
+from pathlib import Path
+
+# Fields kept in the slim bundle
+SUMMARY_FIELDS = ("type", "plugin")
+
+# Target size of one static shard
+SHARD_BYTES = 128 * 1024
+
+
+def fnv1a(text):
+    """32-bit FNV-1a hash of the UTF-8 bytes of text."""
+    h = 0x811C9DC5
+    for byte in text.encode("utf-8", "surrogatepass"):
+        h = ((h ^ byte) * 0x01000193) & 0xFFFFFFFF
+    return h
+
+
+class ModuleSummaries(Mapping):
+    """Slim records of a modules dict, each built when it is read."""
+
+    __slots__ = ("modules",)
+
+    def __init__(self, modules):
+        self.modules = modules
+
+    def __getitem__(self, name):
+        module = self.modules[name]
+        return {key: module.get(key) for key in SUMMARY_FIELDS}
+
+    def __iter__(self):
+        return iter(self.modules)
+
+    def __len__(self):
+        return len(self.modules)
+
+
+def split_module_details(modules):
+    """
+    Returns:
+        Mapping of slim module records holding only SUMMARY_FIELDS, built
+        from the full records as they are written rather than copied
+    """
+    return ModuleSummaries(modules)
+
+
+def _write_text_atomic(path, text):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def details_paths(bundle_path):
+    """Return (details JSON path, shard directory) for a bundle path."""
+    bundle_path = Path(bundle_path)
+    base = bundle_path.with_name(bundle_path.stem + "_modules")
+    return base.with_suffix(".json"), base
+
+
+def write_module_details(modules, bundle_path):
+    """
+    Write the details JSON and the static shards next to bundle_path,
+    replacing shards left by an earlier build.
+
+    Returns:
+        Metadata for the bundle: {"path", "shards", "bytes"}
+    """
+    details_path, shard_dir = details_paths(bundle_path)
+    records = {name: json.dumps(module, separators=(",", ":")) for name, module in modules.items()}
+    total = sum(len(r) for r in records.values())
+    num_shards = max(1, math.ceil(total / SHARD_BYTES))
+
+    _write_text_atomic(details_path, "{" + ",".join(
+        f"{json.dumps(name)}:{record}" for name, record in records.items()) + "}")
+
+    shards = [[] for _ in range(num_shards)]
+    for name, record in records.items():
+        shards[fnv1a(name) % num_shards].append(f"{json.dumps(name)}:{record}")
+
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    for old in shard_dir.glob("*.js"):
+        old.unlink()
+    for shard, entries in enumerate(shards):
+        _write_text_atomic(shard_dir / f"{shard:03d}.js",
+                           f"ModuleDetails.registerShard({shard}, {{{','.join(entries)}}});\n")
+
+    return {"path": shard_dir.name, "shards": num_shards, "bytes": details_path.stat().st_size}
+
+
+def remove_module_details(bundle_path):
+    """Delete details written by an earlier split build."""
+    details_path, shard_dir = details_paths(bundle_path)
+    details_path.unlink(missing_ok=True)
+    if shard_dir.is_dir():
+        for old in shard_dir.glob("*.js"):
+            old.unlink()
+        if not any(shard_dir.iterdir()):
+            shard_dir.rmdir()
@@ -2,70 +2,116 @@
 """
 Parse CMSSW dumpConfig.py output to extract module definitions,
 parameters, and InputTag references.
+
+Large files are parsed from a memory map of their bytes: module headers
+and block ends are found with bytes patterns, only the blocks of parsed
+modules are decoded, and pages behind the scan position are released
+as it advances, so memory does not grow with the file size.
 """
 
 import sys
+import os
 import re
 import json
+import mmap
+import time
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+
+from graph_model import compact_modules
+
+
+# Tokens that matter when matching brackets: escapes, quoted strings
+# (either quote closes either, as in the original character scanner),
+# a lone quote that is never closed, and the bracket characters.
+_STRING = r"""["'][^"'\\]*(?:\\.[^"'\\]*)*["']"""
+_PAREN_TOKEN_RE = re.compile(r"\\.|" + _STRING + r"""|(["'])|([()])""", re.DOTALL)
+_BRACE_TOKEN_RE = re.compile(r"\\.|" + _STRING + r"""|(["'])|([{}])""", re.DOTALL)
+
+# Module definitions: process.moduleName = cms.EDProducer("PluginName", ...
+MODULE_RE = re.compile(
+    r'process\.(\w+)\s*=\s*cms\.(EDProducer|EDFilter|EDAnalyzer|OutputModule|ESProducer|ESSource)'
+    r'\s*\(\s*["\']([^"\']+)["\']\s*'
+)
+
+# Schedule definitions: process.pathName = cms.Path(process.a+process.seq, ...
+SEQUENCE_TYPES = ("Path", "EndPath", "FinalPath", "Sequence", "Task", "ConditionalTask")
+SEQUENCE_RE = re.compile(r'process\.(\w+)\s*=\s*cms\.(' + '|'.join(SEQUENCE_TYPES) + r')\s*\(')
+_PROCESS_REF_RE = re.compile(r'process\.(\w+)')
+
+# Bytes versions for scanning a memory-mapped file
+_MODULE_BYTES_RE = re.compile(MODULE_RE.pattern.encode())
+_SEQUENCE_BYTES_RE = re.compile(SEQUENCE_RE.pattern.encode())
+_PROCESS_REF_BYTES_RE = re.compile(_PROCESS_REF_RE.pattern.encode())
+_PAREN_TOKEN_BYTES_RE = re.compile(_PAREN_TOKEN_RE.pattern.encode(), re.DOTALL)
+
+# Files at least this large are memory-mapped (see parse_config_file)
+MMAP_THRESHOLD = 256 * 1024 * 1024
+
+# Mapped pages behind the scan position are released in steps of this size
+RELEASE_BYTES = 64 * 1024 * 1024
+
+# Module headers are searched for in windows of RELEASE_BYTES that extend
+# this far into the next one, to catch headers crossing the boundary
+HEADER_OVERLAP = 1 << 20
+
+# Any "name = cms.Type(" assignment; the typed patterns below are matched at these anchors
+_PARAM_ANCHOR_RE = re.compile(r'\b(\w+)\s*=\s*cms\.(\w+(?:\.\w+)?)\s*\(')
+
+# Single InputTag: fieldName = cms.InputTag("module:instance:process")
+_TAG_ARGS = r'\(\s*["\']([^"\']+)["\']\s*(?:,\s*["\']([^"\']*)["\']\s*)?(?:,\s*["\']([^"\']*)["\']\s*)?\)'
+_SINGLE_TAG_RE = re.compile(r'(\w+)\s*=\s*cms\.(InputTag|ESInputTag)\s*' + _TAG_ARGS)
+_INNER_TAG_RE = re.compile(r'cms\.InputTag\s*' + _TAG_ARGS)
+_QUOTED_RE = re.compile(r'["\']([^"\']+)["\']')
+
+# Simple types (int32, string, bool, double, etc.)
+SIMPLE_TYPES = frozenset((
+    "int32", "uint32", "int64", "uint64", "string", "bool", "double",
+    "untracked.string", "untracked.int32", "untracked.bool",
+))
+_SIMPLE_PARAM_RE = re.compile(
+    r'(\w+)\s*=\s*cms\.(int32|uint32|int64|uint64|string|bool|double|untracked\.string|'
+    r'untracked\.int32|untracked\.bool)\s*\(([^)]+)\)'
+)
 
 
 def extract_balanced_block(text, start_pos):
     """
     Extract a balanced parentheses/braces block starting from start_pos.
     Returns (block_content, end_pos).
+
+    The block includes the opening bracket but not the closing one. Text
+    between brackets and quotes is skipped by the regex engine, so the
+    cost is linear in the block length.
     """
-    depth = 0
-    i = start_pos
-    start_char = text[i]
+    start_char = text[start_pos]
 
     if start_char == '(':
-        open_char, close_char = '(', ')'
+        token_re = _PAREN_TOKEN_RE
     elif start_char == '{':
-        open_char, close_char = '{', '}'
+        token_re = _BRACE_TOKEN_RE
     else:
         return "", start_pos
 
-    block = ""
-    in_string = False
-    escape_next = False
-
-    while i < len(text):
-        char = text[i]
-
-        # Handle string escaping
-        if escape_next:
-            escape_next = False
-            block += char
-            i += 1
-            continue
-
-        if char == '\\':
-            escape_next = True
-            block += char
-            i += 1
-            continue
-
-        # Handle strings
-        if char in ('"', "'"):
-            in_string = not in_string
-            block += char
-            i += 1
+    depth = 0
+    for match in token_re.finditer(text, start_pos):
+        kind = match.lastindex
+        if kind is None:
+            # Escape or complete string
             continue
+        if kind == 1:
+            # Unclosed string: everything after it is inside the string
+            break
+        end = match.start()
+        if text[end] == start_char:
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return text[start_pos:end], end
 
-        if not in_string:
-            if char == open_char:
-                depth += 1
-            elif char == close_char:
-                depth -= 1
-                if depth == 0:
-                    return block, i
-
-        block += char
-        i += 1
-
-    return block, i
+    return text[start_pos:], len(text)
 
 
 def parse_input_tag(tag_str):
@@ -82,105 +128,121 @@ def parse_input_tag(tag_str):
     }
 
 
+def _split_tag(module, instance, process):
+    """Apply the colon-separated "module:instance:process" form to explicit args."""
+    if ':' in module:
+        parts = parse_input_tag(module)
+        module = parts["module"]
+        instance = parts["instance"] if not instance else instance
+        process = parts["process"] if not process else process
+    return module, instance, process
+
+
+def _parse_vinput_tag(field_name, vinput_content):
+    """Expand the body of a cms.VInputTag(...) into InputTag dicts."""
+    input_tags = []
+
+    # Try to find cms.InputTag objects first
+    inner_input_tags = _INNER_TAG_RE.findall(vinput_content)
+
+    if inner_input_tags:
+        # VInputTag contains cms.InputTag objects
+        for idx, (module, instance, process) in enumerate(inner_input_tags):
+            module, instance, process = _split_tag(module, instance, process)
+            input_tags.append({
+                "field": field_name,
+                "type": "VInputTag",
+                "index": idx,
+                "module": module,
+                "instance": instance,
+                "process": process
+            })
+    else:
+        # VInputTag contains simple strings: "string1", "string2", "string3"
+        for idx, tag_str in enumerate(_QUOTED_RE.findall(vinput_content)):
+            # Parse as module:instance:process or just module
+            parts = parse_input_tag(tag_str)
+            input_tags.append({
+                "field": field_name,
+                "type": "VInputTag",
+                "index": idx,
+                "module": parts["module"],
+                "instance": parts["instance"],
+                "process": parts["process"]
+            })
+
+    return input_tags
+
+
+def scan_param_block(param_block):
+    """
+    Extract InputTags, VInputTags, ESInputTags and simple typed parameters
+    from a parameter block in a single sweep.
+
+    Every "name = cms.Type(" anchor is visited once, at any nesting depth
+    (cms.PSet/cms.VPSet contents are included). Typed patterns are only
+    tried at anchors whose type can match, and each kind keeps its own
+    non-overlap boundary so the result equals running one finditer per
+    kind.
+
+    Returns:
+        (input_tags, params): list of {field, type, module, instance,
+        process[, index]} dicts (single tags first, then VInputTags) and
+        dict of {paramName: {type, value}}
+    """
+    single_tags = []
+    vector_tags = []
+    params = {}
+    single_end = 0
+    simple_end = 0
+
+    for anchor in _PARAM_ANCHOR_RE.finditer(param_block):
+        type_name = anchor.group(2)
+        pos = anchor.start()
+
+        if type_name == "InputTag" or type_name == "ESInputTag":
+            if pos < single_end:
+                continue
+            match = _SINGLE_TAG_RE.match(param_block, pos)
+            if match is None:
+                continue
+            single_end = match.end()
+            field_name, tag_type, module, instance, process = match.groups()
+            module, instance, process = _split_tag(module, instance or "", process or "")
+            single_tags.append({
+                "field": field_name,
+                "type": tag_type,
+                "module": module,
+                "instance": instance,
+                "process": process
+            })
+
+        elif type_name == "VInputTag":
+            # Position of opening paren
+            vinput_content, _ = extract_balanced_block(param_block, anchor.end() - 1)
+            vector_tags.extend(_parse_vinput_tag(anchor.group(1), vinput_content))
+
+        elif type_name in SIMPLE_TYPES:
+            if pos < simple_end:
+                continue
+            match = _SIMPLE_PARAM_RE.match(param_block, pos)
+            if match is None:
+                continue
+            simple_end = match.end()
+            params[match.group(1)] = {
+                "type": match.group(2),
+                "value": match.group(3).strip().strip('"\'')
+            }
+
+    return single_tags + vector_tags, params
+
+
 def parse_input_tags(param_block):
     """
     Extract all InputTag, VInputTag, and ESInputTag from a parameter block.
     Returns list of {field, module, instance, process} dicts.
     """
-    input_tags = []
-
-    # Pattern for single InputTag: fieldName = cms.InputTag("module:instance:process")
-    single_pattern = r'(\w+)\s*=\s*cms\.(InputTag|ESInputTag)\s*\(\s*["\']([^"\']+)["\']\s*(?:,\s*["\']([^"\']*)["\']\s*)?(?:,\s*["\']([^"\']*)["\']\s*)?\)'
-
-    for match in re.finditer(single_pattern, param_block):
-        field_name = match.group(1)
-        tag_type = match.group(2)
-        module = match.group(3)
-        instance = match.group(4) if match.group(4) else ""
-        process = match.group(5) if match.group(5) else ""
-
-        # Handle colon-separated format
-        if ':' in module:
-            parts = parse_input_tag(module)
-            module = parts["module"]
-            instance = parts["instance"] if not instance else instance
-            process = parts["process"] if not process else process
-
-        input_tags.append({
-            "field": field_name,
-            "type": tag_type,
-            "module": module,
-            "instance": instance,
-            "process": process
-        })
-
-    # Pattern for VInputTag: fieldName = cms.VInputTag(...)
-    # Need to match balanced parentheses, so use a more robust approach
-    vinput_pattern = r'(\w+)\s*=\s*cms\.VInputTag\s*\('
-
-    for match in re.finditer(vinput_pattern, param_block):
-        field_name = match.group(1)
-        start_pos = match.end() - 1  # Position of opening paren
-
-        # Extract balanced parentheses content
-        vinput_content, _ = extract_balanced_block(param_block, start_pos)
-
-        # Try to find cms.InputTag objects first
-        inner_input_tags = re.findall(
-            r'cms\.InputTag\s*\(\s*["\']([^"\']+)["\']\s*(?:,\s*["\']([^"\']*)["\']\s*)?(?:,\s*["\']([^"\']*)["\']\s*)?\)',
-            vinput_content
-        )
-
-        if inner_input_tags:
-            # VInputTag contains cms.InputTag objects
-            for idx, tag_tuple in enumerate(inner_input_tags):
-                module = tag_tuple[0]
-                instance = tag_tuple[1] if tag_tuple[1] else ""
-                process = tag_tuple[2] if tag_tuple[2] else ""
-
-                # Handle colon-separated format
-                if ':' in module:
-                    parts = parse_input_tag(module)
-                    module = parts["module"]
-                    instance = parts["instance"] if not instance else instance
-                    process = parts["process"] if not process else process
-
-                input_tags.append({
-                    "field": field_name,
-                    "type": "VInputTag",
-                    "index": idx,
-                    "module": module,
-                    "instance": instance,
-                    "process": process
-                })
-        else:
-            # VInputTag contains simple strings
-            # Pattern: "string1", "string2", "string3"
-            simple_strings = re.findall(r'["\']([^"\']+)["\']', vinput_content)
-
-            for idx, tag_str in enumerate(simple_strings):
-                # Parse as module:instance:process or just module
-                if ':' in tag_str:
-                    parts = parse_input_tag(tag_str)
-                    module = parts["module"]
-                    instance = parts["instance"]
-                    process = parts["process"]
-                else:
-                    # Just a module name
-                    module = tag_str
-                    instance = ""
-                    process = ""
-
-                input_tags.append({
-                    "field": field_name,
-                    "type": "VInputTag",
-                    "index": idx,
-                    "module": module,
-                    "instance": instance,
-                    "process": process
-                })
-
-    return input_tags
+    return scan_param_block(param_block)[0]
 
 
 def parse_simple_params(param_block):
@@ -188,82 +250,466 @@ def parse_simple_params(param_block):
     Extract simple parameters (int32, string, bool, double, etc.).
     Returns dict of {paramName: {type, value}}.
     """
-    params = {}
+    return scan_param_block(param_block)[1]
+
 
-    # Pattern for simple types
-    simple_pattern = r'(\w+)\s*=\s*cms\.(int32|uint32|int64|uint64|string|bool|double|untracked\.string|untracked\.int32|untracked\.bool)\s*\(([^)]+)\)'
+def _limit_lines(text, max_lines):
+    """Keep at most max_lines lines of text, marking truncation."""
+    pos = -1
+    for _ in range(max_lines):
+        pos = text.find('\n', pos + 1)
+        if pos == -1:
+            return text
+    return text[:pos] + '\n...(truncated)'
 
-    for match in re.finditer(simple_pattern, param_block):
-        param_name = match.group(1)
-        param_type = match.group(2)
-        param_value = match.group(3).strip().strip('"\'')
 
-        params[param_name] = {
-            "type": param_type,
-            "value": param_value
+def find_sequences(content):
+    """
+    Paths, EndPaths, Sequences and Tasks defined in the config.
+
+    Returns:
+        dict mapping name -> {"type", "items"}, in definition order; items
+        are the process attributes referenced in the definition (modules
+        or other sequences), in order
+    """
+    sequences = {}
+    for match in SEQUENCE_RE.finditer(content):
+        block, _ = extract_balanced_block(content, match.end() - 1)
+        sequences[match.group(1)] = {"type": match.group(2), "items": _PROCESS_REF_RE.findall(block)}
+    return sequences
+
+
+def find_mapped_sequences(mapped):
+    """find_sequences over the bytes of a MappedFile."""
+    data = mapped.data
+    sequences = {}
+    for match in _iter_mapped_matches(mapped, _SEQUENCE_BYTES_RE):
+        block = data[match.end() - 1:_block_end(data, match.end() - 1)]
+        sequences[match.group(1).decode('utf-8', 'ignore')] = {
+            "type": match.group(2).decode(),
+            "items": [name.decode('utf-8', 'ignore') for name in _PROCESS_REF_BYTES_RE.findall(block)],
         }
+    return sequences
+
+
+def find_module_spans(content):
+    """
+    Cheap first pass: locate every module definition header.
+
+    Returns:
+        list of (start, end, module_name, module_type, plugin_name) tuples,
+        where start/end delimit the "process.X = cms.Type("Plugin"" match
+    """
+    return [
+        (match.start(), match.end(), match.group(1), match.group(2), match.group(3))
+        for match in MODULE_RE.finditer(content)
+    ]
+
+
+def _parse_module(content, span, max_snippet_lines):
+    """
+    Parse one module definition found by find_module_spans.
+
+    Returns:
+        (record, block_end): record is the module dict, or None when the
+        header is not followed by a parameter block
+    """
+    start, param_start, module_name, module_type, plugin_name = span
+
+    # Extract the balanced parameter block
+    if not (param_start < len(content) and content[param_start] in (',', ')')):
+        return None, None
+
+    # Find opening paren for parameters
+    paren_pos = content.find('(', start)
+    if paren_pos == -1:
+        return None, None
+
+    block, block_end = extract_balanced_block(content, paren_pos)
+
+    # Parse InputTags and simple parameters
+    input_tags, simple_params = scan_param_block(block)
+
+    # Extract raw snippet (limited lines)
+    snippet_end = min(block_end + 1, len(content))
+    raw_snippet = _limit_lines(content[start:snippet_end], max_snippet_lines)
+
+    record = {
+        "type": module_type,
+        "plugin": plugin_name,
+        "parameters": simple_params,
+        "inputTags": input_tags,
+        "rawSnippet": raw_snippet
+    }
+    return record, block_end
+
+
+def module_cache_key(text, max_snippet_lines):
+    """
+    Content hash of one module's source text (from its header up to the
+    next module header) together with the snippet setting. The raw bytes
+    of valid UTF-8 text hash the same (see _mapped_cache_key).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{max_snippet_lines}\0".encode())
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class MappedFile:
+    """
+    Read-only memory map of a file, read front to back.
+
+    release_before(pos) drops the mapped pages before pos from the
+    process (they are read from the page cache again if touched), so the
+    pages of a large file do not all stay in its resident set.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        if os.fstat(self._file.fileno()).st_size:
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            # Empty files cannot be mapped
+            self.data = b''
+        self._released = 0
+
+    def release_before(self, pos):
+        if not isinstance(self.data, mmap.mmap) or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        end = pos - pos % mmap.PAGESIZE
+        if end - self._released >= RELEASE_BYTES:
+            self.data.madvise(mmap.MADV_DONTNEED, self._released, end - self._released)
+            self._released = end
 
-    return params
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
 
+    def __enter__(self):
+        return self
 
-def parse_config_file(config_path, max_snippet_lines=50):
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _block_end(data, start_pos):
+    """
+    Bytes version of extract_balanced_block for the parenthesis at
+    start_pos: the position of the closing parenthesis, or len(data).
+    """
+    depth = 0
+    for match in _PAREN_TOKEN_BYTES_RE.finditer(data, start_pos):
+        kind = match.lastindex
+        if kind is None:
+            continue
+        if kind == 1:
+            break
+        end = match.start()
+        if data[end] == ord('('):
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return end
+    return len(data)
+
+
+def _iter_mapped_matches(mapped, pattern):
+    """
+    pattern.finditer over the bytes of a MappedFile, searched window by
+    window so the pages behind each window can be released.
+    """
+    data = mapped.data
+    size = len(data)
+    pos = 0
+    while pos < size:
+        window_end = min(pos + RELEASE_BYTES, size)
+        search_end = min(window_end + HEADER_OVERLAP, size)
+        for match in pattern.finditer(data, pos, search_end):
+            if match.start() >= window_end:
+                break
+            if match.end() == search_end < size:
+                # Trailing whitespace may go on past the search window
+                match = pattern.match(data, match.start())
+            yield match
+            pos = match.end()
+        pos = max(pos, window_end)
+        mapped.release_before(pos)
+
+
+def find_mapped_module_spans(mapped):
+    """
+    find_module_spans over the bytes of a MappedFile.
+
+    Returns:
+        list of (start, end, module_name, module_type, plugin_name) with
+        byte offsets
+    """
+    return [
+        (match.start(), match.end(), match.group(1).decode('utf-8', 'ignore'),
+         match.group(2).decode(), match.group(3).decode('utf-8', 'ignore'))
+        for match in _iter_mapped_matches(mapped, _MODULE_BYTES_RE)
+    ]
+
+
+def _mapped_cache_key(mapped, start, end, max_snippet_lines):
+    """module_cache_key of the bytes start:end of a MappedFile, hashed in steps."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{max_snippet_lines}\0".encode())
+    for pos in range(start, end, RELEASE_BYTES):
+        digest.update(mapped.data[pos:min(pos + RELEASE_BYTES, end)])
+        mapped.release_before(pos)
+    mapped.release_before(end)
+    return digest.hexdigest()
+
+
+def _parse_mapped_module(data, span, max_snippet_lines):
+    """
+    _parse_module for a span of find_mapped_module_spans: only the bytes
+    from the header to the end of its block are decoded.
+
+    Returns:
+        (record, block_end), block_end being a byte offset
+    """
+    start, param_start = span[0], span[1]
+    if data[param_start:param_start + 1] not in (b',', b')'):
+        return None, None
+    end = _block_end(data, data.find(b'(', start))
+
+    text = data[start:end + 1].decode('utf-8', errors='ignore')
+    match = MODULE_RE.match(text)
+    if match is None:
+        return None, None
+    local = (0, match.end(), match.group(1), match.group(2), match.group(3))
+    record, _ = _parse_module(text, local, max_snippet_lines)
+    return record, end
+
+
+def _parse_chunk(args):
+    """
+    Worker entry point: parse some modules of one contiguous text chunk.
+
+    The chunk runs from its first module header up to the header that
+    follows its last module. A block may continue past the chunk end;
+    the caller detects this from block_end and re-parses that module
+    with the full text.
+
+    Returns:
+        (results, cpu_seconds): results is a list of (record, block_end)
+        in the order of the given spans, with block_end relative to the chunk
+    """
+    text, spans, max_snippet_lines = args
+    started = time.process_time()
+    results = [_parse_module(text, span, max_snippet_lines) for span in spans]
+    return results, time.process_time() - started
+
+
+def _parse_mapped_chunk(args):
+    """
+    Worker entry point: parse some modules of a memory-mapped file, which
+    the worker maps itself.
+
+    Returns:
+        (results, cpu_seconds) as for _parse_chunk, with absolute
+        byte offsets
+    """
+    config_path, spans, max_snippet_lines = args
+    started = time.process_time()
+    results = []
+    with MappedFile(config_path) as mapped:
+        for span in spans:
+            results.append(_parse_mapped_module(mapped.data, span, max_snippet_lines))
+            mapped.release_before(span[0])
+    return results, time.process_time() - started
+
+
+def _parse_mapped_spans(config_path, spans, indices, max_snippet_lines, jobs):
+    """
+    _parse_spans for a memory-mapped file: workers get the path and
+    their spans, and map the file themselves.
+    """
+    if jobs <= 1 or len(indices) < jobs * 2:
+        results, _ = _parse_mapped_chunk((config_path, [spans[i] for i in indices], max_snippet_lines))
+        return dict(zip(indices, results)), None
+
+    num_chunks = min(len(indices), jobs * 4)
+    bounds = [len(indices) * i // num_chunks for i in range(num_chunks + 1)]
+    chunks = [indices[lo:hi] for lo, hi in zip(bounds, bounds[1:])]
+    tasks = [(config_path, [spans[i] for i in chunk], max_snippet_lines) for chunk in chunks]
+
+    results = {}
+    worker_cpu_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for chunk, (chunk_results, cpu_seconds) in zip(chunks, pool.map(_parse_mapped_chunk, tasks)):
+            worker_cpu_seconds += cpu_seconds
+            results.update(zip(chunk, chunk_results))
+    return results, worker_cpu_seconds
+
+
+def _parse_spans(content, spans, indices, max_snippet_lines, jobs):
+    """
+    Parse the modules spans[i] for i in indices (ascending), in a process
+    pool when jobs > 1.
+
+    Returns:
+        (results, worker_cpu_seconds): results maps index -> (record,
+        block_end); worker_cpu_seconds is None for a serial parse
+    """
+    if jobs <= 1 or len(indices) < jobs * 2:
+        results = {i: _parse_module(content, spans[i], max_snippet_lines) for i in indices}
+        return results, None
+
+    # A few chunks per worker keeps the pool busy when modules vary in size
+    num_chunks = min(len(indices), jobs * 4)
+    bounds = [len(indices) * i // num_chunks for i in range(num_chunks + 1)]
+
+    tasks = []
+    chunks = []
+    for lo, hi in zip(bounds, bounds[1:]):
+        chunk = indices[lo:hi]
+        offset = spans[chunk[0]][0]
+        after_last = chunk[-1] + 1
+        text_end = spans[after_last][0] if after_last < len(spans) else len(content)
+        local = []
+        for i in chunk:
+            a, b, name, mtype, plugin = spans[i]
+            local.append((a - offset, b - offset, name, mtype, plugin))
+        tasks.append((content[offset:text_end], local, max_snippet_lines))
+        chunks.append((chunk, offset, text_end))
+
+    results = {}
+    worker_cpu_seconds = 0.0
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for (chunk, offset, text_end), (chunk_results, cpu_seconds) in zip(
+                chunks, pool.map(_parse_chunk, tasks)):
+            worker_cpu_seconds += cpu_seconds
+            for i, (record, block_end) in zip(chunk, chunk_results):
+                if record is not None and block_end + offset >= text_end:
+                    # Block still open at the chunk end: redo with the full text
+                    results[i] = _parse_module(content, spans[i], max_snippet_lines)
+                else:
+                    results[i] = (record, None if block_end is None else block_end + offset)
+
+    return results, worker_cpu_seconds
+
+
+def _cached_records(spans, cache_key, cache):
+    """
+    Look the modules up in the cache by the hash of their source text,
+    cache_key(i) for spans[i].
+
+    Returns:
+        (records, keys, todo): records by span index (None where not
+        cached), cache keys of the modules to parse and their indices
+    """
+    records = [None] * len(spans)
+    keys = {}
+    todo = []
+    for i, span in enumerate(spans):
+        if cache is None:
+            todo.append(i)
+            continue
+        key = cache_key(i)
+        hit, record = cache.lookup_module(key, span[2])
+        if hit:
+            records[i] = record
+        else:
+            keys[i] = key
+            todo.append(i)
+    return records, keys, todo
+
+
+def parse_config_file(config_path, max_snippet_lines=50, jobs=1, stats=None, cache=None,
+                      mapped=None, sequences=None):
     """
     Parse CMSSW config dump file.
 
+    Args:
+        config_path: Path to the dumpConfig.py file
+        max_snippet_lines: Maximum number of lines kept in rawSnippet
+        jobs: Number of worker processes (1 parses in this process)
+        stats: Optional dict that receives timing information
+            (jobs, seconds, serial_seconds, cached, mapped)
+        cache: Optional module cache (see build_cache.BuildCache) with
+            lookup_module(key, name) -> (hit, record) and
+            store_module(key, name, record); only modules whose source
+            text changed are parsed
+        mapped: Parse from a memory map (see MappedFile) instead of
+            reading the whole file; None maps files of at least
+            MMAP_THRESHOLD bytes. Results are the same for UTF-8 input.
+        sequences: Optional dict that receives the Paths, Sequences and
+            Tasks of the config (see find_sequences)
+
     Returns:
         dict mapping module_name -> {type, plugin, parameters, inputTags, rawSnippet}
     """
-    print(f"Parsing config file: {config_path}")
-
-    with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
-        content = f.read()
+    if mapped is None:
+        mapped = os.path.getsize(config_path) >= MMAP_THRESHOLD
+    print(f"Parsing config file: {config_path}" + (" (memory-mapped)" if mapped else ""))
+    started = time.perf_counter()
+
+    if mapped:
+        with MappedFile(config_path) as mapped_file:
+            spans = find_mapped_module_spans(mapped_file)
+            next_starts = [span[0] for span in spans[1:]] + [len(mapped_file.data)]
+            records, keys, todo = _cached_records(spans, lambda i: _mapped_cache_key(
+                mapped_file, spans[i][0], next_starts[i], max_snippet_lines), cache)
+        if sequences is not None:
+            with MappedFile(config_path) as mapped_file:
+                sequences.update(find_mapped_sequences(mapped_file))
+        scan_seconds = time.perf_counter() - started
+        results, worker_cpu_seconds = _parse_mapped_spans(config_path, spans, todo, max_snippet_lines, jobs)
+    else:
+        with open(config_path, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        spans = find_module_spans(content)
+        next_starts = [span[0] for span in spans[1:]] + [len(content)]
+        records, keys, todo = _cached_records(spans, lambda i: module_cache_key(
+            content[spans[i][0]:next_starts[i]], max_snippet_lines), cache)
+        if sequences is not None:
+            sequences.update(find_sequences(content))
+        scan_seconds = time.perf_counter() - started
+        results, worker_cpu_seconds = _parse_spans(content, spans, todo, max_snippet_lines, jobs)
+
+    for i, (record, block_end) in results.items():
+        records[i] = record
+        # Only cache modules whose block ends before the next header, so the
+        # record depends on nothing but the hashed text
+        if cache is not None and (record is None or block_end < next_starts[i]):
+            cache.store_module(keys[i], spans[i][2], record)
 
     modules = {}
-
-    # Pattern for module definitions
-    # process.moduleName = cms.EDProducer("PluginName", ...
-    module_pattern = r'process\.(\w+)\s*=\s*cms\.(EDProducer|EDFilter|EDAnalyzer|OutputModule|ESProducer|ESSource)\s*\(\s*["\']([^"\']+)["\']\s*'
-
-    for match in re.finditer(module_pattern, content):
-        module_name = match.group(1)
-        module_type = match.group(2)
-        plugin_name = match.group(3)
-
-        # Find the start of the parameter block
-        param_start = match.end()
-
-        # Extract the balanced parameter block
-        if param_start < len(content) and content[param_start] in (',', ')'):
-            # Find opening paren for parameters
-            paren_pos = content.find('(', match.start())
-            if paren_pos != -1:
-                block, block_end = extract_balanced_block(content, paren_pos)
-
-                # Parse InputTags
-                input_tags = parse_input_tags(block)
-
-                # Parse simple parameters
-                simple_params = parse_simple_params(block)
-
-                # Extract raw snippet (limited lines)
-                snippet_start = match.start()
-                snippet_end = min(block_end + 1, len(content))
-                raw_snippet = content[snippet_start:snippet_end]
-
-                # Limit snippet to max lines
-                snippet_lines = raw_snippet.split('\n')
-                if len(snippet_lines) > max_snippet_lines:
-                    raw_snippet = '\n'.join(snippet_lines[:max_snippet_lines]) + '\n...(truncated)'
-
-                modules[module_name] = {
-                    "type": module_type,
-                    "plugin": plugin_name,
-                    "parameters": simple_params,
-                    "inputTags": input_tags,
-                    "rawSnippet": raw_snippet
-                }
+    for span, record in zip(spans, records):
+        if record is not None:
+            modules[span[2]] = record
+    modules = compact_modules(modules)
+
+    seconds = time.perf_counter() - started
+    if worker_cpu_seconds is None:
+        jobs = 1
+        serial_seconds = seconds
+    else:
+        # Serial estimate: the shared first pass plus the CPU time the
+        # workers spent parsing
+        serial_seconds = scan_seconds + worker_cpu_seconds
 
     print(f"  Parsed {len(modules)} modules")
+    if cache is not None:
+        print(f"  Reused {len(spans) - len(todo)}/{len(spans)} module definitions from cache")
+    if jobs > 1:
+        print(f"  {jobs} jobs: {seconds:.2f} s (estimated {serial_seconds / seconds:.1f}x vs --jobs 1)")
+
+    if stats is not None:
+        stats.update({
+            "jobs": jobs,
+            "seconds": seconds,
+            "serial_seconds": serial_seconds,
+            "cached": len(spans) - len(todo),
+            "mapped": mapped,
+        })
 
     return modules
 
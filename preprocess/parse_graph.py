@@ -1,145 +1,477 @@
 #!/usr/bin/env python3
 """
 Parse Graphviz DOT file into structured JSON format.
-Extracts nodes, edges, and builds label-to-ID mapping.
+Extracts nodes, edges, and builds label-to-ID mapping, into the shared
+GraphModel (see graph_model).
+
+The default reader is a built-in single-pass tokenizer for the subset of
+DOT written by CMSSW's dependency dumper (node statements, edges,
+attribute lists and subgraph blocks). pydot is kept as an opt-in fallback.
+
+Subgraph blocks are the dumper's Paths and EndPaths (graph label
+"Path <name>"); the modules listed in them are recorded as path
+membership. As with pydot, only top-level node statements become nodes.
 """
 
+import re
 import sys
 import json
-import pydot
-import networkx as nx
+from collections import deque
 from pathlib import Path
 
+from graph_model import GraphModel
+
+
+# Token patterns for the DOT subset. Quoted strings and block comments may
+# span lines; the tokenizer keeps unterminated text buffered until complete.
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<edgeop>->|--)
+  | (?P<id>[A-Za-z_\x80-\uffff][\w\x80-\uffff]*|-?(?:\.\d+|\d+(?:\.\d*)?))
+  | (?P<punct>[{}\[\];,=:])
+''', re.VERBOSE | re.DOTALL)
+
+# Starts of constructs that may continue on the next line
+_PARTIAL_RE = re.compile(r'"|/\*|<')
+
+_KEYWORDS = ("node", "graph", "edge")
 
-def parse_dot_file(dot_path):
+# Subgraph label prefixes written for CMSSW schedule paths
+PATH_TYPES = ("Path", "EndPath", "FinalPath")
+
+# Fast paths for the one-statement-per-line form CMSSW writes, e.g.
+#   12[color=black, label=foo, shape=box];
+#   12 -> 34[style=dashed];
+# Lines that do not match fully (including the trailing ';') go through
+# the general tokenizer.
+_SIMPLE_ID = r'(?:[A-Za-z_]\w*|-?\d+(?:\.\d*)?|"(?:[^"\\]|\\.)*")'
+_SIMPLE_ATTRS = r'(?:\[((?:\s*\w+\s*=\s*' + _SIMPLE_ID + r'\s*,?)*)\s*\])?'
+_EDGE_LINE_RE = re.compile(
+    r'\s*(' + _SIMPLE_ID + r')\s*(?:->|--)\s*(' + _SIMPLE_ID + r')\s*' + _SIMPLE_ATTRS + r'\s*;\s*')
+_NODE_LINE_RE = re.compile(r'\s*(' + _SIMPLE_ID + r')\s*' + _SIMPLE_ATTRS + r'\s*;\s*')
+_ATTR_RE = re.compile(r'(\w+)\s*=\s*(' + _SIMPLE_ID + r')')
+
+
+class _TokenStream:
     """
-    Parse a DOT file and extract nodes, edges, and mappings.
+    Line-fed DOT tokenizer with one-token lookahead.
 
-    Returns:
-        dict with keys: nodes, edges, labelToId, nx_graph
+    Only the tokens of the current line (plus at most one unterminated
+    string or comment spanning lines) are held in memory.
     """
-    print(f"Parsing DOT file: {dot_path}")
 
-    # Load DOT file
+    def __init__(self, lines):
+        self._lines = enumerate(lines, 1)
+        self._tokens = deque()
+        self._partial = ""
+        self._partial_line = 0
+        self.line_no = 0
+
+    def idle(self):
+        """True when no tokens or partial text are pending."""
+        return not self._tokens and not self._partial
+
+    def read_line(self):
+        """Return the next raw line (or None at EOF). Only valid when idle()."""
+        self.line_no, line = next(self._lines, (self.line_no, None))
+        return line
+
+    def feed(self, line):
+        """Tokenize a raw line, buffering any construct left unterminated."""
+        if line.startswith('#') and not self._partial:
+            # C preprocessor output lines are ignored by Graphviz
+            return
+        if not self._partial:
+            self._partial_line = self.line_no
+        text = self._partial + line
+        tokens = self._tokens
+        line_no = self._partial_line
+
+        pos = 0
+        end = len(text)
+        while pos < end:
+            match = _TOKEN_RE.match(text, pos)
+            if match is None:
+                if text[pos] == '<':
+                    html, html_end = _scan_html(text, pos)
+                    if html is None:
+                        break
+                    tokens.append(("string", html, line_no))
+                    pos = html_end
+                    continue
+                if _PARTIAL_RE.match(text, pos):
+                    # Unterminated string or comment; wait for more lines
+                    break
+                raise ValueError(f"Unexpected character {text[pos]!r} at line {self.line_no}")
+
+            kind = match.lastgroup
+            if kind != "ws" and kind != "comment":
+                tokens.append((kind, match.group(kind), line_no))
+            pos = match.end()
+
+        self._partial = text[pos:]
+        if pos:
+            self._partial_line = self.line_no
+
+    def peek(self):
+        while not self._tokens:
+            line = self.read_line()
+            if line is None:
+                if self._partial.strip():
+                    raise ValueError(
+                        f"Unterminated string or comment starting at line {self._partial_line}")
+                return (None, None, self.line_no)
+            self.feed(line)
+        return self._tokens[0]
+
+    def next(self):
+        token = self.peek()
+        if self._tokens:
+            self._tokens.popleft()
+        return token
+
+    def accept(self, text):
+        if self.peek()[1] == text:
+            self._tokens.popleft()
+            return True
+        return False
+
+    def expect(self, text):
+        kind, value, line = self.next()
+        if value != text:
+            raise ValueError(f"Expected {text!r} at line {line}, got {value!r}")
+
+
+def _scan_html(text, start):
+    """Return (html_string, end_pos) for a balanced <...> ID, or (None, start)."""
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == '<':
+            depth += 1
+        elif text[i] == '>':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1], i + 1
+    return None, start
+
+
+def _parse_attr_list(stream):
+    """Parse one or more [k=v, ...] lists. Returns dict of raw values."""
+    attrs = {}
+    while stream.accept('['):
+        while not stream.accept(']'):
+            kind, key, line = stream.next()
+            if kind is None:
+                raise ValueError("Unterminated attribute list")
+            if key in (',', ';'):
+                continue
+            if stream.accept('='):
+                attrs[key] = stream.next()[1]
+            else:
+                attrs[key] = "true"
+    return attrs
+
+
+def _parse_node_id(stream):
+    """Parse node_id [':' port [':' compass]]; ports are kept in the name like pydot."""
+    kind, value, line = stream.next()
+    if kind not in ("id", "string"):
+        raise ValueError(f"Expected node ID at line {line}, got {value!r}")
+    while stream.peek()[1] == ':':
+        stream.next()
+        value += ':' + stream.next()[1]
+    return value
+
+
+def iter_dot(dot_path):
+    """
+    Stream a DOT file statement by statement.
+
+    Yields event tuples:
+        ("graph", graph_type, name)
+        ("subgraph", name, depth)        on entering a subgraph block
+        ("end_subgraph", name, depth)    on leaving it
+        ("node", node_name, attrs, depth)
+        ("edge", source, target, attrs, depth)
+        ("graph_attrs", attrs, depth)    graph [...] and ID = ID statements
+
+    Node names and attribute values are raw DOT tokens (quotes included),
+    matching what pydot's get_name()/get_attributes() return. depth is 0
+    for statements at the top level of the graph.
+    """
+    with open(dot_path, 'r', encoding='utf-8', errors='replace') as f:
+        stream = _TokenStream(f)
+
+        # Header: [strict] (graph|digraph) [ID] '{'
+        stream.accept('strict')
+        kind, graph_type, line = stream.next()
+        if graph_type not in ("graph", "digraph"):
+            raise ValueError(f"Expected 'graph' or 'digraph' at line {line}, got {graph_type!r}")
+        name = ""
+        if stream.peek()[1] != '{':
+            name = stream.next()[1]
+        stream.expect('{')
+        yield "graph", graph_type, name
+
+        subgraphs = []
+        while True:
+            if stream.idle():
+                line = stream.read_line()
+                if line is None:
+                    raise ValueError("Unexpected end of file: missing '}'")
+                depth = len(subgraphs)
+                match = _EDGE_LINE_RE.fullmatch(line)
+                if match:
+                    source, target, attr_text = match.groups()
+                    yield "edge", source, target, dict(_ATTR_RE.findall(attr_text or "")), depth
+                    continue
+                match = _NODE_LINE_RE.fullmatch(line)
+                if match and match.group(1) not in _KEYWORDS and match.group(1) != "subgraph":
+                    yield "node", match.group(1), dict(_ATTR_RE.findall(match.group(2) or "")), depth
+                    continue
+                stream.feed(line)
+                continue
+
+            kind, value, line = stream.peek()
+            if kind is None:
+                raise ValueError("Unexpected end of file: missing '}'")
+
+            if value == '}':
+                stream.next()
+                if not subgraphs:
+                    break
+                sub_name = subgraphs.pop()
+                yield "end_subgraph", sub_name, len(subgraphs)
+                continue
+
+            if value == ';':
+                stream.next()
+                continue
+
+            depth = len(subgraphs)
+
+            if value == 'subgraph' or value == '{':
+                if stream.next()[1] == 'subgraph':
+                    sub_name = "" if stream.peek()[1] == '{' else stream.next()[1]
+                    stream.expect('{')
+                else:
+                    sub_name = ""
+                subgraphs.append(sub_name)
+                yield "subgraph", sub_name, depth
+                continue
+
+            node_name = _parse_node_id(stream)
+
+            if node_name in _KEYWORDS:
+                # Default attribute statement: node/graph/edge [...]
+                attrs = _parse_attr_list(stream)
+                if node_name == "graph":
+                    yield "graph_attrs", attrs, depth
+                continue
+
+            if stream.accept('='):
+                # Graph attribute assignment: ID = ID
+                yield "graph_attrs", {node_name: stream.next()[1]}, depth
+                continue
+
+            if stream.peek()[0] == "edgeop":
+                chain = [node_name]
+                while stream.peek()[0] == "edgeop":
+                    stream.next()
+                    chain.append(_parse_node_id(stream))
+                attrs = _parse_attr_list(stream)
+                for source, target in zip(chain, chain[1:]):
+                    yield "edge", source, target, dict(attrs), depth
+                continue
+
+            yield "node", node_name, _parse_attr_list(stream), depth
+
+    # Anything after the closing brace is ignored, as Graphviz does
+
+
+def _unquote(value):
+    return value.strip('"') if isinstance(value, str) else value
+
+
+def _subgraph_path(name, label, members):
+    """
+    Path record of a subgraph: its type and name come from a label such
+    as "Path reconstruction_step", else it is a "Subgraph" of that name.
+    """
+    words = _unquote(label or "").split(None, 1)
+    if len(words) == 2 and words[0] in PATH_TYPES:
+        path_type, path_name = words
+    else:
+        path_type, path_name = "Subgraph", _unquote(name)
+    return {"name": path_name, "type": path_type, "members": members}
+
+
+def _member_label(node_name, attrs):
+    return _unquote(attrs.get("label", node_name.strip('"')))
+
+
+def _read_dot_streaming(dot_path):
+    """
+    Collect top-level nodes and edges from the streaming reader, grouped
+    the way pydot groups them (duplicates of a node name / edge endpoint
+    pair are adjacent, in first-seen order), and the node labels listed
+    in each named subgraph.
+    """
+    is_directed = False
+    node_groups = {}
+    edge_groups = {}
+    subgraphs = []
+    stack = []
+
+    for event in iter_dot(dot_path):
+        kind = event[0]
+        if kind == "node":
+            _, name, attrs, depth = event
+            if depth == 0:
+                node_groups.setdefault(name, []).append(attrs)
+            for subgraph in stack:
+                subgraph["members"].append(_member_label(name, attrs))
+        elif kind == "edge":
+            _, source, target, attrs, depth = event
+            if depth == 0:
+                edge_groups.setdefault((source, target), []).append(attrs)
+        elif kind == "subgraph":
+            stack.append({"name": event[1], "label": None, "members": []})
+        elif kind == "end_subgraph":
+            subgraph = stack.pop()
+            if subgraph["name"]:
+                subgraphs.append(_subgraph_path(subgraph["name"], subgraph["label"], subgraph["members"]))
+        elif kind == "graph_attrs":
+            if stack and "label" in event[1]:
+                stack[-1]["label"] = event[1]["label"]
+        elif kind == "graph":
+            is_directed = event[1] == "digraph"
+
+    nodes = ((name, attrs) for name, group in node_groups.items() for attrs in group)
+    edges = ((src, dst, attrs) for (src, dst), group in edge_groups.items() for attrs in group)
+    return is_directed, nodes, edges, subgraphs
+
+
+def _read_dot_pydot(dot_path):
+    """Load a DOT file through pydot (opt-in fallback)."""
+    import pydot
+
     graphs = pydot.graph_from_dot_file(dot_path)
     if not graphs:
         raise ValueError(f"Failed to parse DOT file: {dot_path}")
 
     graph = graphs[0]
-
-    # Create NetworkX graph (preserve direction if digraph)
     is_directed = graph.get_type() == "digraph"
-    G = nx.DiGraph() if is_directed else nx.Graph()
+    nodes = ((node.get_name(), node.get_attributes()) for node in graph.get_nodes())
+    edges = ((edge.get_source(), edge.get_destination(), edge.get_attributes())
+             for edge in graph.get_edges())
+
+    def walk(parent):
+        for subgraph in parent.get_subgraphs():
+            label = subgraph.get_attributes().get("label")
+            for defaults in subgraph.get_graph_defaults():
+                label = defaults.get("label", label)
+            members = [_member_label(node.get_name(), node.get_attributes())
+                       for node in subgraph.get_nodes() if node.get_name() not in _KEYWORDS]
+            # Members of nested subgraphs belong to the enclosing ones too
+            nested = list(walk(subgraph))
+            for path in nested:
+                members.extend(path["members"])
+            yield from nested
+            if subgraph.get_name():
+                yield _subgraph_path(subgraph.get_name(), label, members)
+
+    return is_directed, nodes, edges, list(walk(graph))
+
+
+def parse_dot_file(dot_path, use_pydot=False):
+    """
+    Parse a DOT file and extract nodes, edges, and mappings.
 
-    # Parse nodes
-    nodes = []
-    label_to_id = {}
-    valid_node_ids = set()
+    Args:
+        dot_path: Path to the DOT file
+        use_pydot: Parse with pydot instead of the built-in reader
+
+    Returns:
+        GraphModel (see graph_model) with the nodes, edges, label_to_id,
+        is_directed and paths (the named subgraphs as {name, type,
+        members}, members being node labels, including nodes only
+        listed inside the subgraph)
+    """
+    print(f"Parsing DOT file: {dot_path}" + (" (pydot)" if use_pydot else ""))
 
-    for node in graph.get_nodes():
-        node_name = node.get_name()
+    reader = _read_dot_pydot if use_pydot else _read_dot_streaming
+    is_directed, node_items, edge_items, paths = reader(dot_path)
+    graph = GraphModel(is_directed)
 
+    # Parse nodes
+    for node_name, attrs in node_items:
         # Skip special DOT keywords
-        if node_name in ("node", "graph", "edge"):
+        if node_name in _KEYWORDS:
             continue
 
         # Remove quotes from node name
         node_id = node_name.strip('"')
 
-        # Get attributes
-        attrs = node.get_attributes()
-
         # Extract label (fallback to node_id if not present)
         label = attrs.get("label", node_id).strip('"')
 
-        # Build node object
-        node_obj = {
-            "id": node_id,
-            "label": label,
-        }
-
-        # Add all other attributes
-        for key, value in attrs.items():
-            if key != "label":
-                node_obj[key] = value.strip('"') if isinstance(value, str) else value
-
-        nodes.append(node_obj)
-        valid_node_ids.add(node_id)
-
-        # Add to NetworkX graph
-        G.add_node(node_id, **node_obj)
+        graph.add_node(node_id, label, [(key, _unquote(value)) for key, value in attrs.items() if key != "label"])
 
-        # Build label-to-ID mapping
-        if label:
-            label_to_id[label] = node_id
-
-    print(f"  Parsed {len(nodes)} nodes")
+    print(f"  Parsed {len(graph.nodes)} nodes")
 
     # Parse edges
-    edges = []
     skipped_edges = 0
+    index = graph.index
 
-    for edge in graph.get_edges():
-        source = edge.get_source().strip('"')
-        target = edge.get_destination().strip('"')
+    for source, target, attrs in edge_items:
+        source = index.get(source.strip('"'))
+        target = index.get(target.strip('"'))
 
         # Skip edges that reference non-existent nodes
-        if source not in valid_node_ids or target not in valid_node_ids:
+        if source is None or target is None:
             skipped_edges += 1
             continue
 
-        # Get attributes
-        attrs = edge.get_attributes()
-
-        edge_obj = {
-            "source": source,
-            "target": target,
-        }
-
-        # Add all attributes
-        for key, value in attrs.items():
-            edge_obj[key] = value.strip('"') if isinstance(value, str) else value
+        graph.add_edge(source, target, [(key, _unquote(value)) for key, value in attrs.items()])
 
-        edges.append(edge_obj)
-
-        # Add to NetworkX graph
-        G.add_edge(source, target, **attrs)
-
-    print(f"  Parsed {len(edges)} edges")
+    print(f"  Parsed {len(graph.edges)} edges")
     if skipped_edges > 0:
         print(f"  Skipped {skipped_edges} edges referencing non-existent nodes")
+    if paths:
+        print(f"  Parsed {len(paths)} subgraphs")
 
-    return {
-        "nodes": nodes,
-        "edges": edges,
-        "labelToId": label_to_id,
-        "nx_graph": G,
-        "is_directed": is_directed
-    }
+    graph.paths = paths
+    return graph
+
+
+def to_networkx(graph):
+    """
+    Build a NetworkX graph from parse_dot_file output.
+    networkx is imported only when this is called.
+    """
+    return graph.to_networkx()
 
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python parse_graph.py <path_to_dot_file>")
+    args = [a for a in sys.argv[1:] if a != "--pydot"]
+    use_pydot = len(args) != len(sys.argv) - 1
+
+    if len(args) < 1:
+        print("Usage: python parse_graph.py <path_to_dot_file> [--pydot]")
         sys.exit(1)
 
-    dot_path = sys.argv[1]
+    dot_path = args[0]
 
     if not Path(dot_path).exists():
         print(f"Error: File not found: {dot_path}")
         sys.exit(1)
 
-    result = parse_dot_file(dot_path)
-
-    # Don't include NetworkX graph in JSON output
-    output = {
-        "nodes": result["nodes"],
-        "edges": result["edges"],
-        "labelToId": result["labelToId"],
-        "is_directed": result["is_directed"]
-    }
+    result = parse_dot_file(dot_path, use_pydot=use_pydot)
 
-    print(json.dumps(output, indent=2))
+    print(json.dumps(result.to_dict(), indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Write precompressed variants of generated bundle files.
+
+server.py serves path.br / path.gz instead of path when the client
+accepts that encoding, so the bundle is compressed once at build time
+rather than on every request. brotli is optional; without it only
+gzip variants are written.
+"""
+
+import gzip
+
+try:
+    import brotli
+except ImportError:  # .br variants are skipped without brotli
+    brotli = None
+
+# Suffix -> Content-Encoding, in server preference order
+ENCODINGS = {".br": "br", ".gz": "gzip"}
+
+
+def _compress(data, suffix):
+    if suffix == ".br":
+        return brotli.compress(data, quality=9)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def remove_variants(path):
+    """Delete compressed variants of path left by an earlier build."""
+    for suffix in ENCODINGS:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def write_variants(path):
+    """
+    Write the compressed variants of path next to it.
+
+    Returns:
+        dict mapping variant path -> size in bytes
+    """
+    remove_variants(path)
+    data = path.read_bytes()
+
+    sizes = {}
+    for suffix in ENCODINGS:
+        if suffix == ".br" and brotli is None:
+            continue
+        variant = path.with_name(path.name + suffix)
+        tmp = variant.with_name(variant.name + ".tmp")
+        tmp.write_bytes(_compress(data, suffix))
+        tmp.replace(variant)
+        sizes[variant] = variant.stat().st_size
+    return sizes
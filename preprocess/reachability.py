@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Reachability index over the module graph.
+
+Cycles are collapsed into strongly connected components. The resulting
+DAG is labelled twice with interval lists (tree-cover labelling over a
+spanning-tree post-order, Agrawal/Borgida/Jagadish): once along the
+edges for descendants and once against them for ancestors. A component's
+descendants are exactly the components whose post-order number falls in
+one of its intervals, so:
+- "is A an ancestor of B" is a binary search in A's intervals
+- "all descendants/ancestors of X" enumerates X's intervals
+- "all modules on a path from A to B" walks the descendants of A and
+  keeps the ancestors of B
+
+The index is stored in the bundle as flat integer arrays and read by
+Reachability here and in app/js/reach.js. Graphs with little tree
+structure can need many intervals per node; past max_intervals the
+index is not built and the app falls back to traversing the graph.
+
+Usage:
+    python reachability.py [dot_file] [--nodes N] [--max-intervals N]
+reports build time, size and query latency (synthetic graph by default).
+"""
+
+import argparse
+import bisect
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from graph_model import edge_index_pairs
+
+# Default cap on stored intervals (down + up), about 20 MB as JSON
+MAX_INTERVALS = 2_000_000
+
+# Flat arrays of the index, as (key path, binary section suffix)
+ARRAYS = (
+    (("component",), "component"),
+    (("memberOffsets",), "member_offsets"),
+    (("members",), "members"),
+    (("down", "post"), "down.post"),
+    (("down", "order"), "down.order"),
+    (("down", "offsets"), "down.offsets"),
+    (("down", "intervals"), "down.intervals"),
+    (("up", "post"), "up.post"),
+    (("up", "order"), "up.order"),
+    (("up", "offsets"), "up.offsets"),
+    (("up", "intervals"), "up.intervals"),
+)
+
+
+def strongly_connected_components(num_nodes, successors):
+    """
+    Strongly connected components (iterative Tarjan).
+
+    Returns:
+        (component id per node, number of components); ids are in
+        topological order (edges go from lower to higher ids)
+    """
+    index = [-1] * num_nodes
+    lowlink = [0] * num_nodes
+    on_stack = [False] * num_nodes
+    stack = []
+    component = [-1] * num_nodes
+    count = 0
+    counter = 0
+
+    for root in range(num_nodes):
+        if index[root] >= 0:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, child = work.pop()
+            if child == 0:
+                index[node] = lowlink[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack[node] = True
+            succ = successors[node]
+            while child < len(succ):
+                nxt = succ[child]
+                child += 1
+                if index[nxt] < 0:
+                    work.append((node, child))
+                    work.append((nxt, 0))
+                    break
+                if on_stack[nxt]:
+                    lowlink[node] = min(lowlink[node], index[nxt])
+            else:
+                if lowlink[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component[member] = count
+                        if member == node:
+                            break
+                    count += 1
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+
+    # Tarjan emits components in reverse topological order
+    return [count - 1 - c for c in component], count
+
+
+def _label(num_components, successors, predecessors, order, score, limit=None):
+    """
+    Interval labelling of a DAG given as component successor lists.
+
+    Each component's tree parent is its predecessor with the highest
+    score. Preferring predecessors that already cover many components
+    keeps intervals inherited from other parents inside the tree
+    interval, which is what keeps the labels short.
+
+    Args:
+        order: components with every successor before its predecessors
+        limit: give up once more than this many intervals are needed
+
+    Returns:
+        dict with "post" (post-order number per component), "order"
+        (component per post-order number), and CSR "offsets"/"intervals"
+        (flat [lo, hi, lo, hi, ...]) per component; None past the limit
+    """
+    children = [[] for _ in range(num_components)]
+    roots = []
+    for comp in range(num_components):
+        if predecessors[comp]:
+            parent = max(predecessors[comp], key=score.__getitem__)
+            children[parent].append(comp)
+        else:
+            roots.append(comp)
+
+    # Post-order over the tree; low is the first number in a subtree
+    post = [0] * num_components
+    low = [0] * num_components
+    post_order = []
+    for root in roots:
+        low[root] = len(post_order)
+        work = [(root, 0)]
+        while work:
+            comp, child = work.pop()
+            if child < len(children[comp]):
+                work.append((comp, child + 1))
+                nxt = children[comp][child]
+                low[nxt] = len(post_order)
+                work.append((nxt, 0))
+            else:
+                post[comp] = len(post_order)
+                post_order.append(comp)
+
+    # Merge the successors' intervals into the tree interval
+    intervals = [None] * num_components
+    total = 0
+    for comp in order:
+        own = (low[comp], post[comp])
+        merged = [own]
+        for nxt in successors[comp]:
+            for interval in intervals[nxt]:
+                if not (own[0] <= interval[0] and interval[1] <= own[1]):
+                    merged.append(interval)
+        if len(merged) > 1:
+            merged.sort()
+            result = [merged[0]]
+            for lo, hi in merged[1:]:
+                last_lo, last_hi = result[-1]
+                if lo <= last_hi + 1:
+                    if hi > last_hi:
+                        result[-1] = (last_lo, hi)
+                else:
+                    result.append((lo, hi))
+            merged = result
+        intervals[comp] = merged
+        total += len(merged)
+        if limit is not None and total > limit:
+            return None
+
+    offsets = [0]
+    flat = []
+    for comp_intervals in intervals:
+        for lo, hi in comp_intervals:
+            flat.append(lo)
+            flat.append(hi)
+        offsets.append(len(flat))
+    return {"post": post, "order": post_order, "offsets": offsets, "intervals": flat}
+
+
+def _covered(labels):
+    """Number of components inside each component's intervals."""
+    flat = labels["intervals"]
+    offsets = labels["offsets"]
+    return [sum(flat[k + 1] - flat[k] + 1 for k in range(offsets[c], offsets[c + 1], 2))
+            for c in range(len(offsets) - 1)]
+
+
+def condensation(nodes, edges):
+    """
+    Collapse the cycles of a bundle's graph into strongly connected components.
+
+    Returns:
+        (component id per node index, number of components, down, up):
+        down[c] / up[c] are the sorted components with an edge from / to c.
+        Ids are in topological order, so edges (consumer -> dependency)
+        go from lower to higher ids.
+    """
+    return condense_pairs(len(nodes), edge_index_pairs(nodes, edges))
+
+
+def condense_pairs(num_nodes, pairs):
+    """condensation() of the (source, target) node index pairs of a graph."""
+    successors = [[] for _ in range(num_nodes)]
+    for source, target in pairs:
+        successors[source].append(target)
+
+    component, num_components = strongly_connected_components(num_nodes, successors)
+
+    down = [set() for _ in range(num_components)]
+    up = [set() for _ in range(num_components)]
+    for source, targets in enumerate(successors):
+        cs = component[source]
+        for target in targets:
+            ct = component[target]
+            if cs != ct:
+                down[cs].add(ct)
+                up[ct].add(cs)
+    return component, num_components, [sorted(s) for s in down], [sorted(s) for s in up]
+
+
+def build_reachability(nodes, edges, max_intervals=MAX_INTERVALS):
+    """
+    Build the reachability index for a bundle's nodes and edges.
+
+    Returns:
+        JSON-serializable dict (see Reachability for the layout), or None
+        if the index would need more than max_intervals intervals
+    """
+    component, num_components, down, up = condensation(nodes, edges)
+
+    members = [[] for _ in range(num_components)]
+    for node, comp in enumerate(component):
+        members[comp].append(node)
+    member_offsets = [0]
+    member_nodes = []
+    for comp_members in members:
+        member_nodes.extend(comp_members)
+        member_offsets.append(len(member_nodes))
+
+    forward = range(num_components)
+    backward = range(num_components - 1, -1, -1)
+
+    def budget(other):
+        """Intervals left for one labelling after the other one."""
+        if max_intervals is None:
+            return None
+        return max_intervals - (len(other["intervals"]) // 2 if other else 0)
+
+    # Seed the ancestor labelling with the longest path to a sink, then let
+    # each labelling pick parents by the exact counts from the other one
+    height = [0] * num_components
+    for comp in backward:
+        for nxt in down[comp]:
+            height[comp] = max(height[comp], height[nxt] + 1)
+    up_labels = _label(num_components, up, down, forward, height, budget(None))
+    if up_labels is None:
+        return None
+    down_labels = _label(num_components, down, up, backward, _covered(up_labels),
+                         budget(up_labels))
+    if down_labels is None:
+        return None
+    up_labels = _label(num_components, up, down, forward, _covered(down_labels),
+                       budget(down_labels))
+    if up_labels is None:
+        return None
+
+    return {
+        "component": component,
+        "memberOffsets": member_offsets,
+        "members": member_nodes,
+        "down": down_labels,
+        "up": up_labels,
+    }
+
+
+class Reachability:
+    """Queries over an index from build_reachability(), by node index."""
+
+    def __init__(self, data):
+        self.component = data["component"]
+        self.member_offsets = data["memberOffsets"]
+        self.members = data["members"]
+        self.down = data["down"]
+        self.up = data["up"]
+
+    @staticmethod
+    def _contains(labels, comp, number):
+        flat = labels["intervals"]
+        start, end = labels["offsets"][comp], labels["offsets"][comp + 1]
+        # The flat [lo, hi, lo, hi, ...] list is sorted: number lies inside an
+        # interval if it lands after a lo, or exactly on a hi
+        pos = bisect.bisect_right(flat, number, start, end)
+        return (pos - start) % 2 == 1 or (pos > start and flat[pos - 1] == number)
+
+    def is_ancestor(self, a, b):
+        """True if there is a path from node a to node b (or a == b)."""
+        ca, cb = self.component[a], self.component[b]
+        return self._contains(self.down, ca, self.down["post"][cb])
+
+    def _expand(self, labels, comp):
+        flat = labels["intervals"]
+        order = labels["order"]
+        for k in range(labels["offsets"][comp], labels["offsets"][comp + 1], 2):
+            for number in range(flat[k], flat[k + 1] + 1):
+                c = order[number]
+                yield from self.members[self.member_offsets[c]:self.member_offsets[c + 1]]
+
+    def descendants(self, node):
+        """Nodes reachable from node, excluding node itself."""
+        return [n for n in self._expand(self.down, self.component[node]) if n != node]
+
+    def ancestors(self, node):
+        """Nodes that reach node, excluding node itself."""
+        return [n for n in self._expand(self.up, self.component[node]) if n != node]
+
+    def between(self, a, b):
+        """Nodes on some path from a to b (including both), or [] if b is unreachable."""
+        if not self.is_ancestor(a, b):
+            return []
+        cb = self.component[b]
+        up_post = self.up["post"]
+        return [n for n in self._expand(self.down, self.component[a])
+                if self._contains(self.up, cb, up_post[self.component[n]])]
+
+
+def main():
+    sys.path.insert(0, str(Path(__file__).parent))
+    from bench_parse_graph import write_synthetic_dot
+    from parse_graph import parse_dot_file
+
+    parser = argparse.ArgumentParser(description="Benchmark the reachability index.")
+    parser.add_argument("dot_file", nargs="?", type=Path, help="DOT file (default: synthetic)")
+    parser.add_argument("--nodes", type=int, default=50_000, help="synthetic graph size")
+    parser.add_argument("--queries", type=int, default=10_000)
+    parser.add_argument("--max-intervals", type=int, default=MAX_INTERVALS,
+                        help="interval cap (0 for none, default: %(default)s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dot_path = args.dot_file
+        if dot_path is None:
+            dot_path = Path(tmp) / "synthetic.gv"
+            write_synthetic_dot(dot_path, args.nodes * 3)
+        graph = parse_dot_file(dot_path)
+
+    start = time.perf_counter()
+    data = build_reachability(graph.nodes, graph.edges, args.max_intervals or None)
+    build_seconds = time.perf_counter() - start
+    num_nodes = len(graph.nodes)
+    print(f"\nNodes: {num_nodes:,}, edges: {len(graph.edges):,}")
+    if data is None:
+        print(f"Gave up after {build_seconds:.2f} s: more than {args.max_intervals:,} intervals needed")
+        return
+
+    size = len(json.dumps(data, separators=(",", ":")))
+    reach = Reachability(data)
+    intervals = (len(data["down"]["intervals"]) + len(data["up"]["intervals"])) // 2
+
+    print(f"Build: {build_seconds:.2f} s, {intervals:,} intervals "
+          f"({intervals / max(1, num_nodes):.1f} per node), {size / 1024 / 1024:.1f} MB as JSON")
+
+    rng = random.Random(1)
+    pairs = [(rng.randrange(num_nodes), rng.randrange(num_nodes)) for _ in range(args.queries)]
+    start = time.perf_counter()
+    hits = sum(reach.is_ancestor(a, b) for a, b in pairs)
+    per_query = (time.perf_counter() - start) / len(pairs)
+    print(f"is_ancestor: {per_query * 1e6:.1f} us/query ({hits} of {len(pairs)} reachable)")
+
+    for name, query in (("descendants", reach.descendants), ("ancestors", reach.ancestors)):
+        start = time.perf_counter()
+        found = sum(len(query(a)) for a, _ in pairs)
+        per_query = (time.perf_counter() - start) / len(pairs)
+        print(f"{name}: {per_query * 1e6:.1f} us/query ({found / len(pairs):.0f} nodes on average)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Inverted search index over the modules of a bundle.
+
+Built from the modules dict of parse_config_file and written next to
+the bundle. For data/bundle.json:
+- data/bundle_search.json: served by server.py as /api/search?q=
+- data/bundle_search.js: the same index for static (file://) mode,
+  queried by app/js/searchindex.js
+
+The index holds trigram postings over module and plugin names,
+exact-match postings over parameter values, sorted numeric parameter
+values, and the consumers of every InputTag module label. Posting lists
+are sorted module indices stored as gaps (first index, then differences).
+
+Query syntax (space-separated terms, all of which must match):
+    word            module name contains word (case-insensitive)
+    plugin:word     plugin name contains word
+    type:word       module type contains word
+    consumes:label  an InputTag of the module points to label
+    param:name      the module has parameter name
+    name=value      parameter equals value (numerically for numbers)
+    name>x, name>=x, name<x, name<=x
+                    numeric parameter comparisons
+
+Usage:
+    python search_index.py <config_file> [query ...]
+reports build time, size and query latency.
+"""
+
+import bisect
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+INDEX_VERSION = 1
+
+# Parameter types whose values are also indexed numerically
+NUMERIC_TYPES = ("int32", "uint32", "int64", "uint64", "double")
+
+# Numbers accepted in values and comparisons (as in app/js/searchindex.js)
+_NUMBER = re.compile(r"^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$")
+
+# name<op>value terms
+_COMPARISON = re.compile(r"^([A-Za-z_][\w.]*)(>=|<=|=|>|<)(.+)$")
+
+# Prefixes of prefix:value terms
+_PREFIXES = ("plugin", "type", "consumes", "param")
+
+
+def _gaps(values):
+    """Gap-encode a sorted list of integers."""
+    return [values[0]] + [b - a for a, b in zip(values, values[1:])] if values else []
+
+
+def _ungaps(gaps):
+    values = []
+    total = 0
+    for gap in gaps:
+        total += gap
+        values.append(total)
+    return values
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _number(value):
+    return float(value) if isinstance(value, str) and _NUMBER.match(value.strip()) else None
+
+
+def _trigram_postings(strings):
+    postings = {}
+    for i, text in enumerate(strings):
+        for gram in _trigrams(text.lower()):
+            postings.setdefault(gram, []).append(i)
+    return {gram: _gaps(ids) for gram, ids in sorted(postings.items())}
+
+
+def build_search_index(modules):
+    """
+    Build the search index for a modules dict.
+
+    Returns:
+        JSON-serializable dict (see SearchIndex)
+    """
+    names = list(modules)
+    plugins = sorted({m.get("plugin") for m in modules.values() if m.get("plugin")})
+    types = sorted({m.get("type") for m in modules.values() if m.get("type")})
+    plugin_index = {p: i for i, p in enumerate(plugins)}
+    type_index = {t: i for i, t in enumerate(types)}
+
+    params = {}
+    numeric = {}
+    consumers = {}
+    for i, name in enumerate(names):
+        module = modules[name]
+        for param_name, param in module.get("parameters", {}).items():
+            value = param.get("value")
+            if value is None:
+                continue
+            postings = params.setdefault(param_name, {}).setdefault(value, [])
+            if not postings or postings[-1] != i:
+                postings.append(i)
+            if (param.get("type") or "").replace("untracked.", "") in NUMERIC_TYPES:
+                number = _number(value)
+                if number is not None:
+                    numeric.setdefault(param_name, []).append((number, i))
+        for tag in module.get("inputTags", []):
+            label = tag.get("module")
+            if label:
+                postings = consumers.setdefault(label, [])
+                if not postings or postings[-1] != i:
+                    postings.append(i)
+
+    return {
+        "version": INDEX_VERSION,
+        "names": names,
+        "plugins": plugins,
+        "types": types,
+        "modulePlugin": [plugin_index.get(modules[n].get("plugin"), -1) for n in names],
+        "moduleType": [type_index.get(modules[n].get("type"), -1) for n in names],
+        "nameTrigrams": _trigram_postings(names),
+        "pluginTrigrams": _trigram_postings(plugins),
+        "params": {name: {value: _gaps(ids) for value, ids in values.items()}
+                   for name, values in sorted(params.items())},
+        "numeric": {name: {"values": [v for v, _ in pairs], "modules": [i for _, i in pairs]}
+                    for name, pairs in ((n, sorted(p)) for n, p in sorted(numeric.items()))},
+        "consumers": {label: _gaps(ids) for label, ids in sorted(consumers.items())},
+    }
+
+
+class SearchIndex:
+    """Queries over an index from build_search_index()."""
+
+    def __init__(self, data):
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version {data.get('version')}")
+        self.data = data
+        self.names = data["names"]
+        self._lower = {}
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Load an index from the contents of a bundle_search.json file."""
+        return cls(json.loads(data))
+
+    def _lowercase(self, key):
+        if key not in self._lower:
+            self._lower[key] = [s.lower() for s in self.data[key]]
+        return self._lower[key]
+
+    def _substring(self, text, strings_key, grams_key):
+        """Indices of the strings containing text (case-insensitive)."""
+        text = text.lower()
+        strings = self._lowercase(strings_key)
+        grams = _trigrams(text)
+        if not grams:
+            return [i for i, s in enumerate(strings) if text in s]
+
+        postings = self.data[grams_key]
+        if any(gram not in postings for gram in grams):
+            return []
+        # Intersect from the shortest posting list, then check the full text
+        lists = sorted((postings[gram] for gram in grams), key=len)
+        candidates = set(_ungaps(lists[0]))
+        for gaps in lists[1:]:
+            candidates.intersection_update(_ungaps(gaps))
+            if not candidates:
+                return []
+        return sorted(i for i in candidates if text in strings[i])
+
+    def _by_column(self, column, matches):
+        matches = set(matches)
+        return [i for i, value in enumerate(self.data[column]) if value in matches]
+
+    def _param(self, name):
+        return sorted({i for gaps in self.data["params"].get(name, {}).values() for i in _ungaps(gaps)})
+
+    def _compare(self, name, op, value):
+        result = set()
+        if op == "=":
+            result.update(_ungaps(self.data["params"].get(name, {}).get(value, [])))
+        number = _number(value)
+        if number is None:
+            if op != "=":
+                raise ValueError(f"Expected a number after {name}{op}")
+            return sorted(result)
+
+        entry = self.data["numeric"].get(name)
+        if entry is not None:
+            values, modules = entry["values"], entry["modules"]
+            start, end = {
+                "=": (bisect.bisect_left(values, number), bisect.bisect_right(values, number)),
+                ">": (bisect.bisect_right(values, number), len(values)),
+                ">=": (bisect.bisect_left(values, number), len(values)),
+                "<": (0, bisect.bisect_left(values, number)),
+                "<=": (0, bisect.bisect_right(values, number)),
+            }[op]
+            result.update(modules[start:end])
+        return sorted(result)
+
+    def _term(self, term):
+        prefix, sep, rest = term.partition(":")
+        if sep and prefix in _PREFIXES:
+            if prefix == "plugin":
+                return self._by_column("modulePlugin", self._substring(rest, "plugins", "pluginTrigrams"))
+            if prefix == "type":
+                types = self._lowercase("types")
+                return self._by_column("moduleType", [i for i, t in enumerate(types) if rest.lower() in t])
+            if prefix == "consumes":
+                return _ungaps(self.data["consumers"].get(rest, []))
+            return self._param(rest)
+
+        comparison = _COMPARISON.match(term)
+        if comparison:
+            return self._compare(*comparison.groups())
+        return self._substring(term, "names", "nameTrigrams")
+
+    def search(self, query, limit=None):
+        """
+        Run a query (see module docstring).
+
+        Returns:
+            (matching module names in bundle order, total number of matches)
+
+        Raises:
+            ValueError: on an empty or malformed query
+        """
+        terms = query.split()
+        if not terms:
+            raise ValueError("Empty query")
+
+        result = None
+        for term in terms:
+            matches = self._term(term)
+            result = set(matches) if result is None else result.intersection(matches)
+            if not result:
+                return [], 0
+        ordered = sorted(result)
+        return [self.names[i] for i in ordered[:limit]], len(ordered)
+
+
+def _write_text_atomic(path, text):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    tmp_path.replace(path)
+
+
+def search_paths(bundle_path):
+    """Return (index JSON path, static script path) for a bundle path."""
+    bundle_path = Path(bundle_path)
+    base = bundle_path.with_name(bundle_path.stem + "_search")
+    return base.with_suffix(".json"), base.with_suffix(".js")
+
+
+def write_search_index(modules, bundle_path):
+    """
+    Write the index JSON and its static script next to bundle_path.
+
+    Returns:
+        Metadata for the bundle: {"path", "bytes"}
+    """
+    json_path, script_path = search_paths(bundle_path)
+    text = json.dumps(build_search_index(modules), separators=(",", ":"))
+    _write_text_atomic(json_path, text)
+    _write_text_atomic(script_path, f"SearchIndex.register({text});\n")
+    return {"path": json_path.stem, "bytes": len(text)}
+
+
+def remove_search_index(bundle_path):
+    """Delete an index written by an earlier build."""
+    for path in search_paths(bundle_path):
+        path.unlink(missing_ok=True)
+
+
+def _sample_queries(data):
+    """One query per kind of term, picked from the indexed menu."""
+    queries = []
+    if data["names"]:
+        queries.append(data["names"][len(data["names"]) // 2][:6])
+    if data["plugins"]:
+        queries.append("plugin:" + data["plugins"][0])
+    if data["types"]:
+        queries.append("type:" + data["types"][0])
+    if data["consumers"]:
+        busiest = max(data["consumers"], key=lambda label: len(data["consumers"][label]))
+        queries.append("consumes:" + busiest)
+    if data["numeric"]:
+        name = max(data["numeric"], key=lambda n: len(data["numeric"][n]["values"]))
+        values = data["numeric"][name]["values"]
+        queries.append(f"{name}>{values[len(values) // 2]:g}")
+    if data["params"]:
+        name = max(data["params"], key=lambda n: len(data["params"][n]))
+        queries.append(f"param:{name}")
+        queries.append(f"{name}={next(iter(data['params'][name]))}")
+    return [q for q in queries if q.strip()]
+
+
+def main():
+    from parse_config import parse_config_file
+
+    if len(sys.argv) < 2:
+        print("Usage: python search_index.py <config_file> [query ...]")
+        sys.exit(1)
+
+    modules = parse_config_file(Path(sys.argv[1]))
+    start = time.perf_counter()
+    data = build_search_index(modules)
+    build_seconds = time.perf_counter() - start
+    size = len(json.dumps(data, separators=(",", ":")))
+    print(f"\nIndex: {len(modules):,} modules, built in {build_seconds:.2f} s, "
+          f"{size / 1024 / 1024:.1f} MB as JSON")
+
+    start = time.perf_counter()
+    index = SearchIndex(json.loads(json.dumps(data)))
+    print(f"Load: {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    queries = sys.argv[2:] or _sample_queries(data)
+    print(f"{'query':<40}{'matches':>9}{'ms':>9}")
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(20):
+            names, total = index.search(query)
+        elapsed = (time.perf_counter() - start) / 20
+        print(f"{query:<40}{total:>9,}{elapsed * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
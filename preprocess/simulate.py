@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Predict throughput against the number of threads and streams.
+
+The framework runs one event per stream at a time; within an event a
+module can start once every module it depends on has finished, and any
+free thread takes the next ready module of any stream. simulate() plays
+this out with a list scheduler over the module graph (cycles collapsed,
+see reachability.condensation) and the module times of a bundle built
+with --timing (see timing.py):
+- ready modules wait in a heap, longest remaining chain first (the time
+  from the module to the end of its event along its consumers), then
+  oldest event first
+- the simulation jumps from one module completion to the next, popped
+  from a second heap, so its cost is that of the scheduled modules, not
+  of the simulated time
+- modules that took no time are completed as soon as they are ready
+
+A run measures the steady state: it ends as soon as a stream runs out of
+events, before the pipeline drains, and the event rate is taken between
+the first and the last completion. It reports the predicted events per
+second, the thread utilization, and the modules that serialize
+execution: the thread time spent idle while nothing was ready is charged
+to the module whose completion ended it.
+
+Usage:
+    python simulate.py [bundle.json|bundle.bin] [--threads 1,2,4,...]
+sweeps the thread counts (streams = threads unless --streams is given),
+on a synthetic 10k-module workflow by default.
+"""
+
+import argparse
+import heapq
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from binary_bundle import BinaryBundle, MAGIC
+from reachability import condensation
+
+# Thread counts swept by default
+DEFAULT_THREADS = (1, 2, 4, 8, 16, 32, 64)
+
+# Events queued per stream, unless given
+EVENTS_PER_STREAM = 2
+
+# Modules listed as serializing execution in a run
+TOP_SERIALIZING = 10
+
+
+class Scheduler:
+    """Task graph of a bundle: one task per component, with its time."""
+
+    def __init__(self, nodes, edges, times):
+        """
+        Args:
+            nodes, edges: The bundle's graph (edges consumer -> dependency)
+            times: ms per event of each node, in node order
+        """
+        component, num_tasks, down, up = condensation(nodes, edges)
+        self.num_tasks = num_tasks
+        self.cost = [0.0] * num_tasks
+        heaviest = [-1.0] * num_tasks
+        self.labels = [None] * num_tasks
+        for i, task in enumerate(component):
+            self.cost[task] += times[i]
+            # A cycle is named after its slowest module
+            if times[i] > heaviest[task]:
+                heaviest[task] = times[i]
+                self.labels[task] = nodes[i].get("label", nodes[i]["id"])
+
+        # Modules that can run once a task is done, and how many tasks each waits for
+        self.consumers = up
+        self.num_dependencies = [len(deps) for deps in down]
+        self.sources = [task for task in range(num_tasks) if not down[task]]
+
+        # Consumers have lower ids: the longest chain from each task to
+        # the end of the event, counted from the last consumer back
+        self.rank = [0.0] * num_tasks
+        for task in range(num_tasks):
+            self.rank[task] = self.cost[task] + max((self.rank[c] for c in up[task]), default=0.0)
+        self.total = sum(self.cost)
+        self.critical_path = max(self.rank, default=0.0)
+
+        # Position of each task by decreasing rank, its priority in the ready heap
+        self.order = sorted(range(num_tasks), key=lambda task: -self.rank[task])
+        self.priority = [0] * num_tasks
+        for position, task in enumerate(self.order):
+            self.priority[task] = position
+
+    @classmethod
+    def from_bundle(cls, bundle):
+        """
+        Raises:
+            ValueError: If the bundle was built without a timing report
+        """
+        if "timing" not in bundle:
+            raise ValueError("The bundle has no module times (build it with --timing)")
+        return cls(bundle["nodes"], bundle["edges"], bundle["timing"]["time"])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Build the task graph from the contents of a bundle.json or bundle.bin file."""
+        if data[:len(MAGIC)] == MAGIC:
+            bundle = BinaryBundle(data).to_dict()
+        else:
+            bundle = json.loads(data)
+        return cls.from_bundle(bundle)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def bounds(self, threads, streams):
+        """
+        Upper bound on events per second: the threads' CPU time, or one
+        critical path per stream at a time, whichever is lower.
+
+        Returns:
+            (events per second, "threads" or "critical path")
+        """
+        by_threads = 1000 * threads / self.total if self.total else float("inf")
+        by_path = 1000 * streams / self.critical_path if self.critical_path else float("inf")
+        return (by_threads, "threads") if by_threads <= by_path else (by_path, "critical path")
+
+    def simulate(self, threads, streams=None, events=None):
+        """
+        Simulate processing events with the given threads and streams.
+
+        Args:
+            streams: Events in flight at once (default: one per thread)
+            events: Events queued (default: EVENTS_PER_STREAM per stream);
+                the run ends once the last one has started and a stream
+                finishes its event
+
+        Returns:
+            JSON-serializable dict with "threads", "streams", "events"
+            (finished), "time" (simulated ms), "eventsPerSecond",
+            "utilization" (busy share of the thread time), "bound" and
+            "serializing" [{"module", "idle" (thread ms), "share" (of all
+            idle thread time)}]
+        """
+        streams = streams or threads
+        events = max(events or EVENTS_PER_STREAM * streams, streams + 1)
+        num_tasks = self.num_tasks
+        cost, consumers, order = self.cost, self.consumers, self.order
+        push, pop = heapq.heappush, heapq.heappop
+
+        # Ready-heap key of each task in event 0
+        base = [position * events for position in self.priority]
+        sources = [base[task] for task in self.sources]
+        # Ready tasks sort by priority, then event: priority * events + event
+        ready = []
+        running = []                # (finish time, event * num_tasks + task)
+        waiting = [None] * events   # remaining dependencies per task of each event
+        left = [0] * events         # tasks of each event not finished yet
+        done = []                   # finished tasks to propagate, as event * num_tasks + task
+        free = threads
+        now = 0.0
+        busy = 0.0
+        started = 0
+        finished = 0
+        first_finish = 0.0
+        idle_by_task = [0.0] * num_tasks
+
+        for event in range(min(streams, events)):
+            waiting[event] = self.num_dependencies[:]
+            left[event] = num_tasks
+            for key in sources:
+                push(ready, key + event)
+        started = min(streams, events)
+
+        while True:
+            while free and ready:
+                key = pop(ready)
+                position = key // events
+                task = order[position]
+                duration = cost[task]
+                if duration > 0:
+                    push(running, (now + duration, (key - position * events) * num_tasks + task))
+                    busy += duration
+                    free -= 1
+                else:
+                    done.append(key % events * num_tasks + task)
+
+            if not done:
+                if not running:
+                    break
+                finish, key = pop(running)
+                # Threads idle until this completion were waiting for it
+                if free:
+                    idle_by_task[key % num_tasks] += free * (finish - now)
+                now = finish
+                free += 1
+                done.append(key)
+
+            # Release the consumers; those that take no time finish at once
+            while done:
+                key = done.pop()
+                event = key // num_tasks
+                task = key - event * num_tasks
+                counts = waiting[event]
+                for consumer in consumers[task]:
+                    counts[consumer] -= 1
+                    if not counts[consumer]:
+                        if cost[consumer] > 0:
+                            push(ready, base[consumer] + event)
+                        else:
+                            done.append(event * num_tasks + consumer)
+                left[event] -= 1
+                if left[event] == 0:
+                    waiting[event] = None
+                    finished += 1
+                    if finished == 1:
+                        first_finish = now
+                    if started == events:
+                        # A stream is left without work: the steady state is over
+                        done.clear()
+                        break
+                    # The stream moves on to the next event
+                    waiting[started] = self.num_dependencies[:]
+                    left[started] = num_tasks
+                    for key in sources:
+                        push(ready, key + started)
+                    started += 1
+            if started == events and finished > events - streams:
+                break
+
+        # Modules still running only count up to now
+        busy -= sum(finish - now for finish, _ in running)
+        # Events finish in bursts while the streams keep in step: the rate
+        # is that of the completions after the first
+        window = now - first_finish
+
+        idle_total = sum(idle_by_task)
+        top = sorted(range(num_tasks), key=idle_by_task.__getitem__, reverse=True)[:TOP_SERIALIZING]
+        bound, limited_by = self.bounds(threads, streams)
+        return {
+            "threads": threads,
+            "streams": streams,
+            "events": finished,
+            "time": round(now, 3),
+            "eventsPerSecond": round(1000 * (finished - 1) / window, 3) if window > 0 else None,
+            "utilization": round(busy / (threads * now), 4) if now else None,
+            "bound": {"eventsPerSecond": round(bound, 3), "limitedBy": limited_by},
+            "serializing": [{"module": self.labels[task], "idle": round(idle_by_task[task], 3),
+                             "share": round(idle_by_task[task] / idle_total, 4)}
+                            for task in top if idle_by_task[task] > 0],
+        }
+
+    def sweep(self, thread_counts=DEFAULT_THREADS, streams=None, events=None):
+        """
+        simulate() for each thread count; streams default to the thread
+        count. Each run also gets its "speedup" over the first.
+        """
+        runs = [self.simulate(threads, streams, events) for threads in thread_counts]
+        base = runs[0]["eventsPerSecond"] if runs else None
+        for run in runs:
+            run["speedup"] = round(run["eventsPerSecond"] / base, 3) if base and run["eventsPerSecond"] else None
+        return runs
+
+
+def _synthetic_scheduler(num_modules):
+    from parse_graph import parse_dot_file
+    from synthetic import write_synthetic_workflow
+    from timing import parse_timing_report
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dot_path, _ = write_synthetic_workflow(tmp, modules=num_modules)
+        graph = parse_dot_file(dot_path)
+        times = parse_timing_report(Path(tmp) / "timing.json")
+    return Scheduler(graph.nodes, graph.edges, [times.get(label, 0.0) for label in graph.labels])
+
+
+def parse_thread_counts(text, maximum=None):
+    """
+    '1,2,4' or '1-8' (or a mix) -> sorted list of thread counts
+
+    Raises:
+        ValueError: If a count is below 1 or above maximum
+    """
+    counts = set()
+    for part in text.split(","):
+        if "-" in part:
+            low, high = (int(bound) for bound in part.split("-", 1))
+            if low < 1 or maximum is not None and high > maximum:
+                raise ValueError(f"Invalid thread counts: {text}")
+            counts.update(range(low, high + 1))
+        elif part.strip():
+            counts.add(int(part))
+    if not counts or min(counts) < 1 or maximum is not None and max(counts) > maximum:
+        raise ValueError(f"Invalid thread counts: {text}")
+    return sorted(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate throughput against the number of threads.")
+    parser.add_argument("bundle", nargs="?", type=Path,
+                        help="bundle.json or bundle.bin built with --timing (default: synthetic)")
+    parser.add_argument("--threads", default=",".join(map(str, DEFAULT_THREADS)),
+                        help="thread counts, e.g. 1,2,4 or 1-64")
+    parser.add_argument("--streams", type=int, help="concurrent events (default: one per thread)")
+    parser.add_argument("--events", type=int,
+                        help=f"events per run (default: {EVENTS_PER_STREAM} per stream)")
+    parser.add_argument("--modules", type=int, default=10_000, help="synthetic workflow size")
+    parser.add_argument("--json", type=Path, help="also write the runs to this file")
+    args = parser.parse_args()
+
+    try:
+        thread_counts = parse_thread_counts(args.threads)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    scheduler = Scheduler.load(args.bundle) if args.bundle else _synthetic_scheduler(args.modules)
+    print(f"\n{scheduler.num_tasks:,} tasks, {scheduler.total:.2f} ms/event of CPU time, "
+          f"critical path {scheduler.critical_path:.2f} ms (loaded in {time.perf_counter() - start:.2f} s)")
+
+    start = time.perf_counter()
+    runs = scheduler.sweep(thread_counts, args.streams, args.events)
+    print(f"Simulated {len(runs)} runs in {time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'threads':>7}{'streams':>8}{'events/s':>11}{'speedup':>9}{'util':>7}{'bound':>11}  top serializing module")
+    for run in runs:
+        top = run["serializing"][0] if run["serializing"] else None
+        top_text = f"{top['module']} ({100 * top['share']:.0f}% of idle)" if top else "-"
+        print(f"{run['threads']:>7}{run['streams']:>8}{run['eventsPerSecond']:>11.2f}{run['speedup']:>9.2f}"
+              f"{100 * run['utilization']:>6.0f}%{run['bound']['eventsPerSecond']:>11.2f}  {top_text}")
+
+    last = runs[-1]
+    if last["serializing"]:
+        print(f"\nModules serializing execution at {last['threads']} threads:")
+        for entry in last["serializing"]:
+            print(f"  {100 * entry['share']:>5.1f}%  {entry['module']}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(runs, f, indent=2)
+        print(f"\nRuns: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Write the bundle as a stream of records, one JSON object per line (NDJSON).
+
+bundle.ndjson holds the same data as bundle.json in an order the app can
+draw while it downloads:
+- a header with the metadata and, when built, the coarse graph
+- batches of nodes, then batches of edges
+- labelToId, batches of module records, and the remaining keys
+  (e.g. the reachability index), one record each
+- an end record with the counts, so a truncated stream is detected
+
+Values are encoded a batch at a time with the C JSON encoder (_write_json),
+so the writer never holds more than a batch as text. write_json_bundle
+writes bundle.json the same way.
+
+Only the encoding is incremental. The bundle passed in holds every
+section: nodes, edges and module records are views that build their
+dicts a batch at a time from the graph model and the parsed modules,
+but the reachability index, coarse graph and analyses are computed over
+the whole graph before anything is written.
+"""
+
+import json
+import sys
+import time
+from collections.abc import Mapping
+from pathlib import Path
+
+from graph_model import RowView
+
+STREAM_VERSION = 1
+
+# Nodes, edges or module records per line
+STREAM_BATCH = 5000
+
+# Keys of the header record, sent before any node
+HEADER_KEYS = ("metadata", "coarse")
+
+# Keys sent in batches, in order, and the keys sent after them first
+BATCHED_KEYS = ("nodes", "edges")
+TRAILING_KEYS = ("labelToId",)
+
+
+def stream_path(output_path):
+    """bundle.ndjson next to bundle.json"""
+    return output_path.with_suffix(".ndjson")
+
+
+def _batches(items, batch_size):
+    for start in range(0, len(items), batch_size):
+        yield items[start:start + batch_size]
+
+
+def _dict_batches(mapping, batch_size):
+    batch = {}
+    for key, value in mapping.items():
+        batch[key] = value
+        if len(batch) == batch_size:
+            yield batch
+            batch = {}
+    if batch:
+        yield batch
+
+
+def _encode(value):
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _write_json(f, value, batch_size):
+    """
+    Write value as compact JSON, a batch of list items or dict entries at
+    a time; small dicts are written key by key, so large lists anywhere
+    inside them (e.g. the reachability index) are batched too. The nodes
+    and edges of a GraphModel, and the slim module records of
+    module_details.split_module_details, are built a batch at a time.
+    """
+    if isinstance(value, (list, RowView)) and len(value) > batch_size:
+        f.write("[")
+        for i, batch in enumerate(_batches(value, batch_size)):
+            f.write(("," if i else "") + _encode(batch)[1:-1])
+        f.write("]")
+    elif isinstance(value, RowView):
+        f.write(_encode(list(value)))
+    elif isinstance(value, Mapping) and len(value) > batch_size:
+        f.write("{")
+        for i, batch in enumerate(_dict_batches(value, batch_size)):
+            f.write(("," if i else "") + _encode(batch)[1:-1])
+        f.write("}")
+    elif isinstance(value, Mapping):
+        f.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            f.write(("," if i else "") + _encode(str(key)) + ":")
+            _write_json(f, item, batch_size)
+        f.write("}")
+    else:
+        f.write(_encode(value))
+
+
+def iter_stream_records(bundle, batch_size=STREAM_BATCH):
+    """
+    Yield the records of the stream, in order.
+
+    Args:
+        bundle: Bundle dict, as written to bundle.json
+        batch_size: Nodes, edges or modules per record
+    """
+    header = {"type": "header", "version": STREAM_VERSION}
+    header.update((key, bundle[key]) for key in HEADER_KEYS if key in bundle)
+    yield header
+
+    for key in BATCHED_KEYS:
+        for batch in _batches(bundle[key], batch_size):
+            yield {"type": key, "items": batch}
+
+    for key in TRAILING_KEYS:
+        yield {"type": key, "value": bundle[key]}
+
+    for batch in _dict_batches(bundle["modules"], batch_size):
+        yield {"type": "modules", "items": batch}
+
+    done = set(HEADER_KEYS + BATCHED_KEYS + TRAILING_KEYS + ("modules",))
+    for key, value in bundle.items():
+        if key not in done:
+            yield {"type": key, "value": value}
+
+    yield {
+        "type": "end",
+        "nodes": len(bundle["nodes"]),
+        "edges": len(bundle["edges"]),
+        "modules": len(bundle["modules"]),
+    }
+
+
+def write_stream_bundle(bundle, path, batch_size=STREAM_BATCH):
+    """
+    Write bundle.ndjson, replacing path only once it is complete.
+
+    Returns:
+        Number of records written
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in iter_stream_records(bundle, batch_size):
+            _write_json(f, record, batch_size)
+            f.write("\n")
+            count += 1
+    tmp_path.replace(path)
+    return count
+
+
+def read_stream_bundle(path):
+    """
+    Read bundle.ndjson back into a bundle dict.
+
+    Raises:
+        ValueError: If the stream is truncated or of another version
+    """
+    bundle = {"nodes": [], "edges": [], "modules": {}}
+    end = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            kind = record.pop("type")
+            if kind == "header":
+                if record.pop("version") != STREAM_VERSION:
+                    raise ValueError(f"{path}: unsupported stream version")
+                bundle.update(record)
+            elif kind in BATCHED_KEYS:
+                bundle[kind].extend(record["items"])
+            elif kind == "modules":
+                bundle["modules"].update(record["items"])
+            elif kind == "end":
+                end = record
+            else:
+                bundle[kind] = record["value"]
+
+    if end is None or end["nodes"] != len(bundle["nodes"]) or end["edges"] != len(bundle["edges"]):
+        raise ValueError(f"{path}: truncated stream")
+    return bundle
+
+
+def remove_stream_bundle(path):
+    """Delete a bundle.ndjson left by an earlier build."""
+    path.unlink(missing_ok=True)
+
+
+def write_json_bundle(bundle, path, batch_size=STREAM_BATCH):
+    """
+    Write bundle.json compactly, a batch at a time, replacing path only
+    once it is complete. json.dump with indent streams too, but through
+    the pure-Python encoder, about 4x slower.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        _write_json(f, bundle, batch_size)
+    tmp_path.replace(path)
+
+
+def main():
+    """Convert an existing bundle.json and compare the two formats."""
+    if len(sys.argv) < 2:
+        print("Usage: python stream_bundle.py <bundle.json>")
+        sys.exit(1)
+
+    json_path = Path(sys.argv[1])
+    bundle = json.loads(json_path.read_text(encoding="utf-8"))
+
+    path = stream_path(json_path)
+    start = time.perf_counter()
+    records = write_stream_bundle(bundle, path)
+    print(f"Wrote {path}: {records} records, {path.stat().st_size:,} bytes "
+          f"in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    streamed = read_stream_bundle(path)
+    print(f"Read back in {time.perf_counter() - start:.2f} s, "
+          f"{'identical' if streamed == bundle else 'DIFFERENT'}")
+
+
+if __name__ == "__main__":
+    main()
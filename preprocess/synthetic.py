@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic CMSSW-like workflows for benchmarking.
+
+Writes a dependency DOT file and a matching dumpConfig.py: the DOT file
+has Path subgraphs holding filter nodes, then top-level producer and
+analyzer nodes and an acyclic edge list (consumer -> dependency, as
+written by the CMSSW dependency dumper); the config defines every
+module, with InputTags and VInputTags naming its dependencies (some
+inside nested PSets), simple parameters, ES modules that are not in the
+graph, a few references to unknown modules, and the Paths. A timing.json
+in the format of the FastTimerService JSON summary gives every module a
+time per event (see timing.py).
+
+The output is deterministic for a given spec (see DEFAULT_SPEC), so
+benchmark results for the same spec are comparable across runs.
+
+Usage:
+    python synthetic.py <output_dir> [--modules 100000] [...]
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+# Label stems and plugin names of typical reconstruction modules
+_STEMS = (
+    ("hltPixelTracks", "PixelTrackProducer"),
+    ("ak4PFJets", "FastjetJetProducer"),
+    ("muonTracks", "MuonTrackProducer"),
+    ("ecalRecHit", "EcalRecHitProducer"),
+    ("hcalDigis", "HcalRawToDigi"),
+    ("generalTracks", "TrackListMerger"),
+    ("particleFlow", "PFProducer"),
+    ("offlinePrimaryVertices", "PrimaryVertexProducer"),
+    ("gsfElectrons", "GsfElectronProducer"),
+    ("caloTowers", "CaloTowersCreator"),
+    ("siStripClusters", "SiStripClusterizer"),
+    ("photonCore", "PhotonCoreProducer"),
+)
+
+# (module type, weight) for modules in the graph
+_GRAPH_TYPES = (("EDProducer", 0.75), ("EDFilter", 0.15), ("EDAnalyzer", 0.08), ("OutputModule", 0.02))
+
+# Share of InputTags naming a module that is not defined anywhere
+_UNKNOWN_FRACTION = 0.02
+
+# Events in timing.json; module times per event are log-normal around 1 ms
+_TIMING_EVENTS = 100
+_TIMING_SIGMA = 1.5
+
+
+# Shape of a synthetic workflow:
+#   modules: modules in the graph (the config adds es_fraction more)
+#   edges_per_module: average number of dependencies per module
+#   paths: Path subgraphs (0: one per 200 modules)
+#   vinputtag_fraction: share of dependencies listed in a VInputTag
+#   pset_depth: nesting depth of the PSets holding some InputTags
+#   es_fraction: ES modules per graph module (config only)
+DEFAULT_SPEC = {
+    "modules": 10_000,
+    "edges_per_module": 2.5,
+    "paths": 0,
+    "vinputtag_fraction": 0.2,
+    "pset_depth": 2,
+    "es_fraction": 0.05,
+    "seed": 1,
+}
+
+
+def _num_paths(spec):
+    return spec["paths"] or max(1, spec["modules"] // 200)
+
+
+def _module_names(spec, rng):
+    """Labels, plugins and types of the graph modules, in dependency order."""
+    types, weights = zip(*_GRAPH_TYPES)
+    modules = []
+    for i in range(spec["modules"]):
+        stem, plugin = _STEMS[rng.randrange(len(_STEMS))]
+        modules.append((f"{stem}{i}", plugin, rng.choices(types, weights)[0]))
+    return modules
+
+
+def _dependencies(spec, rng):
+    """Dependency lists by module index; dependencies always come earlier."""
+    deps = [[] for _ in range(spec["modules"])]
+    for i in range(1, spec["modules"]):
+        count = min(i, int(rng.expovariate(1 / spec["edges_per_module"]) + 0.5))
+        chosen = set()
+        for _ in range(count):
+            # Mostly nearby modules, as in a reconstruction sequence
+            if rng.random() < 0.8:
+                j = max(0, i - 1 - int(rng.expovariate(1 / 50)))
+            else:
+                j = rng.randrange(i)
+            chosen.add(j)
+        deps[i] = sorted(chosen)
+    return deps
+
+
+def _write_dot(path, spec, modules, deps, path_of):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('digraph RECO {\ngraph [\nlabel="process RECO", labelloc=top];\n')
+        members = {}
+        for i, p in path_of.items():
+            members.setdefault(p, []).append(i)
+        for p in range(_num_paths(spec)):
+            f.write(f'subgraph path{p} {{\ngraph [\nlabel="Path path{p}", labelloc=bottom];\n')
+            for i in members.get(p, []):
+                label, plugin, _ = modules[i]
+                f.write(f'{i}[color=black, fillcolor=white, label={label}, shape=diamond, '
+                        f'style=filled, tooltip={plugin}];\n')
+            f.write('}\n')
+
+        for i, (label, plugin, module_type) in enumerate(modules):
+            if i in path_of:
+                continue
+            fill = "lightgrey" if module_type in ("EDAnalyzer", "OutputModule") else "green"
+            f.write(f'{i}[color=black, fillcolor={fill}, label={label}, shape=box, '
+                    f'style=filled, tooltip={plugin}];\n')
+        for i, targets in enumerate(deps):
+            for j in targets:
+                f.write(f'{i} -> {j}[color=darkgreen];\n' if i % 7 == 0 else f'{i} -> {j};\n')
+        f.write('}\n')
+
+
+def _tag(label, rng):
+    """InputTag argument text for a dependency, sometimes with instance/process."""
+    roll = rng.random()
+    if roll < 0.6:
+        return f'"{label}"'
+    if roll < 0.85:
+        return f'"{label}", "{rng.choice(("", "hits", "tracks"))}"'
+    return f'"{label}:instance:RECO"'
+
+
+def _simple_params(rng, indent, count):
+    params = []
+    for k in range(count):
+        roll = rng.random()
+        if roll < 0.3:
+            params.append(f"{indent}cut{k} = cms.double({rng.uniform(-5, 50):.3f})")
+        elif roll < 0.55:
+            params.append(f"{indent}nMax{k} = cms.int32({rng.randrange(1000)})")
+        elif roll < 0.7:
+            params.append(f"{indent}flag{k} = cms.bool({rng.choice(('True', 'False'))})")
+        elif roll < 0.85:
+            params.append(f"{indent}algo{k} = cms.string('{rng.choice(('hybrid', 'ctf', 'iter(0)'))}')")
+        elif roll < 0.95:
+            params.append(f"{indent}verbose{k} = cms.untracked.int32({rng.randrange(3)})")
+        else:
+            params.append(f'{indent}names{k} = cms.vstring("a", "b(", \'c\')')
+    return params
+
+
+def _module_body(spec, rng, labels, unknown):
+    """Parameter lines of one module whose dependencies have the given labels."""
+    lines = _simple_params(rng, "    ", rng.randrange(2, 7))
+    singles = []
+    vector = []
+    for label in labels:
+        if rng.random() < _UNKNOWN_FRACTION:
+            label = f"unknownModule{unknown}"
+        (vector if rng.random() < spec["vinputtag_fraction"] else singles).append(label)
+
+    nested = []
+    for k, label in enumerate(singles):
+        line = f"src{k} = cms.InputTag({_tag(label, rng)})"
+        (nested if spec["pset_depth"] and rng.random() < 0.3 else lines).append(line)
+    if vector:
+        if rng.random() < 0.5:
+            items = ", ".join(f'"{label}"' for label in vector)
+        else:
+            items = ", ".join(f"cms.InputTag({_tag(label, rng)})" for label in vector)
+        lines.append(f"    srcs = cms.VInputTag({items})")
+    lines = [line if line.startswith("    ") else f"    {line}" for line in lines]
+
+    if nested:
+        # The innermost PSet holds the nested tags, each level a few params
+        block = None
+        for depth in range(spec["pset_depth"], 0, -1):
+            indent = "    " * (depth + 1)
+            inner = _simple_params(rng, indent, 2)
+            if block is None:
+                inner += [f"{indent}{line}" for line in nested]
+            else:
+                inner.append(f"{indent}{block}")
+            closing = "    " * depth
+            block = f"level{depth} = cms.PSet(\n" + ",\n".join(inner) + f"\n{closing})"
+        lines.append(f"    {block}")
+    return lines
+
+
+def _write_config(path, spec, modules, deps, path_of, rng):
+    num_es = int(spec["modules"] * spec["es_fraction"])
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('import FWCore.ParameterSet.Config as cms\n\nprocess = cms.Process("RECO")\n\n')
+        f.write('process.source = cms.Source("PoolSource",\n'
+                '    fileNames = cms.untracked.vstring("file:input.root")\n)\n\n')
+
+        for i, (label, plugin, module_type) in enumerate(modules):
+            lines = _module_body(spec, rng, [modules[j][0] for j in deps[i]], i)
+            f.write(f'process.{label} = cms.{module_type}("{plugin}",\n' + ",\n".join(lines) + "\n)\n\n")
+            if i < num_es:
+                es_type = "ESProducer" if i % 3 else "ESSource"
+                f.write(f'process.esModule{i} = cms.{es_type}("Synthetic{es_type}",\n'
+                        f'    appendToDataLabel = cms.string(""),\n'
+                        f'    record = cms.string("Record{i % 20}")\n)\n\n')
+
+        members = {}
+        for i, p in path_of.items():
+            members.setdefault(p, []).append(i)
+        for p in range(_num_paths(spec)):
+            # A Path runs its filters after the producers they depend on
+            steps = sorted({j for i in members.get(p, []) for j in deps[i]} | set(members.get(p, [])))
+            body = "+".join(f"process.{modules[i][0]}" for i in steps[:50]) or "process.source"
+            f.write(f"process.path{p} = cms.Path({body})\n")
+        f.write("\nprocess.schedule = cms.Schedule(" +
+                ", ".join(f"process.path{p}" for p in range(_num_paths(spec))) + ")\n")
+
+
+def _write_timing(path, spec, modules):
+    # Own generator, so the DOT file and config do not depend on it
+    rng = random.Random(f"timing-{spec['seed']}")
+    entries = []
+    for label, plugin, _ in modules:
+        ms = rng.lognormvariate(0, _TIMING_SIGMA) * _TIMING_EVENTS
+        entries.append({"type": plugin, "label": label, "events": _TIMING_EVENTS,
+                        "time_thread": round(ms, 3), "time_real": round(ms * rng.uniform(1.0, 1.3), 3)})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"modules": entries}, f)
+
+
+def write_synthetic_workflow(directory, **spec):
+    """
+    Write dependency.gv, dumpConfig.py and timing.json into directory.
+
+    Args:
+        spec: Overrides of DEFAULT_SPEC
+
+    Returns:
+        (dot_path, config_path)
+    """
+    unknown = set(spec) - set(DEFAULT_SPEC)
+    if unknown:
+        raise TypeError(f"Unknown spec fields: {', '.join(sorted(unknown))}")
+    spec = {**DEFAULT_SPEC, **spec}
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(spec["seed"])
+    modules = _module_names(spec, rng)
+    deps = _dependencies(spec, rng)
+    # Each filter sits in one Path
+    path_of = {i: rng.randrange(_num_paths(spec))
+               for i, (_, _, module_type) in enumerate(modules) if module_type == "EDFilter"}
+
+    dot_path = directory / "dependency.gv"
+    config_path = directory / "dumpConfig.py"
+    _write_dot(dot_path, spec, modules, deps, path_of)
+    _write_config(config_path, spec, modules, deps, path_of, rng)
+    _write_timing(directory / "timing.json", spec, modules)
+    return dot_path, config_path
+
+
+def add_spec_arguments(parser):
+    """Add a --<field> option for every DEFAULT_SPEC field except modules."""
+    for name, default in DEFAULT_SPEC.items():
+        if name != "modules":
+            parser.add_argument(f"--{name.replace('_', '-')}", type=type(default), default=default)
+
+
+def spec_from_args(args):
+    """Spec fields set by the options of add_spec_arguments (and --modules, if any)."""
+    return {name: getattr(args, name) for name in DEFAULT_SPEC if hasattr(args, name)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic CMSSW-like workflow.")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--modules", type=int, default=DEFAULT_SPEC["modules"])
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    spec = spec_from_args(args)
+    start = time.perf_counter()
+    dot_path, config_path = write_synthetic_workflow(args.output_dir, **spec)
+    print(f"Spec: {spec}")
+    print(f"Wrote {dot_path} ({dot_path.stat().st_size / 1024 / 1024:.1f} MB) and "
+          f"{config_path} ({config_path.stat().st_size / 1024 / 1024:.1f} MB) "
+          f"in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
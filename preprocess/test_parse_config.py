@@ -0,0 +1,181 @@
+"""
+The config parser must give the records of the original one, which
+walked blocks a character at a time and ran one regex scan per kind of
+parameter, whether the file is read or memory-mapped and however many
+jobs parse it. The reference below is that parser, kept short.
+
+Run with: python -m pytest preprocess
+"""
+
+import re
+
+import pytest
+
+import parse_config
+from parse_config import (MODULE_RE, _SIMPLE_PARAM_RE, _SINGLE_TAG_RE, _limit_lines, _parse_vinput_tag,
+                          _split_tag, extract_balanced_block, find_module_spans, parse_config_file,
+                          scan_param_block)
+from synthetic import write_synthetic_workflow
+
+# 16 module headers, so that with jobs=2 (8 chunks of 2) the first chunk
+# ends at the header quoted inside the block of withFake, which goes on
+# past it. Strings hold brackets, escaped and mismatched quotes, and
+# assignments that overlap their own.
+TRICKY_CONFIG = r'''import FWCore.ParameterSet.Config as cms
+
+process = cms.Process("TEST")
+
+process.m00 = cms.EDProducer("Plain",
+    src = cms.InputTag("gen"),
+    n = cms.int32(3)
+)
+process.withFake = cms.EDProducer("WithFake",
+    note = cms.string("process.fake = cms.EDProducer('Fake')"),
+    after = cms.InputTag("afterFake", "inst"),
+    deep = cms.PSet(
+        tags = cms.VInputTag(cms.InputTag("x:y:z"), cms.InputTag("w")),
+        more = cms.PSet(cut = cms.double(0.5))
+    )
+)
+process.quoted = cms.EDFilter("Quoted",
+    label = cms.string("a)b(c"),
+    other = cms.string('it\'s (fine)'),
+    mixed = cms.string("one'two'three"),
+    braces = cms.string("{[}"),
+    accent = cms.string("café ünïcode"),
+    overlap = cms.string("t = cms.int32(5)"),
+    src = cms.InputTag("quotedSrc:inst:HLT")
+)
+process.strings = cms.EDAnalyzer("Strings",
+    srcs = cms.VInputTag("a", "b:c", 'd:e:f'),
+    flag = cms.untracked.bool(True)
+)
+process.noBlock = cms.ESProducer("NoBlock")
+process.odd = cms.EDProducer("Odd" + "Suffix",
+    src = cms.InputTag("odd")
+)
+''' + "".join(f'''process.m{i:02d} = cms.EDProducer("Plain{i}",
+    src = cms.InputTag("m{i - 1:02d}", "", "RECO"),
+    srcs = cms.VInputTag(cms.InputTag("m00"), "withFake:inst"),
+    label = cms.string("{{{i}}}")
+)
+''' for i in range(7, 15)) + r'''process.last = cms.EDProducer("Last",
+    src = cms.InputTag("m14"),
+    broken = cms.string("never closed)
+'''
+
+
+def _reference_block(text, start_pos):
+    """The original character scanner: either quote toggles a string."""
+    open_char = text[start_pos]
+    close_char = {'(': ')', '{': '}'}.get(open_char)
+    if close_char is None:
+        return "", start_pos
+    depth = 0
+    in_string = False
+    escape_next = False
+    for i in range(start_pos, len(text)):
+        char = text[i]
+        if escape_next:
+            escape_next = False
+        elif char == '\\':
+            escape_next = True
+        elif char in ('"', "'"):
+            in_string = not in_string
+        elif not in_string and char == open_char:
+            depth += 1
+        elif not in_string and char == close_char:
+            depth -= 1
+            if depth == 0:
+                return text[start_pos:i], i
+    return text[start_pos:], len(text)
+
+
+def _reference_scan(block):
+    """One scan per kind: single tags, then VInputTags, then simple parameters."""
+    tags = []
+    for match in _SINGLE_TAG_RE.finditer(block):
+        field, tag_type, module, instance, process = match.groups()
+        module, instance, process = _split_tag(module, instance or "", process or "")
+        tags.append({"field": field, "type": tag_type, "module": module,
+                     "instance": instance, "process": process})
+    for match in re.finditer(r'(\w+)\s*=\s*cms\.VInputTag\s*\(', block):
+        content, _ = _reference_block(block, match.end() - 1)
+        tags.extend(_parse_vinput_tag(match.group(1), content))
+    params = {}
+    for match in _SIMPLE_PARAM_RE.finditer(block):
+        params[match.group(1)] = {"type": match.group(2), "value": match.group(3).strip().strip('"\'')}
+    return tags, params
+
+
+def _reference_parse(content, max_snippet_lines=50):
+    modules = {}
+    for match in MODULE_RE.finditer(content):
+        if match.end() >= len(content) or content[match.end()] not in (',', ')'):
+            continue
+        block, block_end = _reference_block(content, content.find('(', match.start()))
+        tags, params = _reference_scan(block)
+        modules[match.group(1)] = {
+            "type": match.group(2),
+            "plugin": match.group(3),
+            "parameters": params,
+            "inputTags": tags,
+            "rawSnippet": _limit_lines(content[match.start():block_end + 1], max_snippet_lines),
+        }
+    return modules
+
+
+@pytest.fixture
+def tricky_config(tmp_path):
+    path = tmp_path / "dumpConfig.py"
+    path.write_text(TRICKY_CONFIG, encoding="utf-8")
+    return path
+
+
+def test_balanced_block_matches_character_scanner():
+    texts = [TRICKY_CONFIG, "{a = '}' {b}} tail", "(unclosed 'string ( )", "(esc\\) \\( (x))", "{\"}\" '{' }",
+             # Either quote closes either, so these strings end early
+             "(x = \"a'(b\" ) tail", "{y = 'a\"{b' } tail"]
+    for text in texts:
+        for match in re.finditer(r'[({]', text):
+            assert extract_balanced_block(text, match.start()) == _reference_block(text, match.start())
+
+
+def test_scan_param_block_matches_separate_scans(tmp_path):
+    _, config_path = write_synthetic_workflow(tmp_path, modules=300)
+    for text in (TRICKY_CONFIG, config_path.read_text(encoding="utf-8")):
+        for match in MODULE_RE.finditer(text):
+            block, _ = _reference_block(text, text.find('(', match.start()))
+            assert scan_param_block(block) == _reference_scan(block)
+
+
+def test_chunk_boundary_falls_inside_a_block():
+    spans = find_module_spans(TRICKY_CONFIG)
+    assert len(spans) == 16
+    assert [span[2] for span in spans[1:3]] == ["withFake", "fake"]
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_tricky_config_matches_reference(tricky_config, jobs, mapped):
+    modules = parse_config_file(tricky_config, jobs=jobs, mapped=mapped)
+    assert modules == _reference_parse(TRICKY_CONFIG)
+    # Parsed past the quoted header that ends the first chunk
+    assert [tag["module"] for tag in modules["withFake"]["inputTags"]] == ["afterFake", "x", "w"]
+    assert modules["quoted"]["parameters"]["accent"]["value"] == "café ünïcode"
+    assert "odd" not in modules
+
+
+@pytest.mark.parametrize("mapped", [False, True])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_synthetic_config_matches_reference(tmp_path, monkeypatch, jobs, mapped):
+    _, config_path = write_synthetic_workflow(tmp_path, modules=2000)
+    # Small windows, so module headers cross the mapped search windows
+    monkeypatch.setattr(parse_config, "RELEASE_BYTES", 4096)
+    monkeypatch.setattr(parse_config, "HEADER_OVERLAP", 128)
+    sequences = {}
+    modules = parse_config_file(config_path, max_snippet_lines=5, jobs=jobs, mapped=mapped, sequences=sequences)
+    content = config_path.read_text(encoding="utf-8")
+    assert len(modules) >= 2000
+    assert modules == _reference_parse(content, max_snippet_lines=5)
+    assert sequences == parse_config.find_sequences(content)
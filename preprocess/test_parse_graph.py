@@ -0,0 +1,101 @@
+"""
+The built-in DOT reader must give the same graph as pydot, which it
+replaced: on the reference dependency.gv, on a synthetic workflow with
+Paths, and on DOT the dumper does not write but Graphviz accepts
+(quoted brackets and braces, statements, strings and comments spanning
+lines), which goes through the general tokenizer instead of the
+one-line fast paths.
+
+Run with: python -m pytest preprocess
+"""
+
+from pathlib import Path
+
+import pytest
+
+from parse_graph import iter_dot, parse_dot_file
+from synthetic import write_synthetic_workflow
+
+REFERENCE_DOT = Path(__file__).resolve().parent.parent / "dependency.gv"
+
+# Attribute values with the characters that end a list or open a block,
+# and statements split over lines
+TRICKY_DOT = r'''digraph "odd graph" {
+graph [label="process TEST", labelloc=top];
+/* a comment
+   spanning lines, with ] and { in it */
+subgraph p1 {
+graph [
+label="Path p1", labelloc=bottom];
+1[color=black, label="a]b", shape=box];
+2[label="x{y}z", tooltip="[not, a=list]"];
+}
+subgraph p2 { graph [label="EndPath p2"]; 3[label=three]; }
+1[label="a]b", tooltip="second
+line"];
+2[label="x{y}z", tooltip="[not, a=list]"]; 3 [label = three,
+  shape="box"]
+4 // trailing comment
+  [label="semi;colon", style="dashed"];
+5[label=<<b>html <i>label</i></b>>];
+1 -> 2[label="edge ]"];
+2 -> 3 -> 4 [style="dotted"];
+3 -> 5;
+5
+  -> 1 [comment="multi
+line {edge}"];
+}
+'''
+
+
+def _parse_both(path):
+    pytest.importorskip("pydot")
+    return parse_dot_file(path).to_dict(), parse_dot_file(path, use_pydot=True).to_dict()
+
+
+@pytest.mark.skipif(not REFERENCE_DOT.exists(), reason="no reference dependency.gv")
+def test_reference_graph_matches_pydot():
+    streaming, reference = _parse_both(REFERENCE_DOT)
+    assert len(streaming["nodes"]) > 1000
+    assert streaming == reference
+
+
+def test_synthetic_workflow_matches_pydot(tmp_path):
+    dot_path, _ = write_synthetic_workflow(tmp_path, modules=200, paths=10)
+    streaming, reference = _parse_both(dot_path)
+    assert streaming["paths"]
+    assert streaming == reference
+
+
+def test_tricky_dot_matches_pydot(tmp_path):
+    dot_path = tmp_path / "tricky.gv"
+    dot_path.write_text(TRICKY_DOT, encoding="utf-8")
+    streaming, reference = _parse_both(dot_path)
+    assert streaming == reference
+
+    labels = {node["id"]: node["label"] for node in streaming["nodes"]}
+    assert labels == {"1": "a]b", "2": "x{y}z", "3": "three", "4": "semi;colon",
+                      "5": "<<b>html <i>label</i></b>>"}
+    assert len(streaming["edges"]) == 5
+    assert [(path["type"], path["name"]) for path in streaming["paths"]] == [("Path", "p1"), ("EndPath", "p2")]
+
+
+def test_events_keep_raw_tokens_and_depth(tmp_path):
+    dot_path = tmp_path / "tricky.gv"
+    dot_path.write_text(TRICKY_DOT, encoding="utf-8")
+    events = list(iter_dot(dot_path))
+
+    assert events[0] == ("graph", "digraph", '"odd graph"')
+    assert ("subgraph", "p1", 0) in events and ("end_subgraph", "p1", 0) in events
+    nodes = [event for event in events if event[0] == "node"]
+    assert nodes[0] == ("node", "1", {"color": "black", "label": '"a]b"', "shape": "box"}, 1)
+    assert ("node", "1", {"label": '"a]b"', "tooltip": '"second\nline"'}, 0) in nodes
+    edges = [event[1:3] for event in events if event[0] == "edge"]
+    assert edges == [("1", "2"), ("2", "3"), ("3", "4"), ("3", "5"), ("5", "1")]
+
+
+def test_unterminated_string_is_an_error(tmp_path):
+    dot_path = tmp_path / "broken.gv"
+    dot_path.write_text('digraph {\n1[label="open];\n}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="Unterminated string"):
+        parse_dot_file(dot_path)
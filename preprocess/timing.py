@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Per-module timing: ingest a timing report and find where the time goes.
+
+Two report formats are read (see parse_timing_report):
+- the JSON summary of the FastTimerService (writeJSONSummary), whose
+  "modules" list gives each module's total thread or real time in ms and
+  the number of events, or a plain {label: ms per event} JSON object
+- the "Module Summary" table of the TimeReport printed by cmsRun
+  (wantSummary), in seconds per event
+
+Times are joined to the graph by module label. On the DAG of the graph
+(cycles collapsed, see reachability.condensation), with each module
+running after the modules it depends on, analyze_timing computes:
+- the critical path: the chain of dependencies with the largest total
+  time, which bounds the time per event however many threads run
+- each module's slack: how much longer it could take without making the
+  critical path longer
+- the total time of the modules each Path lists, and the exclusive time
+  of those listed by no other Path
+All of it is linear in the size of the graph.
+
+Usage:
+    python timing.py <dependency.gv> <dumpConfig.py> <timing report>
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+
+from reachability import condensation
+
+# FastTimerService columns: CPU time of the module's threads, or wall time
+TIME_METRICS = ("time_thread", "time_real")
+
+# Critical-path modules and Paths listed by the CLI
+TOP_MODULES = 20
+TOP_PATHS = 20
+
+_TIME_REPORT_ROW = re.compile(r"^TimeReport\s+([-+\d.eE]+)\s+([-+\d.eE]+)\s+([-+\d.eE]+)\s+(\S+)\s*$")
+
+
+def _parse_fast_timer(data, metric):
+    times = {}
+    for entry in data["modules"]:
+        label = entry.get("label")
+        if not label or metric not in entry:
+            continue
+        events = entry.get("events") or 1
+        # A label can appear once per module type; its times add up
+        times[label] = times.get(label, 0.0) + float(entry[metric]) / events
+    return times
+
+
+def _parse_time_report(text):
+    times = {}
+    in_summary = False
+    for line in text.splitlines():
+        if "Module Summary" in line:
+            in_summary = True
+            continue
+        if not in_summary:
+            continue
+        match = _TIME_REPORT_ROW.match(line)
+        if match:
+            # per event, per exec, per visit (seconds), name
+            times[match.group(4)] = float(match.group(1)) * 1000
+        elif line.startswith("TimeReport") and "----" in line:
+            in_summary = False
+    return times
+
+
+def parse_timing_report(path, metric="time_thread"):
+    """
+    Read a FastTimerService JSON summary, a {label: ms} JSON object or a
+    TimeReport log.
+
+    Args:
+        metric: FastTimerService column, one of TIME_METRICS
+
+    Returns:
+        dict mapping module label -> ms per event
+
+    Raises:
+        ValueError: If the file holds no module times
+    """
+    text = Path(path).read_text(encoding="utf-8", errors="replace")
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+
+    if isinstance(data, dict) and isinstance(data.get("modules"), list):
+        times = _parse_fast_timer(data, metric)
+    elif isinstance(data, dict):
+        times = {label: float(ms) for label, ms in data.items() if isinstance(ms, (int, float))}
+    else:
+        times = _parse_time_report(text)
+
+    if not times:
+        raise ValueError(f"No module times found in {path}")
+    return times
+
+
+def _round(ms):
+    return round(ms, 4)
+
+
+def analyze_timing(graph, times, paths=(), source=None):
+    """
+    Critical path, slack and per-Path time of a graph.
+
+    Args:
+        graph: parse_dot_file GraphModel (edges consumer -> dependency)
+        times: parse_timing_report output, label -> ms per event
+        paths: coarsen.path_membership output, for the per-Path times
+        source: Name of the report, recorded in the result
+
+    Returns:
+        JSON-serializable dict: "time" and "slack" per node (in node
+        order, ms), "criticalPath" {"time", "nodes" (IDs, dependencies
+        first)}, "paths" [{"name", "type", "modules", "total",
+        "exclusive"}] by decreasing total, and "total", "matched",
+        "unmatched" (report labels not in the graph)
+    """
+    node_time = [float(times.get(label, 0.0)) for label in graph.labels]
+
+    component, num_components, down, up = condensation(graph.nodes, graph.edges)
+    cost = [0.0] * num_components
+    for i, comp in enumerate(component):
+        cost[comp] += node_time[i]
+
+    # Edges go from consumers (lower ids) to dependencies (higher ids):
+    # finish times from the last component back, latest finishes forwards
+    finish = [0.0] * num_components
+    for comp in range(num_components - 1, -1, -1):
+        finish[comp] = cost[comp] + max((finish[dep] for dep in down[comp]), default=0.0)
+    length = max(finish, default=0.0)
+
+    latest = [length] * num_components
+    for comp in range(num_components):
+        for consumer in up[comp]:
+            latest[comp] = min(latest[comp], latest[consumer] - cost[consumer])
+
+    chain = []
+    if num_components:
+        comp = max(range(num_components), key=finish.__getitem__)
+        while comp is not None:
+            chain.append(comp)
+            comp = max(down[comp], key=finish.__getitem__, default=None)
+    members = {comp: [] for comp in chain}
+    for i, comp in enumerate(component):
+        if comp in members:
+            members[comp].append(graph.ids[i])
+    chain_nodes = [node_id for comp in reversed(chain) for node_id in members[comp]]
+
+    # Members deduplicated in listing order, not set order: float sums
+    # depend on the order of their terms, and the bundle must not
+    listed_by = {}
+    for path in paths:
+        for label in dict.fromkeys(path["members"]):
+            listed_by[label] = listed_by.get(label, 0) + 1
+    path_times = []
+    for path in paths:
+        labels = dict.fromkeys(path["members"])
+        path_times.append({
+            "name": path["name"],
+            "type": path["type"],
+            "modules": len(labels),
+            "total": _round(sum(times.get(label, 0.0) for label in labels)),
+            "exclusive": _round(sum(times.get(label, 0.0) for label in labels if listed_by[label] == 1)),
+        })
+    path_times.sort(key=lambda path: path["total"], reverse=True)
+
+    labels = set(graph.labels)
+    unmatched = sorted(label for label in times if label not in labels)
+    return {
+        "source": source,
+        "unit": "ms/event",
+        "total": _round(sum(node_time)),
+        "matched": len(times) - len(unmatched),
+        "unmatched": unmatched,
+        "time": [_round(t) for t in node_time],
+        "slack": [_round(max(0.0, latest[comp] - finish[comp])) for comp in component],
+        "criticalPath": {"time": _round(length), "nodes": chain_nodes},
+        "paths": path_times,
+    }
+
+
+def main():
+    from parse_graph import parse_dot_file
+    from parse_config import parse_config_file
+    from coarsen import path_membership
+
+    if len(sys.argv) < 4:
+        print("Usage: python timing.py <dependency.gv> <dumpConfig.py> <timing report>")
+        sys.exit(1)
+
+    graph = parse_dot_file(Path(sys.argv[1]))
+    sequences = {}
+    parse_config_file(Path(sys.argv[2]), sequences=sequences)
+    times = parse_timing_report(sys.argv[3])
+    timing = analyze_timing(graph, times, path_membership(sequences, graph.paths),
+                            source=Path(sys.argv[3]).name)
+
+    print(f"\n{timing['matched']:,} of {len(times):,} timed modules in the graph, "
+          f"{timing['total']:.2f} ms/event in total")
+    critical = timing["criticalPath"]
+    print(f"Critical path: {critical['time']:.2f} ms/event over {len(critical['nodes'])} modules "
+          f"({100 * critical['time'] / max(timing['total'], 1e-9):.0f}% of the total)")
+    index = {node_id: i for i, node_id in enumerate(graph.ids)}
+    on_path = sorted(critical["nodes"], key=lambda node_id: timing["time"][index[node_id]], reverse=True)
+    for node_id in on_path[:TOP_MODULES]:
+        print(f"  {timing['time'][index[node_id]]:>10.3f} ms  {graph.labels[index[node_id]]}")
+
+    print(f"\n{'Path':<40}{'modules':>8}{'total (ms)':>12}{'exclusive':>12}")
+    for path in timing["paths"][:TOP_PATHS]:
+        print(f"{path['name'][:39]:<40}{path['modules']:>8}{path['total']:>12.2f}{path['exclusive']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Wasted work: modules whose products nothing useful ever consumes.
+
+A module does useful work when its products reach an OutputModule, an
+EDAnalyzer or an EDFilter on a Path (the sinks), through the edges of
+the DOT file or the InputTags resolved by validate_and_enrich_input_tags.
+analyze_wasted_work finds:
+- the wasted modules: those from which no chain of consumers leads to a
+  sink, so dropping them changes no output
+- for every other module, the modules that become wasted too once it is
+  dropped: exactly those it dominates, i.e. every chain from a sink down
+  to them passes through it
+
+Cycles are collapsed first (see reachability.condensation). The
+modules that reach a sink are found in one pass over the graph. The
+dominator tree is built in one more pass in topological order: on a DAG
+each module's immediate dominator is the nearest common dominator of
+its consumers (Cooper, Harvey and Kennedy), found by walking up the
+tree. With module times (see timing.py) the CPU time that each drop
+saves is ranked too.
+
+Usage:
+    python wasted_work.py <dependency.gv> <dumpConfig.py> [--timing report] [--drop label]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from graph_model import edge_index_pairs
+from reachability import condense_pairs
+
+# Module types whose products are the point of the job
+SINK_TYPES = ("OutputModule", "EDAnalyzer")
+
+# Filters count as sinks when on a Path (their decision is the result)
+FILTER_TYPE = "EDFilter"
+
+# Modules listed in the report, for each ranking
+TOP_MODULES = 20
+
+
+def dependency_pairs(graph, modules):
+    """
+    DOT edges plus the edges of resolved InputTags, consumer -> dependency,
+    as (source, target) node indices.
+
+    Args:
+        modules: Module records with InputTags validated against the graph
+    """
+    label_to_id = graph.label_to_id
+    index = graph.index
+    pairs = edge_index_pairs(graph.nodes, graph.edges)
+    for name, module in modules.items():
+        source = label_to_id.get(name)
+        if source is None:
+            continue
+        for tag in module.get("inputTags", []):
+            if tag.get("found") and tag.get("targetId") not in (None, source):
+                pairs.append((index[source], index[tag["targetId"]]))
+    return pairs
+
+
+def find_sinks(graph, modules, paths):
+    """
+    Node indices of the OutputModules, EDAnalyzers and EDFilters on a Path.
+
+    Args:
+        paths: coarsen.path_membership output
+    """
+    on_path = {label for path in paths for label in path["members"]}
+    sinks = []
+    for i, label in enumerate(graph.labels):
+        module_type = modules.get(label, {}).get("type")
+        if module_type in SINK_TYPES or module_type == FILTER_TYPE and label in on_path:
+            sinks.append(i)
+    return sinks
+
+
+def analyze_wasted_work(graph, modules, paths=(), times=None):
+    """
+    Wasted modules and what dropping each module makes removable.
+
+    Args:
+        graph: parse_dot_file GraphModel
+        modules: Module records, InputTags validated against the graph
+        paths: coarsen.path_membership output
+        times: Optional ms per event of each node, in node order
+
+    Returns:
+        JSON-serializable dict with, per node in node order, "wasted"
+        (0/1), "dominator" (index of the node whose drop makes this one
+        removable too, -1 when only dropping the module itself does, or
+        when wasted) and "removable" (modules removable once it is
+        dropped, itself included; 0 when wasted). With times also
+        "removableTime" per node and "wastedTime". Plus "sinks" and
+        "wastedCount".
+    """
+    component, num_components, down, up = condense_pairs(len(graph.ids), dependency_pairs(graph, modules))
+    members = [[] for _ in range(num_components)]
+    for i, comp in enumerate(component):
+        members[comp].append(i)
+
+    sinks = find_sinks(graph, modules, paths)
+    sink_components = {component[i] for i in sinks}
+
+    # Useful components: those reachable from a sink along the edges.
+    # Consumers have lower ids, so one ascending pass settles them all
+    useful = [False] * num_components
+    for comp in range(num_components):
+        if comp in sink_components or any(useful[consumer] for consumer in up[comp]):
+            useful[comp] = True
+
+    # Dominator tree over the useful components, rooted at a virtual
+    # node (ROOT) standing for all sinks. Ids ascend topologically, so a
+    # dominator always has a lower id than the components it dominates
+    ROOT = -1
+    idom = [None] * num_components
+
+    def intersect(a, b):
+        while a != b:
+            while a > b:
+                a = idom[a]
+            while b > a:
+                b = idom[b]
+        return a
+
+    for comp in range(num_components):
+        if not useful[comp]:
+            continue
+        if comp in sink_components:
+            idom[comp] = ROOT
+            continue
+        dominator = None
+        for consumer in up[comp]:
+            if useful[consumer]:
+                dominator = consumer if dominator is None else intersect(dominator, consumer)
+                if dominator == ROOT:
+                    break
+        idom[comp] = dominator
+
+    # Subtree sums, children (higher ids) before their dominators
+    removable = [len(members[comp]) if useful[comp] else 0 for comp in range(num_components)]
+    comp_time = None
+    if times is not None:
+        comp_time = [sum(times[i] for i in members[comp]) if useful[comp] else 0.0
+                     for comp in range(num_components)]
+    for comp in range(num_components - 1, -1, -1):
+        parent = idom[comp]
+        if parent is not None and parent != ROOT:
+            removable[parent] += removable[comp]
+            if comp_time is not None:
+                comp_time[parent] += comp_time[comp]
+
+    # Nodes of a cycle stand and fall together: their first member represents them
+    def node_dominator(comp):
+        parent = idom[comp]
+        return members[parent][0] if parent is not None and parent != ROOT else -1
+
+    wasted = [0 if useful[comp] else 1 for comp in component]
+    result = {
+        "sinks": len(sinks),
+        "wastedCount": sum(wasted),
+        "wasted": wasted,
+        "dominator": [node_dominator(comp) if members[comp][0] == i else members[comp][0]
+                      for i, comp in enumerate(component)],
+        "removable": [removable[comp] for comp in component],
+    }
+    if times is not None:
+        result["wastedTime"] = round(sum(t for t, w in zip(times, wasted) if w), 4)
+        result["removableTime"] = [round(comp_time[comp], 4) for comp in component]
+    return result
+
+
+def removable_set(analysis, index):
+    """
+    Node indices removable once node index is dropped, itself first:
+    its subtree in the dominator tree.
+    """
+    children = {}
+    for i, dominator in enumerate(analysis["dominator"]):
+        if dominator >= 0:
+            children.setdefault(dominator, []).append(i)
+    result = [index]
+    for i in result:
+        result.extend(children.get(i, []))
+    return result
+
+
+def main():
+    from parse_graph import parse_dot_file
+    from parse_config import parse_config_file
+    from coarsen import path_membership
+    from build_bundle import validate_and_enrich_input_tags
+    from timing import parse_timing_report
+
+    parser = argparse.ArgumentParser(description="Find modules whose products are never used.")
+    parser.add_argument("dot_file", type=Path)
+    parser.add_argument("config_file", type=Path)
+    parser.add_argument("--timing", type=Path, help="timing report, to rank the CPU time saved")
+    parser.add_argument("--drop", action="append", default=[], metavar="LABEL",
+                        help="list the modules removable once this one is dropped")
+    parser.add_argument("--json", type=Path, help="also write the analysis to this file")
+    args = parser.parse_args()
+
+    graph = parse_dot_file(args.dot_file)
+    sequences = {}
+    modules = parse_config_file(args.config_file, sequences=sequences)
+    modules = validate_and_enrich_input_tags(modules, graph.label_to_id)
+    times = None
+    if args.timing:
+        timing = parse_timing_report(args.timing)
+        times = [timing.get(label, 0.0) for label in graph.labels]
+
+    analysis = analyze_wasted_work(graph, modules, path_membership(sequences, graph.paths), times)
+    nodes = graph.nodes
+    label = graph.labels.__getitem__
+
+    print(f"\n{analysis['sinks']:,} sinks (OutputModules, EDAnalyzers, EDFilters on a Path)")
+    print(f"{analysis['wastedCount']:,} of {len(nodes):,} modules are wasted work", end="")
+    print(f", {analysis['wastedTime']:.2f} ms/event" if times else "")
+    wasted = [i for i, w in enumerate(analysis["wasted"]) if w]
+    if times:
+        wasted.sort(key=lambda i: times[i], reverse=True)
+    for i in wasted[:TOP_MODULES]:
+        print(f"  {times[i]:>10.3f} ms  {label(i)}" if times else f"  {label(i)}")
+
+    key = "removableTime" if times else "removable"
+    ranked = sorted(range(len(nodes)), key=lambda i: analysis[key][i], reverse=True)
+    print(f"\nModules whose drop saves the most {'CPU time' if times else 'modules'} (themselves included):")
+    for i in ranked[:TOP_MODULES]:
+        if not analysis["removable"][i]:
+            break
+        saved = f"{analysis['removableTime'][i]:>10.3f} ms  " if times else ""
+        print(f"  {saved}{analysis['removable'][i]:>6} modules  {label(i)}")
+
+    index = {label(i): i for i in range(len(nodes))}
+    for name in args.drop:
+        if name not in index:
+            print(f"\nUnknown module: {name}")
+            continue
+        i = index[name]
+        if analysis["wasted"][i]:
+            print(f"\n{name} is wasted work already")
+            continue
+        removed = removable_set(analysis, i)
+        print(f"\nDropping {name} makes {len(removed) - 1} more modules removable:")
+        for j in removed[1:]:
+            print(f"  {label(j)}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(analysis, f)
+        print(f"\nAnalysis: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
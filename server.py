@@ -3,30 +3,1111 @@
 Simple HTTP server for the CMSSW Graph Visualization app.
 Serves static files with proper CORS headers for local development.
 Handles file uploads and bundle regeneration.
+
+Uploads are streamed to disk and rebuilt by an in-process job queue;
+GET /jobs/<id> reports per-stage progress. /api/ego and /api/deps answer
+neighborhood queries from an adjacency index of the bundle,
+/api/module/<name> serves module details split out of the bundle, and
+/api/search?q= queries the module search index and /api/delta?from=
+sends the patch from an earlier build to the current one.
+/api/simulate?threads=&streams= predicts throughput against the number
+of threads from the module times of a bundle built with --timing. Requests are
+handled in threads. Generated bundle files under /data/ are
+kept in memory, reloaded when they change on disk, served with strong
+ETag/Last-Modified validators (304 on revalidation) and, when the client
+accepts it, from the .br/.gz variants written by build_bundle.py.
+
+Besides the default bundle in data/, every data/<name>/ directory with a
+bundle is served as /data/<name>/... and queried with ?bundle=<name>;
+/api/bundles lists them. Loaded files and query indexes share one LRU
+cache under a memory ceiling (--cache-mb), whose hit, miss and eviction
+counts are reported by /api/bundles.
+
+/metrics exposes request counts, latency histograms and bytes sent per
+route, rebuild outcomes and durations, and the cache state in the
+Prometheus text format.
+
+With --watch, the inputs of every bundle (dependency.gv and dumpConfig.py
+in the project root or in data/<name>/) are polled and rebuilt once they
+stop changing. GET /events is a Server-Sent Events stream that tells open
+apps when a rebuild starts and finishes, so they update without polling.
 """
 
+import argparse
 import http.server
-import socketserver
+import email.utils
+import hashlib
+import threading
 import os
+import re
+import shutil
 import sys
 import json
-import subprocess
+import queue
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from urllib.parse import parse_qs
-import cgi
+from urllib.parse import parse_qs, unquote, urlsplit
+
+
+# Generated files served from memory
+CACHED_PREFIX = '/data/'
+CACHED_SUFFIXES = ('.json', '.bin', '.ndjson')
+
+# Precompressed variant suffix -> Content-Encoding, in preference order
+ENCODINGS = (('.br', 'br'), ('.gz', 'gzip'))
+
+# build_bundle and friends are imported in-process by the rebuild jobs
+sys.path.insert(0, str(Path(__file__).parent / 'preprocess'))
+
+from graph_index import GraphIndex, DIRECTIONS
+from search_index import SearchIndex
+from simulate import Scheduler, DEFAULT_THREADS, parse_thread_counts
+
+# Bundle files the query API indexes, in order of preference
+INDEXED_BUNDLES = ('bundle.bin', 'bundle.json')
+
+# Bundle drawn while it downloads (see preprocess/stream_bundle.py)
+STREAM_BUNDLE = 'bundle.ndjson'
+
+# Module records split out of the bundle (see preprocess/module_details.py)
+MODULE_DETAILS = 'bundle_modules.json'
+
+# Module search index (see preprocess/search_index.py)
+SEARCH_INDEX = 'bundle_search.json'
+
+# Hashes and delta patches of recent builds (see preprocess/diff_bundles.py)
+VERSIONS_DIR = 'bundle_versions'
+CONTENT_HASH = re.compile(r'^[0-9a-f]{32}$')
+
+# Upper bound for the radius/depth of graph queries
+MAX_QUERY_DEPTH = 20
+
+# Upper bounds for /api/simulate: threads or streams of one run, streams
+# summed over the runs of a request (1,2,4,...,64 is 127), and events
+MAX_SIMULATED_THREADS = 256
+MAX_SIMULATED_STREAMS = 512
+MAX_SIMULATED_EVENTS = 4096
+
+# Names of bundles in data/<name>/
+BUNDLE_NAME = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_.-]*$')
+
+# Default memory ceiling of the shared cache
+DEFAULT_CACHE_MB = 1024
+
+# Inputs of a bundle, watched with --watch
+WATCHED_INPUTS = ('dependency.gv', 'dumpConfig.py')
+
+# Seconds the inputs must stay unchanged before a --watch rebuild, and
+# between two polls of their modification times
+DEFAULT_DEBOUNCE = 2.0
+WATCH_INTERVAL = 0.5
+
+# Seconds between keepalive comments on an idle /events stream
+EVENTS_KEEPALIVE = 15
+
+
+class MemoryLRU:
+    """
+    Least-recently-used cache of values with a size in bytes, evicted
+    once their total exceeds max_bytes. Values larger than the ceiling
+    are returned to the caller but not kept.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, valid=None, count=True):
+        """
+        Return the value for key (marking it recently used), or None.
+
+        Args:
+            valid: Optional predicate; a value failing it counts as a miss
+            count: Whether to record the lookup as a hit or miss
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or (valid is not None and not valid(item[0])):
+                self.misses += count
+                return None
+            self._entries.move_to_end(key)
+            self.hits += count
+            return item[0]
+
+    def put(self, key, value, size):
+        """Store value, evicting the least recently used entries to make room."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            while self._entries and self._bytes + size > self.max_bytes:
+                evicted, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+                print(f"Evicted {evicted[1]} ({evicted[0]}, {evicted_size / 1024 / 1024:.1f} MB) from the cache")
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+    def discard(self, key):
+        with self._lock:
+            item = self._entries.pop(key, None)
+            if item is not None:
+                self._bytes -= item[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def contains(self, predicate):
+        """True if some key satisfies predicate (without touching recency)."""
+        with self._lock:
+            return any(predicate(key) for key in self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'maxBytes': self.max_bytes,
+                'bytes': self._bytes,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+class BundleCache:
+    """
+    In-memory copies of generated bundle files.
+
+    Entries are keyed by file path and reloaded whenever the file or one
+    of its compressed variants changes (mtime/size), so a rebuild is
+    picked up on the next request. They live in a MemoryLRU shared with
+    the values derived from them.
+    """
+
+    def __init__(self, lru):
+        self.lru = lru
+
+    @staticmethod
+    def _signature(path):
+        """Stat signature of a file and its variants, or None if it is missing."""
+        signature = []
+        for suffix in ('',) + tuple(suffix for suffix, _ in ENCODINGS):
+            try:
+                st = os.stat(path + suffix)
+            except OSError:
+                if not suffix:
+                    return None
+                signature.append(None)
+                continue
+            signature.append((st.st_mtime_ns, st.st_size))
+        return tuple(signature)
+
+    def get(self, path):
+        """Return the cached entry for path, loading it if needed, or None."""
+        key = ('file', path)
+        signature = self._signature(path)
+        if signature is None:
+            self.lru.discard(key)
+            return None
+        entry = self.lru.get(key, valid=lambda cached: cached['signature'] == signature)
+        if entry is not None:
+            return entry
+
+        entry = self._load(path, signature)
+        self.lru.put(key, entry, sum(len(data) for data in entry['variants'].values()))
+        return entry
+
+    def invalidate(self):
+        """Drop every cached file and derived value."""
+        self.lru.clear()
+
+    @staticmethod
+    def _load(path, signature):
+        with open(path, 'rb') as f:
+            data = f.read()
+        mtime_ns = signature[0][0]
+
+        variants = {'identity': data}
+        for (suffix, encoding), variant_signature in zip(ENCODINGS, signature[1:]):
+            # Variants older than the file are left over from an earlier build
+            if variant_signature is None or variant_signature[0] < mtime_ns:
+                continue
+            try:
+                with open(path + suffix, 'rb') as f:
+                    variants[encoding] = f.read()
+            except OSError:
+                continue
+
+        mtime = mtime_ns // 1_000_000_000
+        return {
+            'signature': signature,
+            'etag': hashlib.blake2b(data, digest_size=16).hexdigest(),
+            'mtime': mtime,
+            'last_modified': email.utils.formatdate(mtime, usegmt=True),
+            'variants': variants,
+        }
+
+
+class DerivedFailure:
+    """A ValueError from building a derived value, cached in its place."""
+
+    __slots__ = ('message',)
+
+    def __init__(self, message):
+        self.message = message
+
+
+class DerivedCache:
+    """
+    Values derived from a generated file (e.g. a parsed index), one per
+    data directory, rebuilt from the in-memory copy in a BundleCache
+    whenever the file changes and kept in the same MemoryLRU.
+
+    A file the value cannot be built from (build raises ValueError, e.g.
+    a bundle without timing for the scheduler) is remembered as such
+    until it changes, so repeated requests fail without re-parsing it.
+    """
+
+    def __init__(self, bundle_cache, kind, names, build, size_factor):
+        """
+        Args:
+            kind: Name of the derived value, part of the cache key
+            names: Candidate file names in the data directory, in order of preference
+            build: Callable turning the file contents (bytes) into the value
+            size_factor: Estimated size of the value per byte of the file,
+                charged against the memory ceiling
+        """
+        self.bundle_cache = bundle_cache
+        self.kind = kind
+        self.names = names
+        self.build = build
+        self.size_factor = size_factor
+        self._lock = threading.Lock()
+
+    def get(self, data_dir):
+        """Return the value for the first existing file in data_dir, or None."""
+        for name in self.names:
+            path = os.path.join(data_dir, name)
+            entry = self.bundle_cache.get(path)
+            if entry is not None:
+                break
+        else:
+            return None
+
+        key = (self.kind, path, entry['etag'])
+        lru = self.bundle_cache.lru
+        value = lru.get(key)
+        if value is None:
+            # One build at a time; a request waiting here finds the value built
+            with self._lock:
+                value = lru.get(key, count=False)
+                if value is None:
+                    value = self._build(key, path, entry['variants']['identity'])
+        if isinstance(value, DerivedFailure):
+            raise ValueError(value.message)
+        return value
+
+    def _build(self, key, path, data):
+        start = time.perf_counter()
+        try:
+            value = self.build(data)
+        except ValueError as e:
+            value = DerivedFailure(str(e))
+            self.bundle_cache.lru.put(key, value, len(value.message))
+            print(f"Cannot load {self.kind} for {path}: {value.message}")
+            return value
+        self.bundle_cache.lru.put(key, value, int(len(data) * self.size_factor))
+        print(f"Loaded {self.kind} for {path} in {time.perf_counter() - start:.2f} s")
+        return value
+
+
+def accepted_encodings(header):
+    """Return the content codings a client accepts (q > 0) from Accept-Encoding."""
+    accepted = set()
+    for item in (header or '').split(','):
+        coding, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding and q > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def save_multipart_files(rfile, length, boundary, destinations, chunk_size=1 << 16):
+    """
+    Stream the file parts of a multipart/form-data body to disk.
+
+    Args:
+        rfile: Request body stream
+        length: Content-Length of the body
+        boundary: Multipart boundary (bytes)
+        destinations: dict mapping form field name -> output Path; parts
+            for other fields are read and discarded
+
+    Returns:
+        dict mapping field name -> Path for every file part saved
+    """
+    delimiter = b'\r\n--' + boundary
+    remaining = length
+    # The first boundary is not preceded by CRLF; prepend one so every
+    # delimiter looks the same
+    buf = b'\r\n'
+
+    def fill():
+        nonlocal buf, remaining
+        if remaining <= 0:
+            raise ValueError('Unexpected end of multipart body')
+        data = rfile.read(min(chunk_size, remaining))
+        if not data:
+            raise ValueError('Unexpected end of multipart body')
+        remaining -= len(data)
+        buf += data
+
+    while (pos := buf.find(delimiter)) < 0:
+        buf = buf[-len(delimiter):]
+        fill()
+    buf = buf[pos + len(delimiter):]
+
+    saved = {}
+    while True:
+        while len(buf) < 2:
+            fill()
+        if buf.startswith(b'--'):
+            break
+
+        while (header_end := buf.find(b'\r\n\r\n')) < 0:
+            if len(buf) > 16384:
+                raise ValueError('Multipart part headers too long')
+            fill()
+        headers = buf[2:header_end].decode('utf-8', 'replace')
+        buf = buf[header_end + 4:]
+
+        name = re.search(r'\bname="([^"]*)"', headers)
+        path = destinations.get(name.group(1)) if name and 'filename=' in headers else None
+        out = open(path, 'wb') if path is not None else None
+
+        # Copy the part body, holding back enough bytes to spot a split delimiter
+        keep = len(delimiter) - 1
+        try:
+            while (pos := buf.find(delimiter)) < 0:
+                if len(buf) > keep:
+                    if out is not None:
+                        out.write(buf[:-keep])
+                    buf = buf[-keep:]
+                fill()
+            if out is not None:
+                out.write(buf[:pos])
+        finally:
+            if out is not None:
+                out.close()
+        buf = buf[pos + len(delimiter):]
+        if path is not None:
+            saved[name.group(1)] = path
+
+    # Discard the epilogue
+    while remaining > 0:
+        data = rfile.read(min(chunk_size, remaining))
+        if not data:
+            break
+        remaining -= len(data)
+    return saved
+
+
+# Routes reported under their own name by /metrics; other paths are grouped
+METRICS_ROUTES = ('/metrics', '/upload', '/events', '/api/bundles', '/api/ego', '/api/deps',
+                  '/api/search', '/api/delta', '/api/simulate')
+METRICS_DATA_FILES = INDEXED_BUNDLES + (STREAM_BUNDLE, MODULE_DETAILS, SEARCH_INDEX)
+
+
+def metrics_route(url_path):
+    """
+    The route a request path is counted under, keeping the number of
+    label values bounded: /api/module/<name> is /api/module, a bundle
+    file is /data/<file name> whichever bundle it belongs to.
+    """
+    if url_path in METRICS_ROUTES:
+        return url_path
+    if url_path.startswith('/api/module/'):
+        return '/api/module'
+    if url_path.startswith('/jobs/'):
+        return '/jobs'
+    if url_path.startswith('/data/'):
+        name = url_path.rsplit('/', 1)[-1]
+        return f'/data/{name}' if name in METRICS_DATA_FILES else '/data/*'
+    if url_path == '/app' or url_path.startswith('/app/'):
+        return '/app'
+    return 'other'
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_label_value(value)}"' for name, value in labels.items()) + '}'
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name, **labels):
+        lines = [f'{name}_bucket{_labels(**labels, le=bound)} {count}'
+                 for bound, count in zip(self.buckets, self.counts)]
+        lines.append(f'{name}_bucket{_labels(**labels, le="+Inf")} {self.count}')
+        lines.append(f'{name}_sum{_labels(**labels)} {self.sum:.6f}')
+        lines.append(f'{name}_count{_labels(**labels)} {self.count}')
+        return lines
+
+
+class Metrics:
+    """
+    Request and rebuild counters exposed by /metrics in the Prometheus
+    text format (version 0.0.4).
+
+    Requests are counted by route (see metrics_route), method and status,
+    with a latency histogram and the bytes sent (headers included) per
+    route. Rebuild jobs are counted by outcome, with a duration histogram
+    and the seconds spent in each build stage.
+    """
+
+    PREFIX = 'cmssw_graph'
+    REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    REBUILD_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests = {}
+        self.request_seconds = {}
+        self.response_bytes = {}
+        self.rebuilds = {}
+        self.rebuild_seconds = Histogram(self.REBUILD_BUCKETS)
+        self.stage_seconds = {}
+
+    def observe_request(self, route, method, status, seconds, size):
+        with self._lock:
+            key = (route, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            if route not in self.request_seconds:
+                self.request_seconds[route] = Histogram(self.REQUEST_BUCKETS)
+            self.request_seconds[route].observe(seconds)
+            self.response_bytes[route] = self.response_bytes.get(route, 0) + size
+
+    def observe_rebuild(self, outcome, seconds, stages):
+        """
+        Args:
+            outcome: 'done' or 'failed'
+            stages: {stage name: seconds} of the stages that ran
+        """
+        with self._lock:
+            self.rebuilds[outcome] = self.rebuilds.get(outcome, 0) + 1
+            self.rebuild_seconds.observe(seconds)
+            for stage, stage_seconds in stages.items():
+                self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + stage_seconds
+
+    def render(self, cache_stats=None):
+        """Return the exposition text, with the gauges of MemoryLRU.stats() if given."""
+        p = self.PREFIX
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {p}_{name} {help_text}')
+            lines.append(f'# TYPE {p}_{name} {kind}')
+
+        with self._lock:
+            family('uptime_seconds', 'gauge', 'Seconds since the server started.')
+            lines.append(f'{p}_uptime_seconds {time.time() - self.started:.3f}')
+
+            family('http_requests_total', 'counter', 'HTTP requests by route, method and status.')
+            for (route, method, status), count in sorted(self.requests.items()):
+                lines.append(f'{p}_http_requests_total{_labels(route=route, method=method, status=status)} {count}')
+
+            family('http_request_duration_seconds', 'histogram',
+                   'Time from reading the request line to sending the response.')
+            for route, histogram in sorted(self.request_seconds.items()):
+                lines += histogram.lines(f'{p}_http_request_duration_seconds', route=route)
+
+            family('http_response_bytes_total', 'counter', 'Bytes sent, headers included, by route.')
+            for route, size in sorted(self.response_bytes.items()):
+                lines.append(f'{p}_http_response_bytes_total{_labels(route=route)} {size}')
+
+            family('rebuilds_total', 'counter', 'Finished rebuild jobs by outcome.')
+            for outcome in sorted(set(self.rebuilds) | {'done', 'failed'}):
+                lines.append(f'{p}_rebuilds_total{_labels(outcome=outcome)} {self.rebuilds.get(outcome, 0)}')
+
+            family('rebuild_duration_seconds', 'histogram', 'Wall time of finished rebuild jobs.')
+            lines += self.rebuild_seconds.lines(f'{p}_rebuild_duration_seconds')
+
+            family('rebuild_stage_seconds_total', 'counter', 'Seconds spent in each build stage.')
+            for stage, seconds in sorted(self.stage_seconds.items()):
+                lines.append(f'{p}_rebuild_stage_seconds_total{_labels(stage=stage)} {seconds:.3f}')
+
+        if cache_stats is not None:
+            for key, name, kind, help_text in (
+                    ('bytes', 'cache_bytes', 'gauge', 'Bytes held by the bundle cache.'),
+                    ('maxBytes', 'cache_max_bytes', 'gauge', 'Memory ceiling of the bundle cache.'),
+                    ('entries', 'cache_entries', 'gauge', 'Entries in the bundle cache.'),
+                    ('hits', 'cache_hits_total', 'counter', 'Bundle cache hits.'),
+                    ('misses', 'cache_misses_total', 'counter', 'Bundle cache misses.'),
+                    ('evictions', 'cache_evictions_total', 'counter', 'Bundle cache evictions.')):
+                family(name, kind, help_text)
+                lines.append(f'{p}_{name} {cache_stats[key]}')
+        return '\n'.join(lines) + '\n'
+
+
+class CountingWriter:
+    """Wraps a handler's wfile, counting the bytes written through it."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+
+    def write(self, data):
+        self.count += len(data)
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class EventBroadcaster:
+    """
+    Fans server-sent events out to the connected /events clients. Each
+    client has a bounded queue; a client too slow to drain it misses
+    events rather than holding the others up.
+    """
+
+    MAX_QUEUED = 100
+
+    def __init__(self):
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Return the queue of (event, data) pairs of a new client."""
+        client = queue.Queue(self.MAX_QUEUED)
+        with self._lock:
+            self._clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def publish(self, event, data):
+        """Send an event with a JSON-serializable payload to every client."""
+        payload = json.dumps(data)
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait((event, payload))
+            except queue.Full:
+                pass
+
+    def __len__(self):
+        with self._lock:
+            return len(self._clients)
+
+
+class BuildJobQueue:
+    """
+    Rebuilds the bundle from uploaded files on an in-process worker.
+
+    Jobs run one at a time, in submission order. Each job builds from its
+    own copy of the inputs; after a successful build they replace
+    dependency.gv/dumpConfig.py in the project root (default bundle) or
+    in data/<name>/ (named bundle). Jobs queued by InputWatcher build
+    from the inputs in place instead, copied when the job starts, and a
+    watch job still queued absorbs later changes to the same bundle.
+
+    Jobs rebuild a bundle with the options it was last built with
+    (build_bundle.rebuild_options), so a bundle built with --binary,
+    --timing etc. keeps those outputs.
+
+    Every job publishes a "build" event when it starts and ends.
+    """
+
+    MAX_FINISHED_JOBS = 50
+
+    def __init__(self, project_root, metrics=None, events=None):
+        self.project_root = Path(project_root)
+        self.metrics = metrics
+        self.events = events
+        self.upload_dir = self.project_root / '.uploads'
+        self.output_path = self.project_root / 'data' / 'bundle.json'
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='build')
+
+    def create_job_dir(self):
+        """Return (job_id, directory) for a new job's input files."""
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = self.upload_dir / job_id
+        job_dir.mkdir(parents=True)
+        return job_id, job_dir
+
+    def submit(self, job_id, dot_path, config_path, bundle=None, source='upload'):
+        """Queue a build of the default bundle, or of data/<bundle>/, and return its initial status."""
+        from build_bundle import BUILD_STAGES
+
+        job = {
+            'id': job_id,
+            'bundle': bundle,
+            'source': source,
+            'status': 'queued',
+            'stage': None,
+            'stages': [{'name': name, 'status': 'pending', 'seconds': None} for name in BUILD_STAGES],
+            'error': None,
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job, Path(dot_path), Path(config_path))
+        return self.status(job_id)
+
+    def submit_watch(self, dot_path, config_path, bundle=None):
+        """
+        Queue a rebuild from the inputs in place, unless one of the same
+        bundle is still queued: it copies the inputs only when it starts,
+        so it covers this change too.
+
+        Returns:
+            (status, coalesced)
+        """
+        with self._lock:
+            pending = next((job['id'] for job in self._jobs.values()
+                            if job['source'] == 'watch' and job['bundle'] == bundle
+                            and job['status'] == 'queued'), None)
+        if pending is not None:
+            return self.status(pending), True
+        return self.submit(uuid.uuid4().hex[:12], dot_path, config_path, bundle, source='watch'), False
+
+    def _publish(self, job, metadata=None):
+        if self.events is not None:
+            self.events.publish('build', {
+                'job': job['id'],
+                'bundle': job['bundle'],
+                'source': job['source'],
+                'status': job['status'],
+                'error': job['error'],
+                'contentHash': metadata['contentHash'] if metadata else None,
+                'buildOptions': metadata.get('buildOptions') if metadata else None,
+            })
+
+    def status(self, job_id):
+        """Return a snapshot of a job, or None if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = json.loads(json.dumps(job))
+            if job['status'] == 'queued':
+                snapshot['queuePosition'] = sum(
+                    1 for other in self._jobs.values()
+                    if other['status'] in ('queued', 'running') and other['created'] < job['created'])
+        return snapshot
+
+    def _set_stage(self, job, stage):
+        with self._lock:
+            now = time.time()
+            for entry in job['stages']:
+                if entry['status'] == 'running':
+                    entry['status'] = 'done'
+                    entry['seconds'] = round(now - entry.pop('started'), 3)
+                if entry['name'] == stage:
+                    entry['status'] = 'running'
+                    entry['started'] = now
+            job['stage'] = stage
+
+    def _run(self, job, dot_path, config_path):
+        from build_bundle import build_bundle, rebuild_options
+        from build_cache import BuildCache
+
+        with self._lock:
+            job['status'] = 'running'
+            job['started'] = time.time()
+        print(f"\nRunning rebuild job {job['id']} ({job['source']})...")
+        self._publish(job)
+
+        if job['bundle']:
+            output_path = self.output_path.parent / job['bundle'] / 'bundle.json'
+            inputs_dir = output_path.parent
+        else:
+            output_path = self.output_path
+            inputs_dir = self.project_root
+
+        watched = job['source'] == 'watch'
+        job_dir = self.create_job_dir()[1] if watched else dot_path.parent
+        metadata = None
+        try:
+            if watched:
+                # Build from a copy, so writes during the build start the next one
+                dot_path = Path(shutil.copy2(dot_path, job_dir / 'dependency.gv'))
+                config_path = Path(shutil.copy2(config_path, job_dir / 'dumpConfig.py'))
+            cache = BuildCache(output_path.parent / '.build_cache')
+            options, config_only = rebuild_options(output_path)
+            if config_only:
+                # Still derived from the config, compared with the new DOT file
+                options['compare_dot'] = dot_path
+            metadata = build_bundle(None if config_only else dot_path, config_path, output_path,
+                                    cache=cache, progress=lambda stage: self._set_stage(job, stage),
+                                    **options)
+            if not watched:
+                # Keep the uploaded inputs as the bundle's current inputs
+                os.replace(dot_path, inputs_dir / 'dependency.gv')
+                os.replace(config_path, inputs_dir / 'dumpConfig.py')
+            status, error = 'done', None
+            print(f"  Rebuild job {job['id']} finished")
+        except (Exception, SystemExit) as e:
+            traceback.print_exc()
+            status, error = 'failed', f'Bundle generation failed: {e}'
+            print(f"  ERROR: rebuild job {job['id']}: {e}")
+        finally:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+        with self._lock:
+            now = time.time()
+            for entry in job['stages']:
+                if entry['status'] == 'running':
+                    entry['status'] = 'done' if status == 'done' else 'failed'
+                    entry['seconds'] = round(now - entry.pop('started'), 3)
+                elif entry['status'] == 'pending' and status == 'done':
+                    # An up-to-date bundle finishes without running later stages
+                    entry['status'] = 'skipped'
+            job.update(status=status, stage=None, error=error, finished=now)
+
+            finished = [job_id for job_id, other in self._jobs.items()
+                        if other['status'] in ('done', 'failed')]
+            for job_id in finished[:-self.MAX_FINISHED_JOBS]:
+                del self._jobs[job_id]
+        # No content hash when the bundle was already up to date
+        self._publish(job, metadata)
+
+        if self.metrics is not None:
+            self.metrics.observe_rebuild(
+                status, now - job['started'],
+                {entry['name']: entry['seconds'] for entry in job['stages'] if entry['seconds'] is not None})
+
+
+def list_bundles(data_dir, lru):
+    """
+    The default bundle in data_dir and every data_dir/<name>/ holding one.
+
+    Returns:
+        list of dicts with name (None for the default bundle), path,
+        files (name -> size), modified (latest mtime) and loaded (whether
+        any of its files or indexes is in the cache)
+    """
+    candidates = [(None, data_dir)]
+    if os.path.isdir(data_dir):
+        candidates += [(name, os.path.join(data_dir, name)) for name in sorted(os.listdir(data_dir))
+                       if BUNDLE_NAME.match(name) and os.path.isdir(os.path.join(data_dir, name))]
+
+    bundles = []
+    for name, directory in candidates:
+        files = {}
+        for file_name in INDEXED_BUNDLES:
+            try:
+                st = os.stat(os.path.join(directory, file_name))
+            except OSError:
+                continue
+            files[file_name] = (st.st_size, st.st_mtime)
+        if not files:
+            continue
+        prefix = os.path.join(directory, '')
+        bundles.append({
+            'name': name,
+            'path': f'/data/{name}/' if name else '/data/',
+            'files': {file_name: size for file_name, (size, _) in files.items()},
+            'modified': max(mtime for _, mtime in files.values()),
+            'loaded': lru.contains(lambda key: key[1].startswith(prefix)
+                                   and os.sep not in key[1][len(prefix):]),
+        })
+    return bundles
+
+
+class InputWatcher:
+    """
+    Polls the inputs of the default bundle and of every data/<name>/
+    bundle (WATCHED_INPUTS) and queues a rebuild once they have stayed
+    unchanged for `debounce` seconds, so a burst of writes (or a
+    regenerated file written in pieces) is built once. Inputs present at
+    startup, or appearing later, are taken as built.
+
+    The timing report a bundle was built with (metadata.buildOptions) is
+    watched too. Rebuilds keep the bundle's options, as for uploads.
+    """
+
+    def __init__(self, project_root, build_jobs, debounce=DEFAULT_DEBOUNCE, interval=WATCH_INTERVAL):
+        self.project_root = Path(project_root)
+        self.build_jobs = build_jobs
+        self.debounce = debounce
+        self.interval = interval
+        self._seen = {}
+        self._changed = {}
+        self._built = {}
+        self._timing = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def inputs(self):
+        """Yield (bundle, dot_path, config_path); bundle is None for the default one."""
+        candidates = [(None, self.project_root)]
+        data_dir = self.project_root / 'data'
+        if data_dir.is_dir():
+            candidates += [(path.name, path) for path in sorted(data_dir.iterdir())
+                           if path.is_dir() and BUNDLE_NAME.match(path.name)]
+        for bundle, directory in candidates:
+            dot_path, config_path = (directory / name for name in WATCHED_INPUTS)
+            if dot_path.is_file() and config_path.is_file():
+                yield bundle, dot_path, config_path
+
+    def timing_report(self, bundle, config_path):
+        """Timing report of a bundle's last build, re-read when the bundle changes."""
+        from build_bundle import rebuild_options
+
+        output_path = config_path.parent / 'data' / 'bundle.json' if bundle is None else \
+            config_path.parent / 'bundle.json'
+        built = self.signature(output_path)
+        cached = self._timing.get(bundle)
+        if cached is None or cached[0] != built:
+            timing = rebuild_options(output_path)[0].get('timing') if built else None
+            cached = self._timing[bundle] = (built, timing)
+        return cached[1]
+
+    @staticmethod
+    def signature(*paths):
+        """Modification time and size of each path, or None if one is missing."""
+        try:
+            return tuple((st.st_mtime_ns, st.st_size) for st in map(os.stat, paths))
+        except OSError:
+            return None
+
+    def poll(self, now=None):
+        """
+        Check the inputs once, queueing the rebuilds that are due.
+
+        Returns:
+            Bundle names (None for the default bundle) queued by this poll
+        """
+        now = time.monotonic() if now is None else now
+        queued = []
+        for bundle, dot_path, config_path in self.inputs():
+            signature = self.signature(dot_path, config_path)
+            if signature is None:
+                continue
+            timing = self.timing_report(bundle, config_path)
+            if timing:
+                # A removed report is a change too: the rebuild drops it
+                signature += (self.signature(timing),)
+            if bundle not in self._built:
+                self._seen[bundle] = self._built[bundle] = signature
+                continue
+            if signature != self._seen[bundle]:
+                # Still changing: wait until it has been quiet for debounce seconds
+                self._seen[bundle] = signature
+                self._changed[bundle] = now
+                continue
+            if signature != self._built[bundle] and now - self._changed[bundle] >= self.debounce:
+                self._built[bundle] = signature
+                job, coalesced = self.build_jobs.submit_watch(dot_path, config_path, bundle)
+                label = bundle or 'default bundle'
+                if coalesced:
+                    print(f"Inputs of {label} changed; rebuild {job['id']} is still queued")
+                else:
+                    print(f"Inputs of {label} changed; queued rebuild {job['id']}")
+                queued.append(bundle)
+        return queued
+
+    def start(self):
+        """Poll in a daemon thread until stop()."""
+        self.poll()
+        self._thread = threading.Thread(target=self._loop, name='watch', daemon=True)
+        self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                traceback.print_exc()
+
+    def stop(self):
+        self._stop.set()
+
+
+class ThreadingServer(http.server.ThreadingHTTPServer):
+    """One thread per request, with a listen backlog sized for bursts of clients"""
+    request_queue_size = 128
 
 
 class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
     """HTTP request handler with CORS support and file upload"""
 
+    bundle_cache = BundleCache(MemoryLRU(DEFAULT_CACHE_MB * 1024 * 1024))
+    # Size factors are measured in-memory sizes of each value per file byte
+    graph_indexes = DerivedCache(bundle_cache, 'graph index', INDEXED_BUNDLES, GraphIndex.from_bytes, 1.5)
+    module_details = DerivedCache(bundle_cache, 'module details', (MODULE_DETAILS,), json.loads, 4)
+    search_indexes = DerivedCache(bundle_cache, 'search index', (SEARCH_INDEX,), SearchIndex.from_bytes, 7)
+    schedulers = DerivedCache(bundle_cache, 'scheduler', INDEXED_BUNDLES, Scheduler.from_bytes, 1)
+    metrics = Metrics()
+    events = EventBroadcaster()
+    build_jobs = BuildJobQueue(Path(__file__).parent, metrics, events)
+    cache_control = 'no-store, no-cache, must-revalidate'
+    extensions_map = {**http.server.SimpleHTTPRequestHandler.extensions_map,
+                      '.ndjson': 'application/x-ndjson'}
+
+    def setup(self):
+        super().setup()
+        self.wfile = CountingWriter(self.wfile)
+
+    def handle_one_request(self):
+        """Handle one request and record it in the metrics"""
+        start = time.perf_counter()
+        self.wfile.count = 0
+        self.response_status = None
+        super().handle_one_request()
+        if self.response_status is not None:
+            self.metrics.observe_request(
+                metrics_route(urlsplit(getattr(self, 'path', '')).path), self.command or 'other',
+                self.response_status, time.perf_counter() - start, self.wfile.count)
+
+    def send_response(self, code, message=None):
+        self.response_status = code
+        super().send_response(code, message)
+
     def end_headers(self):
         """Add CORS headers before ending headers"""
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
+        self.send_header('Cache-Control', self.cache_control)
         super().end_headers()
 
+    def do_GET(self):
+        """Serve job status and bundle files from memory, everything else from disk"""
+        url = urlsplit(self.path)
+        url_path = url.path
+        if url_path.startswith('/jobs/'):
+            self.handle_job_status(url_path[len('/jobs/'):])
+        elif url_path == '/api/bundles':
+            self.handle_bundles()
+        elif url_path.startswith('/api/module/'):
+            self.handle_module_details(unquote(url_path[len('/api/module/'):]), parse_qs(url.query))
+        elif url_path in ('/api/ego', '/api/deps'):
+            self.handle_graph_query(url_path[len('/api/'):], parse_qs(url.query))
+        elif url_path == '/api/search':
+            self.handle_search(parse_qs(url.query))
+        elif url_path == '/api/delta':
+            self.handle_delta(parse_qs(url.query))
+        elif url_path == '/api/simulate':
+            self.handle_simulate(parse_qs(url.query))
+        elif url_path == '/metrics':
+            self.handle_metrics()
+        elif url_path == '/events':
+            self.handle_events()
+        elif not self.send_cached_file():
+            super().do_GET()
+
+    def do_HEAD(self):
+        if not self.send_cached_file(head=True):
+            super().do_HEAD()
+
+    def send_cached_file(self, head=False):
+        """
+        Send a generated file from the bundle cache.
+
+        Returns:
+            False if the request is not for a cached file
+        """
+        url_path = urlsplit(self.path).path
+        if not (url_path.startswith(CACHED_PREFIX) and url_path.endswith(CACHED_SUFFIXES)):
+            return False
+        path = self.translate_path(self.path)
+        entry = self.bundle_cache.get(path)
+        if entry is None:
+            return False
+
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+        encoding = next((enc for _, enc in ENCODINGS
+                         if enc in accepted and enc in entry['variants']), 'identity')
+        # Strong ETags must differ between encodings of the same content
+        etag = f'"{entry["etag"]}"' if encoding == 'identity' else f'"{entry["etag"]}-{encoding}"'
+
+        self.cache_control = 'no-cache'
+        if self.is_not_modified(entry, etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.end_headers()
+            return True
+
+        body = entry['variants'][encoding]
+        self.send_response(200)
+        self.send_header('Content-Type', self.guess_type(path))
+        self.send_header('Content-Length', str(len(body)))
+        if encoding != 'identity':
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', entry['last_modified'])
+        self.send_header('Vary', 'Accept-Encoding')
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
+
+    def is_not_modified(self, entry, etag):
+        """Evaluate If-None-Match, or If-Modified-Since when it is absent"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return entry['mtime'] <= since
+        return False
+
     def do_OPTIONS(self):
         """Handle OPTIONS requests for CORS preflight"""
         self.send_response(200)
@@ -34,92 +1115,289 @@ class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
 
     def do_POST(self):
         """Handle POST requests for file uploads"""
-        if self.path == '/upload':
-            self.handle_upload()
+        url = urlsplit(self.path)
+        if url.path == '/upload':
+            self.handle_upload(parse_qs(url.query))
         else:
             self.send_error(404, "Not Found")
 
-    def handle_upload(self):
-        """Handle file upload and bundle regeneration"""
+    def handle_upload(self, params):
+        """
+        Stream the uploaded files to disk and queue a rebuild job of the
+        default bundle, or of data/<name>/ with ?bundle=<name>
+        """
+        job_dir = None
+        bundle = params.get('bundle', [''])[0] or None
+        if bundle is not None and not BUNDLE_NAME.match(bundle):
+            self.send_json_response({'success': False, 'error': f'Invalid bundle name: {bundle}'}, 400)
+            return
         try:
-            # Parse multipart form data
-            content_type = self.headers.get('Content-Type')
-            if not content_type or not content_type.startswith('multipart/form-data'):
+            content_type = self.headers.get('Content-Type', '')
+            boundary = re.search(r'boundary="?([^";]+)"?', content_type)
+            if not content_type.startswith('multipart/form-data') or not boundary:
                 self.send_json_response({'success': False, 'error': 'Invalid content type'}, 400)
                 return
 
-            # Parse form data
-            form = cgi.FieldStorage(
-                fp=self.rfile,
-                headers=self.headers,
-                environ={'REQUEST_METHOD': 'POST'}
-            )
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0:
+                self.send_json_response({'success': False, 'error': 'Content-Length required'}, 411)
+                return
 
-            # Get uploaded files
-            dot_file = form['dotFile'].file if 'dotFile' in form else None
-            config_file = form['configFile'].file if 'configFile' in form else None
+            # Each job gets its own input files, so queued uploads never
+            # overwrite the inputs of a running build
+            job_id, job_dir = self.build_jobs.create_job_dir()
+            saved = save_multipart_files(
+                self.rfile, length, boundary.group(1).encode('latin-1'),
+                {'dotFile': job_dir / 'dependency.gv', 'configFile': job_dir / 'dumpConfig.py'})
 
-            if not dot_file or not config_file:
+            if len(saved) != 2:
+                shutil.rmtree(job_dir, ignore_errors=True)
                 self.send_json_response({'success': False, 'error': 'Both files are required'}, 400)
                 return
 
-            # Get project root
-            project_root = Path(__file__).parent
-
-            # Save files
-            dot_path = project_root / "dependency.gv"
-            config_path = project_root / "dumpConfig.py"
-
-            print(f"\nSaving uploaded files...")
-            with open(dot_path, 'wb') as f:
-                f.write(dot_file.read())
-            print(f"  Saved: {dot_path}")
-
-            with open(config_path, 'wb') as f:
-                f.write(config_file.read())
-            print(f"  Saved: {config_path}")
-
-            # Run bundle generation
-            print(f"\nRegenerating bundle...")
-            build_script = project_root / "preprocess" / "build_bundle.py"
-
-            result = subprocess.run(
-                [sys.executable, str(build_script)],
-                cwd=project_root,
-                capture_output=True,
-                text=True,
-                timeout=300  # 5 minute timeout
-            )
-
-            if result.returncode != 0:
-                error_msg = result.stderr or result.stdout
-                print(f"  ERROR: {error_msg}")
-                self.send_json_response({
-                    'success': False,
-                    'error': f'Bundle generation failed: {error_msg}'
-                }, 500)
-                return
-
-            print(f"  Bundle generated successfully!")
-            print(result.stdout)
+            print(f"\nQueued rebuild job {job_id} ({saved['dotFile'].stat().st_size:,} + "
+                  f"{saved['configFile'].stat().st_size:,} bytes uploaded)")
+            job = self.build_jobs.submit(job_id, saved['dotFile'], saved['configFile'], bundle)
 
             self.send_json_response({
                 'success': True,
-                'message': 'Files uploaded and bundle regenerated successfully'
-            })
+                'jobId': job_id,
+                'statusUrl': f'/jobs/{job_id}',
+                'job': job
+            }, 202)
 
-        except subprocess.TimeoutExpired:
-            self.send_json_response({
-                'success': False,
-                'error': 'Bundle generation timed out (>5 minutes)'
-            }, 500)
         except Exception as e:
+            if job_dir is not None:
+                shutil.rmtree(job_dir, ignore_errors=True)
             print(f"  ERROR: {str(e)}")
             self.send_json_response({
                 'success': False,
                 'error': f'Upload failed: {str(e)}'
             }, 500)
 
+    def bundle_dir(self, params):
+        """
+        Data directory of the bundle named by ?bundle= (data/ without it).
+        Sends a 404 and returns None for an unknown bundle.
+        """
+        data_dir = self.translate_path('/data/')
+        name = params.get('bundle', [''])[0]
+        if not name:
+            return data_dir
+        directory = os.path.join(data_dir, name)
+        if BUNDLE_NAME.match(name) and any(os.path.exists(os.path.join(directory, file_name))
+                                           for file_name in INDEXED_BUNDLES):
+            return directory
+        self.send_json_response({'success': False, 'error': f'Unknown bundle: {name}'}, 404)
+        return None
+
+    def handle_bundles(self):
+        """List the served bundles and the state of the shared cache"""
+        self.send_json_response({
+            'bundles': list_bundles(self.translate_path('/data/'), self.bundle_cache.lru),
+            'cache': self.bundle_cache.lru.stats(),
+        })
+
+    def handle_graph_query(self, kind, params):
+        """
+        Answer /api/ego?node=&radius= and /api/deps?node=&direction=&depth=
+        with the reached subgraph. node is a node ID or module label.
+        """
+        node = params.get('node', [''])[0]
+        depth_param = 'radius' if kind == 'ego' else 'depth'
+        direction = params.get('direction', ['paths'])[0]
+        try:
+            depth = int(params.get(depth_param, ['1'])[0])
+        except ValueError:
+            depth = -1
+        if not node or not 0 <= depth <= MAX_QUERY_DEPTH:
+            self.send_json_response({
+                'success': False,
+                'error': f'Expected node and {depth_param} (0-{MAX_QUERY_DEPTH})'
+            }, 400)
+            return
+        if kind == 'deps' and direction not in DIRECTIONS:
+            self.send_json_response({
+                'success': False,
+                'error': f'direction must be one of: {", ".join(DIRECTIONS)}'
+            }, 400)
+            return
+
+        data_dir = self.bundle_dir(params)
+        if data_dir is None:
+            return
+        index = self.graph_indexes.get(data_dir)
+        if index is None:
+            self.send_json_response({'success': False, 'error': 'No bundle to query'}, 404)
+            return
+        center = index.resolve(node)
+        if center is None:
+            self.send_json_response({'success': False, 'error': f'Unknown node: {node}'}, 404)
+            return
+
+        if kind == 'ego':
+            distance, edges = index.ego(center, depth)
+        else:
+            distance, edges = index.deps(center, direction, depth)
+        self.send_json_response(index.subgraph(center, distance, edges))
+
+    def handle_module_details(self, name, params):
+        """Send the full record (parameters, InputTags, snippet) of one module"""
+        data_dir = self.bundle_dir(params)
+        if data_dir is None:
+            return
+        details = self.module_details.get(data_dir)
+        module = details.get(name) if details is not None else None
+        if module is None:
+            self.send_json_response({'success': False, 'error': f'Unknown module: {name}'}, 404)
+        else:
+            self.send_json_response(module)
+
+    def handle_search(self, params):
+        """
+        Answer /api/search?q=&limit= with the names of the matching
+        modules (query syntax in preprocess/search_index.py)
+        """
+        query = params.get('q', [''])[0]
+        try:
+            limit = int(params['limit'][0]) if 'limit' in params else None
+        except ValueError:
+            limit = -1
+        if limit is not None and limit < 0:
+            self.send_json_response({'success': False, 'error': 'limit must be a non-negative integer'}, 400)
+            return
+
+        data_dir = self.bundle_dir(params)
+        if data_dir is None:
+            return
+        index = self.search_indexes.get(data_dir)
+        if index is None:
+            self.send_json_response({'success': False, 'error': 'No search index'}, 404)
+            return
+        try:
+            modules, total = index.search(query, limit)
+        except ValueError as e:
+            self.send_json_response({'success': False, 'error': str(e)}, 400)
+            return
+        self.send_json_response({
+            'query': query,
+            'total': total,
+            'modules': modules,
+            'truncated': total > len(modules)
+        })
+
+    def handle_delta(self, params):
+        """
+        Send the patch from the build with content hash ?from= to the
+        current one; 404 when there is none (too old, or too large a change)
+        """
+        content_hash = params.get('from', [''])[0]
+        if not CONTENT_HASH.match(content_hash):
+            self.send_json_response({'success': False, 'error': 'Expected from=<content hash>'}, 400)
+            return
+
+        data_dir = self.bundle_dir(params)
+        if data_dir is None:
+            return
+        entry = self.bundle_cache.get(os.path.join(data_dir, VERSIONS_DIR, f'{content_hash}.patch.json'))
+        if entry is None:
+            self.send_json_response({'success': False, 'error': f'No patch from {content_hash}'}, 404)
+            return
+
+        body = entry['variants']['identity']
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_simulate(self, params):
+        """
+        Answer /api/simulate?threads=&streams=&events= with one simulated
+        run per thread count (see preprocess/simulate.py). threads is a
+        list such as 1,2,4 or 1-16; streams default to the thread count.
+        """
+        streams = events = None
+        try:
+            thread_counts = parse_thread_counts(params.get('threads', [','.join(map(str, DEFAULT_THREADS))])[0],
+                                                MAX_SIMULATED_THREADS)
+            streams = int(params['streams'][0]) if 'streams' in params else None
+            events = int(params['events'][0]) if 'events' in params else None
+        except ValueError:
+            thread_counts = None
+        total_streams = sum(streams or threads for threads in thread_counts or ())
+        if (not thread_counts
+                or streams is not None and not 1 <= streams <= MAX_SIMULATED_THREADS
+                or events is not None and not 1 <= events <= MAX_SIMULATED_EVENTS
+                or total_streams > MAX_SIMULATED_STREAMS):
+            self.send_json_response({
+                'success': False,
+                'error': f'Expected threads (e.g. 1,2,4 or 1-16, at most {MAX_SIMULATED_THREADS}), '
+                         f'streams (1-{MAX_SIMULATED_THREADS}) and events (1-{MAX_SIMULATED_EVENTS}), '
+                         f'with at most {MAX_SIMULATED_STREAMS} streams over all runs'
+            }, 400)
+            return
+
+        data_dir = self.bundle_dir(params)
+        if data_dir is None:
+            return
+        try:
+            scheduler = self.schedulers.get(data_dir)
+        except ValueError as e:
+            self.send_json_response({'success': False, 'error': str(e)}, 404)
+            return
+        if scheduler is None:
+            self.send_json_response({'success': False, 'error': 'No bundle to simulate'}, 404)
+            return
+
+        self.send_json_response({
+            'tasks': scheduler.num_tasks,
+            'total': round(scheduler.total, 3),
+            'criticalPath': round(scheduler.critical_path, 3),
+            'runs': scheduler.sweep(thread_counts, streams, events),
+        })
+
+    def handle_metrics(self):
+        """Request, rebuild and cache metrics in the Prometheus text format"""
+        body = self.metrics.render(self.bundle_cache.lru.stats()).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_events(self):
+        """Stream rebuild events to the client until it disconnects (Server-Sent Events)"""
+        client = self.events.subscribe()
+        self.cache_control = 'no-cache'
+        self.close_connection = True
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            self.wfile.write(b'retry: 3000\n\n')
+            self.wfile.flush()
+            while True:
+                try:
+                    event, data = client.get(timeout=EVENTS_KEEPALIVE)
+                    message = f'event: {event}\ndata: {data}\n\n'
+                except queue.Empty:
+                    message = ': keepalive\n\n'
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.events.unsubscribe(client)
+
+    def handle_job_status(self, job_id):
+        """Report the state and per-stage progress of a rebuild job"""
+        job = self.build_jobs.status(job_id)
+        if job is None:
+            self.send_json_response({'success': False, 'error': f'Unknown job: {job_id}'}, 404)
+        else:
+            self.send_json_response(job)
+
     def send_json_response(self, data, status=200):
         """Send JSON response"""
         self.send_response(status)
@@ -133,8 +1411,20 @@ class CORSRequestHandler(http.server.SimpleHTTPRequestHandler):
 
 
 def main():
-    PORT = 8000
+    parser = argparse.ArgumentParser(description="Serve the CMSSW graph visualization app.")
+    parser.add_argument("port", nargs="?", type=int, default=8000)
+    parser.add_argument("--cache-mb", type=int, default=DEFAULT_CACHE_MB,
+                        help="memory ceiling for loaded bundles and query indexes (default: %(default)s)")
+    parser.add_argument("--watch", action="store_true",
+                        help="rebuild bundles when their dependency.gv/dumpConfig.py change")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_DEBOUNCE,
+                        help="seconds the inputs must stay unchanged before a --watch rebuild "
+                             "(default: %(default)s)")
+    args = parser.parse_args()
+
+    PORT = args.port
     HOST = 'localhost'
+    CORSRequestHandler.bundle_cache.lru.max_bytes = args.cache_mb * 1024 * 1024
 
     # Change to project root directory
     project_root = Path(__file__).parent
@@ -146,16 +1436,33 @@ def main():
     print(f"\nServing from: {project_root}")
     print(f"Server address: http://{HOST}:{PORT}")
     print(f"Application URL: http://{HOST}:{PORT}/app/")
+    print(f"Cache ceiling: {args.cache_mb} MB")
+    if args.watch:
+        print(f"Watching bundle inputs (debounce {args.debounce:g} s)")
     print("\nPress Ctrl+C to stop the server")
     print("=" * 60)
     print()
 
-    # Create server
-    with socketserver.TCPServer((HOST, PORT), CORSRequestHandler) as httpd:
+    # Build the query index and load module details and the search index of
+    # the default bundle in the background, so the first queries are fast;
+    # named bundles are loaded on first use
+    for derived in (CORSRequestHandler.graph_indexes, CORSRequestHandler.module_details,
+                    CORSRequestHandler.search_indexes):
+        threading.Thread(target=derived.get, args=(str(project_root / 'data'),), daemon=True).start()
+
+    watcher = None
+    if args.watch:
+        watcher = InputWatcher(project_root, CORSRequestHandler.build_jobs, debounce=args.debounce)
+        watcher.start()
+
+    # Create server (one thread per request)
+    with ThreadingServer((HOST, PORT), CORSRequestHandler) as httpd:
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\n\nShutting down server...")
+            if watcher is not None:
+                watcher.stop()
             httpd.shutdown()
             print("Server stopped.")
 